@@ -1 +1,9 @@
 from .client_module import _client_classes, client
+from .transport import Transport, RecordedTransport, TransportRequest, RequestCoalescer
+from .cache import HttpCache
+from .lookup_cache import LookupCache
+from .lookup_store import SqliteLookupStore
+from .retry import RetryPolicy
+from .rate_limit import RateLimiter, RateLimitExceeded
+from .outbox import Outbox
+from .idempotency import IdempotencyKeys
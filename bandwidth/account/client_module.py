@@ -1,12 +1,11 @@
-import requests
 import six
 import urllib
-import json
 import itertools
-from bandwidth.voice.lazy_enumerable import get_lazy_enumerator
-from bandwidth.convert_camel import convert_object_to_snake_case
+from bandwidth.voice.lazy_enumerable import get_lazy_enumerator, limit_page_size
+from bandwidth.parallel_scan import scan_time_range, DEFAULT_SHARDS, DEFAULT_WORKERS
 from bandwidth.voice.decorators import play_audio
-from bandwidth.version import __version__ as version
+from bandwidth.base_client_module import BaseClient
+from bandwidth.lookup_cache import NUMBER_INFO, APPLICATIONS, PHONE_NUMBERS, DOMAINS
 
 from .api_exception_module import BandwidthAccountAPIException
 
@@ -14,81 +13,19 @@ quote = urllib.parse.quote if six.PY3 else urllib.quote
 lazy_map = map if six.PY3 else itertools.imap
 
 
-class Client:
+def _set_ids(numbers):
+    # lazy snake_case views are read-only, so ordered numbers are copied to dictionaries
+    return [dict(number, id=number.get('location', '').split('/')[-1]) for number in numbers]
+
+
+class Client(BaseClient):
 
     """
     Account API client
     """
 
-    def __init__(self, user_id=None, api_token=None, api_secret=None, **other_options):
-        """
-        Initialize the catatpult client.
-        :type user_id: str
-        :param user_id: catapult user id
-        :type api_token: str
-        :param api_token: catapult api token
-        :type api_secret: str
-        :param api_secret: catapult api secret
-        :type api_endpoint: str
-        :param api_endpoint: catapult api endpoint (optional, default value is https://api.catapult.inetwork.com)
-        :type api_version: str
-        :param api_version: catapult api version (optional, default value is v1)
-
-        :rtype: bandwidth.catapult.Client
-        :returns: bandwidth client
-
-        Init the catapult client::
-
-            api = bandwidth.catapult.Client('YOUR_USER_ID', 'YOUR_API_TOKEN', 'YOUR_API_SECRET')
-            # or
-            api = bandwidth.client('catapult', 'YOUR_USER_ID', 'YOUR_API_TOKEN', 'YOUR_API_SECRET')
-        """
-        if not all((user_id, api_token, api_secret)):
-            raise ValueError('Arguments user_id, api_token and api_secret are required. '
-                             'Use bandwidth.client("catapult", "YOUR-USER-ID", "YOUR-API-TOKEN", "YOUR-API-SECRET")')
-        self.user_id = user_id
-        self.api_endpoint = other_options.get(
-            'api_endpoint', 'https://api.catapult.inetwork.com')
-        self.api_version = other_options.get('api_version', 'v1')
-        self.auth = (api_token, api_secret)
-
-    def _request(self, method, url, *args, **kwargs):
-        user_agent = 'PythonSDK_' + version
-        headers = kwargs.pop('headers', None)
-        if headers:
-            headers['User-Agent'] = user_agent
-        else:
-            headers = {
-                'User-Agent': user_agent
-            }
-        if url.startswith('/'):
-            # relative url
-            url = '%s/%s%s' % (self.api_endpoint, self.api_version, url)
-        return requests.request(method, url, auth=self.auth, headers=headers, *args, **kwargs)
-
-    def _check_response(self, response):
-        if response.status_code >= 400:
-            if response.headers.get('content-type') is not None and \
-                    response.headers.get('content-type').startswith("application/json"):
-                data = response.json()
-                raise BandwidthAccountAPIException(
-                    response.status_code, data['message'], code=data.get('code'))
-            else:
-                raise BandwidthAccountAPIException(
-                    response.status_code, response.content.decode('utf-8')[:79])
-
-    def _make_request(self, method, url, *args, **kwargs):
-        response = self._request(method, url, *args, **kwargs)
-        self._check_response(response)
-        data = None
-        id = None
-        if response.headers.get('content-type') is not None and \
-                response.headers.get('content-type').startswith("application/json"):
-            data = convert_object_to_snake_case(response.json())
-        location = response.headers.get('location')
-        if location is not None:
-            id = location.split('/')[-1]
-        return (data, response, id)
+    api_family = 'account'
+    exception_class = BandwidthAccountAPIException
 
     """
     Account API
@@ -114,6 +51,8 @@ class Client:
                                   trans_type=None,
                                   size=None,
                                   number=None,
+                                  limit=None,
+                                  sort_order=None,
                                   **kwargs):
         """
         Get the transactions from the user's account
@@ -127,6 +66,8 @@ class Client:
         :param int size: Used for pagination to indicate the size of each page requested for querying a list of items. \
             If no value is specified the default value is 25. (Maximum value 1000)
         :param str number: Search transactions by phone number
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
+        :param str sort_order: How to sort the transactions. Values are 'asc' or 'desc'
         :rtype: types.GeneratorType
         :returns: list of transactions
 
@@ -154,18 +95,47 @@ class Client:
         kwargs["toDate"] = to_date
         kwargs["fromDate"] = from_date
         kwargs["type"] = trans_type
-        kwargs["size"] = size
+        kwargs["size"] = limit_page_size(size, limit, self.adaptive_page_size)
         kwargs["number"] = number
+        kwargs["sortOrder"] = sort_order
 
         path = '/users/%s/account/transactions' % self.user_id
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs), limit=limit)
+
+    def scan_account_transactions(self, from_date, to_date, shards=DEFAULT_SHARDS, workers=DEFAULT_WORKERS,
+                                  ordered=True, **kwargs):
+        """
+        Get the transactions from the user's account for a time range. The range is split into shards which are
+        fetched concurrently.
+
+        :param from_date: The start of the range (datetime or string like 2017-01-01T00:00:00Z)
+        :param to_date: The end of the range (datetime or string like 2017-01-01T23:59:59Z)
+        :param int shards: number of shards to split the range into (optional, default value is 8)
+        :param int workers: number of shards fetched at once (optional, default value is 4)
+        :param bool ordered: True to return transactions shard by shard in order of time (items of a shard
+            keep the order of the api), False to return transactions as soon as they are fetched
+            (optional, default value is True)
+        :param kwargs: other filters of list_account_transactions() (like ``trans_type``, ``sort_order`` or ``size``)
+        :rtype: bandwidth.parallel_scan.ParallelScan
+        :returns: list of transactions
 
-    def list_applications(self, size=None, **kwargs):
+        Example: Export transactions of a month::
+
+            for transaction in api.scan_account_transactions('2017-01-01T00:00:00Z', '2017-01-31T23:59:59Z'):
+                save(transaction)
+        """
+        return scan_time_range(
+            lambda start, end: self.list_account_transactions(from_date=start, to_date=end, **kwargs),
+            from_date, to_date, '%Y-%m-%dT%H:%M:%SZ', shards, workers, ordered,
+            reverse=kwargs.get('sort_order') == 'desc')
+
+    def list_applications(self, size=None, limit=None, **kwargs):
         """
         Get a list of user's applications
 
         :param int size: Used for pagination to indicate the size of each page requested for querying a list
                 of items. If no value is specified the default value is 25. (Maximum value 1000)
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
         :rtype: types.GeneratorType
         :returns: list of applications
 
@@ -195,9 +165,9 @@ class Client:
             ## }
 
         """
-        kwargs["size"] = size
+        kwargs["size"] = limit_page_size(size, limit, self.adaptive_page_size)
         path = '/users/%s/applications' % self.user_id
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs), limit=limit)
 
     def create_application(self,
                            name,
@@ -297,7 +267,8 @@ class Client:
             print(my_app["id"])
             ## a-1232asf123
         """
-        return self._make_request('get', '/users/%s/applications/%s' % (self.user_id, app_id))[0]
+        return self._lookup(APPLICATIONS, app_id, lambda: self._make_request(
+            'get', '/users/%s/applications/%s' % (self.user_id, app_id))[0])
 
     def update_application(self, app_id,
                            name=None,
@@ -381,6 +352,7 @@ class Client:
         kwargs["autoAnswer"] = auto_answer
 
         self._make_request('post', '/users/%s/applications/%s' % (self.user_id, app_id), json=kwargs)
+        self._invalidate_lookup(APPLICATIONS, app_id)
 
     def delete_application(self, app_id):
         """
@@ -402,6 +374,7 @@ class Client:
         """
         self._make_request(
             'delete', '/users/%s/applications/%s' % (self.user_id, app_id))
+        self._invalidate_lookup(APPLICATIONS, app_id)
 
     def search_available_local_numbers(self,
                                        city=None,
@@ -558,9 +531,8 @@ class Client:
         kwargs["quantity"] = quantity
         number_list = self._make_request(
             'post', '/availableNumbers/local', params=kwargs)[0]
-        for item in number_list:
-            item['id'] = item.get('location', '').split('/')[-1]
-        return number_list
+        # raw data is returned as received
+        return number_list if self.raw else _set_ids(number_list)
 
     def search_and_order_toll_free_numbers(self, quantity, **kwargs):
         """
@@ -588,18 +560,18 @@ class Client:
 
         """
         kwargs["quantity"] = quantity
-        list = self._make_request(
+        number_list = self._make_request(
             'post', '/availableNumbers/tollFree', params=kwargs)[0]
-        for item in list:
-            item['id'] = item.get('location', '').split('/')[-1]
-        return list
+        # raw data is returned as received
+        return number_list if self.raw else _set_ids(number_list)
 
-    def list_domains(self, size=None, **kwargs):
+    def list_domains(self, size=None, limit=None, **kwargs):
         """
         Get a list of domains
 
         :param int size: Used for pagination to indicate the size of each page requested for querying a list of items. \
             If no value is specified the default value is 25. (Maximum value 100)
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
         :rtype: types.GeneratorType
         :returns: list of domains
 
@@ -633,9 +605,9 @@ class Client:
 
 
         """
-        kwargs['size'] = size
+        kwargs['size'] = limit_page_size(size, limit, self.adaptive_page_size)
         path = '/users/%s/domains' % self.user_id
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs), limit=limit)
 
     def create_domain(self, name, description=None, **kwargs):
         """
@@ -683,7 +655,8 @@ class Client:
             ##     'id'          : 'rd-domainId',
             ##     'name'        : 'qwerty'}
         """
-        return self._make_request('get', '/users/%s/domains/%s' % (self.user_id, domain_id))[0]
+        return self._lookup(DOMAINS, domain_id, lambda: self._make_request(
+            'get', '/users/%s/domains/%s' % (self.user_id, domain_id))[0])
 
     def delete_domain(self, domain_id):
         """
@@ -698,8 +671,9 @@ class Client:
         """
         self._make_request('delete', '/users/%s/domains/%s' %
                            (self.user_id, domain_id))
+        self._invalidate_lookup(DOMAINS, domain_id)
 
-    def list_domain_endpoints(self, domain_id, size=None, **kwargs):
+    def list_domain_endpoints(self, domain_id, size=None, limit=None, **kwargs):
         """
         Get a list of domain's endpoints
 
@@ -707,6 +681,7 @@ class Client:
         :param domain_id: id of a domain
         :param int size: Used for pagination to indicate the size of each page requested for querying a list of items.\
             If no value is specified the default value is 25. (Maximum value 1000)
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
         :rtype: types.GeneratorType
         :returns: list of endpoints
 
@@ -755,9 +730,9 @@ class Client:
             ## ]
 
         """
-        kwargs['size'] = size
+        kwargs['size'] = limit_page_size(size, limit, self.adaptive_page_size)
         path = '/users/%s/domains/%s/endpoints' % (self.user_id, domain_id)
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs), limit=limit)
 
     def create_domain_endpoint(
             self,
@@ -965,12 +940,13 @@ class Client:
             self.user_id, domain_id, endpoint_id)
         return self._make_request('post', path, json=kwargs)[0]
 
-    def list_errors(self, size=None, **kwargs):
+    def list_errors(self, size=None, limit=None, **kwargs):
         """
         Get a list of errors
 
         :param int size: Used for pagination to indicate the size of each page requested for querying a list
             of items. If no value is specified the default value is 25. (Maximum value 1000)
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
         :rtype: types.GeneratorType
         :returns: list of calls
 
@@ -1029,9 +1005,9 @@ class Client:
             #     'time':'2016-03-28T18:31:33Z'
             # }]
         """
-        kwargs['size'] = size
+        kwargs['size'] = limit_page_size(size, limit, self.adaptive_page_size)
         path = '/users/%s/errors' % self.user_id
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs), limit=limit)
 
     def get_error(self, error_id):
         """
@@ -1074,9 +1050,10 @@ class Client:
         """
         return self._make_request('get', '/users/%s/errors/%s' % (self.user_id, error_id))[0]
 
-    def list_media_files(self):
+    def list_media_files(self, limit=None):
         """
         Gets a list of user's media files.
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
 
         :rtype: types.GeneratorType
         :returns: list of media files
@@ -1092,7 +1069,7 @@ class Client:
 
         """
         path = '/users/%s/media' % self.user_id
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path), limit=limit)
 
     def upload_media_file(self, media_name, content=None, content_type='application/octet-stream', file_path=None):
         """
@@ -1189,7 +1166,7 @@ class Client:
 
         """
         path = '/phoneNumbers/numberInfo/%s' % quote(number)
-        return self._make_request('get', path)[0]
+        return self._lookup(NUMBER_INFO, number, lambda: self._make_request('get', path)[0])
 
     def list_phone_numbers(
             self,
@@ -1199,6 +1176,7 @@ class Client:
             city=None,
             number_state=None,
             size=None,
+            limit=None,
             **kwargs):
         """
         Get a list of user's phone numbers
@@ -1214,6 +1192,7 @@ class Client:
             by the number state.
         :param str size: Used for pagination to indicate the size of each page requested for querying a list
             of items. If no value is specified the default value is 25. (Maximum value 1000)
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
         :rtype: types.GeneratorType
         :returns: list of phone numbers
 
@@ -1252,10 +1231,10 @@ class Client:
         kwargs['name'] = name
         kwargs['city'] = city
         kwargs['numberState'] = number_state
-        kwargs['size'] = size
+        kwargs['size'] = limit_page_size(size, limit, self.adaptive_page_size)
 
         path = '/users/%s/phoneNumbers' % self.user_id
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs), limit=limit)
 
     def order_phone_number(self,
                            number=None,
@@ -1322,7 +1301,8 @@ class Client:
             ## }
 
         """
-        return self._make_request('get', '/users/%s/phoneNumbers/%s' % (self.user_id, number_id))[0]
+        return self._lookup(PHONE_NUMBERS, number_id, lambda: self._make_request(
+            'get', '/users/%s/phoneNumbers/%s' % (self.user_id, number_id))[0])
 
     def update_phone_number(self, number_id,
                             name=None,
@@ -1375,6 +1355,7 @@ class Client:
 
         self._make_request(
             'post', '/users/%s/phoneNumbers/%s' % (self.user_id, number_id), json=kwargs)
+        self._invalidate_lookup(PHONE_NUMBERS, number_id)
 
     def delete_phone_number(self, number_id):
         """
@@ -1389,3 +1370,4 @@ class Client:
         """
         self._make_request(
             'delete', '/users/%s/phoneNumbers/%s' % (self.user_id, number_id))
+        self._invalidate_lookup(PHONE_NUMBERS, number_id)
@@ -0,0 +1,689 @@
+"""
+Asynchronous (asyncio) api clients. They require python 3.5+ and ``aiohttp`` (``pip install bandwidth-sdk[async]``).
+
+Methods of asynchronous clients are generated from methods of synchronous clients. Each generated method runs
+the synchronous method body on a per call copy of the client whose ``_request`` doesn't touch the network.
+When that copy needs a response which is not fetched yet the body is interrupted, the request is made
+asynchronously and the body is replayed with all fetched responses. So the same request building and response
+handling code serves both kinds of clients.
+
+A body is run once per fetched response, so only methods whose bodies have no side effects before their
+requests (listed in ``_REPLAYED_METHODS``) are generated this way. Methods which read their input (like iterators
+of messages or files to upload) have own asynchronous versions which read it once and replay the body with
+the read data.
+"""
+import asyncio
+import functools
+import io
+import time
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from bandwidth.base_client_module import BaseClient
+from bandwidth.json_codec import get_codec
+from bandwidth.retry import RetryPolicy
+from bandwidth.rate_limit import RateLimiter
+from bandwidth.idempotency import IdempotencyKeys
+from bandwidth.transport import BaseTransport, RecordedTransport, COALESCED_METHODS, get_coalescing_key
+from bandwidth.voice.lazy_enumerable import fetch_page
+from bandwidth.voice import Client as VoiceClient
+from bandwidth.account import Client as AccountClient
+from bandwidth.messaging import Client as MessagingClient
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+DEFAULT_MAX_CONNECTIONS = 100
+
+# public methods which don't make requests (they are copied to asynchronous clients as is)
+_LOCAL_METHODS = frozenset(['build_sentence', 'build_audio_playback'])
+# public methods which run worker threads (they are skipped like scan_* methods)
+_THREADED_METHODS = frozenset(['send_messages_in_chunks'])
+# public methods whose bodies only build requests and handle responses, so they are replayed safely
+# (see AsyncClient._replay_call), other methods need own asynchronous versions in the client classes
+_REPLAYED_METHODS = frozenset([
+    # voice
+    'answer_call', 'create_bridge', 'create_call', 'create_call_gather', 'create_conference',
+    'create_conference_member', 'create_transcription', 'disable_call_recording', 'enable_call_recording',
+    'get_bridge', 'get_call', 'get_call_event', 'get_call_gather', 'get_conference', 'get_conference_member',
+    'get_recording', 'get_transcription', 'hangup_call', 'hold_conference', 'hold_conference_member',
+    'list_bridge_calls', 'list_bridges', 'list_call_events', 'list_call_recordings', 'list_call_transcriptions',
+    'list_calls', 'list_conference_members', 'list_recordings', 'list_transcriptions', 'mute_conference',
+    'mute_conference_member', 'play_audio_file_to_bridge', 'play_audio_file_to_call',
+    'play_audio_file_to_conference', 'play_audio_file_to_conference_member', 'play_audio_to_bridge',
+    'play_audio_to_call', 'play_audio_to_conference', 'play_audio_to_conference_member', 'reject_call',
+    'remove_conference_member', 'send_dtmf_to_call', 'speak_sentence_to_bridge', 'speak_sentence_to_call',
+    'speak_sentence_to_conference', 'speak_sentence_to_conference_member', 'terminate_conference',
+    'toggle_call_recording', 'transfer_call', 'update_bridge', 'update_call', 'update_call_gather',
+    'update_conference', 'update_conference_member',
+    # account
+    'create_application', 'create_domain', 'create_domain_endpoint', 'create_domain_endpoint_auth_token',
+    'delete_application', 'delete_domain', 'delete_domain_endpoint', 'delete_media_file', 'delete_phone_number',
+    'download_media_file', 'get_account', 'get_application', 'get_domain', 'get_domain_endpoint', 'get_error',
+    'get_number_info', 'get_phone_number', 'list_account_transactions', 'list_applications',
+    'list_domain_endpoints', 'list_domains', 'list_errors', 'list_media_files', 'list_phone_numbers',
+    'order_phone_number', 'search_and_order_local_numbers', 'search_and_order_toll_free_numbers',
+    'search_available_local_numbers', 'search_available_toll_free_numbers', 'update_application',
+    'update_domain_endpoint', 'update_phone_number',
+    # messaging
+    'get_message', 'list_messages', 'send_message'
+])
+
+
+def _to_aiohttp_params(params):
+    # requests skips None values and repeats keys for lists, aiohttp accepts strings only
+    result = []
+    for key, value in params.items():
+        if value is None:
+            continue
+        for v in (value if isinstance(value, (list, tuple)) else [value]):
+            result.append((key, v if isinstance(v, str) else str(v)))
+    return result
+
+
+def _to_aiohttp_kwargs(kwargs, json_codec):
+    result = {}
+    for key, value in kwargs.items():
+        if key == 'json' and value is not None:
+            result['data'] = json_codec.dumps(value)
+        elif key == 'auth' and value is not None:
+            result['auth'] = aiohttp.BasicAuth(*value)
+        elif key == 'params' and value is not None:
+            result['params'] = _to_aiohttp_params(value)
+        elif key == 'timeout' and value is not None:
+            result['timeout'] = aiohttp.ClientTimeout(total=value)
+        elif key == 'stream' or value is None:
+            continue
+        else:
+            result[key] = value
+    if 'data' in result and kwargs.get('json') is not None:
+        headers = CaseInsensitiveDict(result.get('headers') or {})
+        headers.setdefault('Content-Type', 'application/json')
+        result['headers'] = dict(headers)
+    return result
+
+
+async def _create_response(client_response):
+    response = requests.Response()
+    response.status_code = client_response.status
+    response.reason = client_response.reason
+    response.url = str(client_response.url)
+    headers = CaseInsensitiveDict()
+    for key, value in client_response.headers.items():
+        headers[key] = '%s, %s' % (headers[key], value) if key in headers else value
+    response.headers = headers
+    response._content = await client_response.read()
+    response.raw = io.BytesIO(response._content)
+    return response
+
+
+class AsyncTransport(BaseTransport):
+
+    """
+    Asynchronous transport which sends requests over pooled keep-alive connections of ``aiohttp``.
+
+    Middlewares of this transport should be coroutine functions ``async def middleware(request, send)``.
+    """
+
+    def __init__(self, middlewares=None, max_connections=DEFAULT_MAX_CONNECTIONS, pool_max_per_host=0,
+                 pool_idle_timeout=60, session=None, json_codec=None):
+        """
+        Initialize the transport.
+
+        :type middlewares: list
+        :param middlewares: list of middlewares (optional)
+        :type max_connections: int
+        :param max_connections: max number of simultaneous connections (optional, default value is 100)
+        :type pool_max_per_host: int
+        :param pool_max_per_host: max number of simultaneous connections to single host
+            (optional, default value is 0 - no limit)
+        :type pool_idle_timeout: float
+        :param pool_idle_timeout: seconds after which unused connections are dropped (optional, default value is 60)
+        :type session: aiohttp.ClientSession
+        :param session: existing aiohttp session to use (optional)
+        :type json_codec: str or bandwidth.json_codec.JsonCodec
+        :param json_codec: codec to encode json bodies of requests (optional, default value is the fastest
+            installed codec)
+        """
+        super(AsyncTransport, self).__init__(middlewares)
+        if aiohttp is None:
+            raise ImportError('Asynchronous clients require aiohttp. Use "pip install bandwidth-sdk[async]"')
+        self.max_connections = max_connections
+        self.pool_max_per_host = pool_max_per_host
+        self.pool_idle_timeout = pool_idle_timeout
+        self._owns_session = session is None
+        self.session = session
+        self.json_codec = get_codec(json_codec)
+
+    def _get_session(self):
+        # aiohttp session should be created inside of running event loop
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.pool_max_per_host,
+                                             keepalive_timeout=self.pool_idle_timeout)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def request(self, request):
+        return await self._build_chain(0)(request)
+
+    async def send(self, request):
+        session = self._get_session()
+        async with session.request(request.method, request.url, *request.args,
+                                   **_to_aiohttp_kwargs(request.kwargs, self.json_codec)) as client_response:
+            return await _create_response(client_response)
+
+    async def close(self):
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class AsyncRecordedTransport(RecordedTransport):
+
+    """
+    Asynchronous transport which doesn't touch the network. It returns prerecorded responses in order
+    (useful for tests).
+    """
+
+    async def request(self, request):
+        return await self._build_chain(0)(request)
+
+    async def send(self, request):
+        return RecordedTransport.send(self, request)
+
+    async def close(self):
+        pass
+
+
+class AsyncRequestCoalescer(object):
+
+    """
+    Asynchronous middleware which lets concurrent identical GET requests share one in-flight request
+    (see bandwidth.transport.RequestCoalescer)
+    """
+
+    def __init__(self, methods=COALESCED_METHODS):
+        """
+        :type methods: tuple
+        :param methods: upper case names of methods to coalesce (optional, default value is ('GET', 'HEAD'))
+        """
+        self.methods = tuple(methods)
+        self.requests = 0
+        self.coalesced = 0
+        self._flights = {}
+
+    async def __call__(self, request, send):
+        key = get_coalescing_key(request, self.methods)
+        if key is None:
+            return await send(request)
+        future = self._flights.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            # the shared request was cancelled by its caller
+            return await send(request)
+        future = self._flights[key] = asyncio.get_event_loop().create_future()
+        self.requests += 1
+        try:
+            response = await send(request)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            # the error is raised here, so it shouldn't be reported as never retrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            del self._flights[key]
+
+
+class AsyncRetryPolicy(RetryPolicy):
+
+    """
+    Asynchronous middleware which retries transient failures (see bandwidth.retry.RetryPolicy)
+    """
+
+    def get_retry_reason(self, request, response=None, error=None):
+        if error is not None and aiohttp is not None:
+            # a request which failed to connect was not sent
+            if isinstance(error, aiohttp.ClientConnectorError) or \
+                    (self.is_idempotent(request) and isinstance(error, (aiohttp.ClientConnectionError,
+                                                                        asyncio.TimeoutError))):
+                return error.__class__.__name__
+        return super(AsyncRetryPolicy, self).get_retry_reason(request, response, error)
+
+    async def __call__(self, request, send):
+        start = time.time()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = await send(request)
+            except Exception as err:
+                delay = self._get_next_delay(request, attempt, start, None, err)
+                if delay is None:
+                    raise
+            else:
+                delay = self._get_next_delay(request, attempt, start, response, None)
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+
+
+class AsyncRateLimiter(RateLimiter):
+
+    """
+    Asynchronous middleware which keeps request rate under limits (see bandwidth.rate_limit.RateLimiter).
+    Its buckets can be shared with synchronous limiters.
+    """
+
+    async def __call__(self, request, send):
+        wait = self.acquire(request)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return await send(request)
+
+
+class AsyncIdempotencyKeys(IdempotencyKeys):
+
+    """
+    Asynchronous middleware which adds idempotency keys to creates and resolves repeated creates
+    (see bandwidth.idempotency.IdempotencyKeys). Its persistent store can be shared with synchronous middlewares.
+    """
+
+    async def __call__(self, request, send):
+        key = self.prepare(request)
+        if key is None:
+            return await send(request)
+        while True:
+            response = self.get_response(request, key)
+            if response is not None:
+                return response
+            flight = self._flights.get(key)
+            if flight is None:
+                break
+            # the first create with the key is in progress
+            await flight.wait()
+        flight = self._flights[key] = asyncio.Event()
+        try:
+            response = await send(request)
+            self.save_response(key, response)
+            return response
+        finally:
+            del self._flights[key]
+            flight.set()
+
+
+class _ReplayRequest(BaseException):
+
+    # it is BaseException to pass through "except Exception" blocks of client methods
+
+    def __init__(self, request):
+        super(_ReplayRequest, self).__init__()
+        self.request = request
+
+
+class _ReplayMixin(object):
+
+    def _request(self, method, url, *args, **kwargs):
+        if self._replay_index < len(self._replay_responses):
+            response = self._replay_responses[self._replay_index]
+            self._replay_index += 1
+            return response
+        raise _ReplayRequest(self._build_request(method, url, *args, **kwargs))
+
+
+class AsyncLazyEnumerator(object):
+
+    """
+    Asynchronous lazy collection of api results. Makes api requests for new parts of data on demand only.
+    """
+
+    def __init__(self, client, create_enumerator):
+        """
+        :type client: bandwidth.async_client_module.AsyncClient
+        :param client: asynchronous client
+        :type create_enumerator: types.FunctionType
+        :param create_enumerator: function which returns synchronous lazy enumerator for given replaying client
+        """
+        self.client = client
+        self._create_enumerator = create_enumerator
+        self._replay = client._create_replay()
+        self._enumerator = create_enumerator(self._replay)
+        self._page = None
+        self._page_items = None
+        self._index = 0
+        self._sizer = self._enumerator._create_sizer()
+        self._limit = self._enumerator._create_limit()
+        self._remaining = self._enumerator.limit
+        self._closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def _fetch_next_page(self):
+        # the page at the cursor is fetched, returns None after last page
+        cursor = self._enumerator._cursor
+        if self._closed or cursor.done or (self._limit is not None and self._limit.reached):
+            return None
+        self._enumerator._started = True
+        url = cursor.page_url
+        if self._sizer is not None:
+            self._sizer.page_consumed()
+        if url is not None and self._sizer is not None:
+            url = self._sizer.get_next_page_url(url)
+        if url is not None and self._limit is not None and cursor.offset == 0:
+            url = self._limit.get_next_page_url(url)
+        if url is None:
+            get_data = self._enumerator.get_first_page
+        else:
+            def get_data():
+                return self._replay._make_request('get', url, raw=self._enumerator.raw)
+        page = await self.client._replay_call(self._replay, lambda: fetch_page(get_data, url))
+        if self._sizer is not None:
+            self._sizer.page_delivered(page)
+        if self._limit is not None:
+            self._limit.page_fetched(len(page.items) - cursor.offset)
+        return page
+
+    async def __anext__(self):
+        enumerator = self._enumerator
+        while not self._closed:
+            if self._remaining is not None and self._remaining <= 0:
+                break
+            if self._page is not None and self._index < len(self._page_items):
+                if self._remaining is not None:
+                    self._remaining -= 1
+                index = self._index
+                self._index += 1
+                enumerator._cursor.move(self._page, index + 1, len(self._page_items))
+                item = self._page_items[index]
+                return item if enumerator.map_item is None else enumerator.map_item(item)
+            page = await self._fetch_next_page()
+            if page is None:
+                break
+            self._page = page
+            self._page_items = enumerator._get_page_items(page.items)
+            self._index = enumerator._cursor.offset
+            if self._index >= len(self._page_items):
+                enumerator._cursor.move(page, len(self._page_items), len(self._page_items))
+        raise StopAsyncIteration()
+
+    def iter_pages(self):
+        """
+        Returns whole pages of the collection with their metadata instead of single items.
+        Pages are returned from the position of a restored cursor.
+
+        :rtype: bandwidth.async_client_module.AsyncPageIterator
+        :returns: asynchronous iterator over pages (bandwidth.voice.lazy_enumerable.Page)
+
+        Example: Save messages page by page::
+
+            async for page in api.list_messages(size=1000).iter_pages():
+                await db.insert_many(page.items)
+        """
+        return AsyncPageIterator(self)
+
+    def checkpoint(self):
+        """
+        Returns position of the enumeration (see bandwidth.voice.lazy_enumerable.LazyEnumerator.checkpoint())
+
+        :rtype: dict
+        :returns: cursor with keys page_url (None for first page), offset and done
+        """
+        return self._enumerator.checkpoint()
+
+    def restore(self, cursor):
+        """
+        Moves the enumeration to a position returned by checkpoint(). It should be called before the enumeration
+        starts.
+
+        :type cursor: dict
+        :param cursor: position returned by checkpoint()
+
+        :rtype: bandwidth.async_client_module.AsyncLazyEnumerator
+        :returns: the collection
+
+        Example: Resume an export::
+
+            async for transaction in api.list_account_transactions(size=1000).restore(cursor):
+                await save(transaction)
+        """
+        self._enumerator.restore(cursor)
+        return self
+
+    async def aclose(self):
+        """
+        Stop the enumeration (no more requests will be made)
+        """
+        self._closed = True
+
+
+class AsyncPageIterator(object):
+
+    """
+    Asynchronous iterator over pages of api results
+    """
+
+    def __init__(self, enumerator):
+        self._enumerator = enumerator
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        page = await self._enumerator._fetch_next_page()
+        if page is None:
+            raise StopAsyncIteration()
+        enumerator = self._enumerator._enumerator
+        size = len(enumerator._get_page_items(page.items))
+        skip = enumerator._cursor.offset
+        count = size - skip
+        if skip:
+            page.items = page.items[skip:]
+        remaining = self._enumerator._remaining
+        if remaining is not None:
+            if count > remaining:
+                page.items = page.items[:remaining]
+                count = remaining
+            self._enumerator._remaining = remaining - count
+        enumerator._cursor.move(page, skip + count, size)
+        return enumerator._map_page(page)
+
+    async def aclose(self):
+        """
+        Stop the enumeration (no more requests will be made)
+        """
+        await self._enumerator.aclose()
+
+
+class AsyncClient(BaseClient):
+
+    """
+    Base class of asynchronous api clients
+    """
+
+    _replay_class = None
+    _coalescer_class = AsyncRequestCoalescer
+    _retry_policy_class = AsyncRetryPolicy
+    _rate_limiter_class = AsyncRateLimiter
+    _idempotency_class = AsyncIdempotencyKeys
+
+    def _create_transport(self, options):
+        return AsyncTransport(max_connections=options.get('max_connections', DEFAULT_MAX_CONNECTIONS),
+                              pool_max_per_host=options.get('pool_max_per_host', 0),
+                              pool_idle_timeout=options.get('pool_idle_timeout', 60),
+                              json_codec=self.json_codec, middlewares=self._get_own_middlewares())
+
+    async def close(self):
+        """
+        Close pooled connections of the client (a shared transport passed to the constructor stays open)
+
+        Example: Close the client::
+
+            await api.close()
+        """
+        if self._owns_transport:
+            await self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _create_replay(self):
+        replay = object.__new__(self._replay_class)
+        replay.__dict__.update(self.__dict__)
+        replay._replay_responses = []
+        replay._replay_index = 0
+        return replay
+
+    async def _replay_call(self, replay, func):
+        responses = replay._replay_responses = []
+        while True:
+            replay._replay_index = 0
+            try:
+                return func()
+            except _ReplayRequest as pending:
+                responses.append(await self.transport.request(pending.request))
+
+
+def _async_method(func):
+    @functools.wraps(func)
+    async def method(self, *args, **kwargs):
+        replay = self._create_replay()
+        return await self._replay_call(replay, lambda: func(replay, *args, **kwargs))
+    return method
+
+
+def _async_list_method(func):
+    @functools.wraps(func)
+    def method(self, *args, **kwargs):
+        return AsyncLazyEnumerator(self, lambda replay: func(replay, *args, **kwargs))
+    return method
+
+
+def async_client(sync_class):
+    """
+    Add to class asynchronous versions of all public methods of synchronous client class sync_class.
+    Methods list_* return asynchronous lazy collections, methods scan_* (parallel scans) and other methods
+    which run worker threads are skipped, other methods are coroutines. Only methods of _REPLAYED_METHODS are
+    generated, other methods should be defined in the class.
+    """
+    def add_methods(cl):
+        cl.api_family = sync_class.api_family
+        cl.exception_class = sync_class.exception_class
+        cl._replay_class = type('_Replay%s' % sync_class.api_family.capitalize(), (_ReplayMixin, sync_class), {})
+        for name in dir(sync_class):
+            func = getattr(sync_class, name)
+            if name.startswith('_') or hasattr(BaseClient, name) or not callable(func) or name in vars(cl):
+                # methods defined in the class are its own asynchronous versions
+                continue
+            if name.startswith('scan_') or name in _THREADED_METHODS:
+                # parallel scans run worker threads, asynchronous code can gather list_* collections instead
+                continue
+            if name in _LOCAL_METHODS:
+                setattr(cl, name, func)
+            elif name not in _REPLAYED_METHODS:
+                # a body with side effects before its requests would repeat them on each replay
+                raise TypeError('Method %s of %s is not known to be replayed safely, add it to _REPLAYED_METHODS '
+                                'or define its asynchronous version' % (name, sync_class.__name__))
+            elif name.startswith('list_'):
+                setattr(cl, name, _async_list_method(func))
+            else:
+                setattr(cl, name, _async_method(func))
+        return cl
+    return add_methods
+
+
+@async_client(VoiceClient)
+class AsyncVoiceClient(AsyncClient):
+
+    """
+    Asynchronous voice api client. It has all methods of ``bandwidth.voice.Client``
+    but they should be awaited and list_* methods return asynchronous iterators.
+
+    Example: Create a call and list calls::
+
+        async with AsyncVoiceClient('u-user', 't-token', 's-secret') as api:
+            call_id = await api.create_call(from_='+1234567890', to='+1234567891')
+            async for call in api.list_calls(size=100):
+                print(call['id'])
+    """
+
+
+@async_client(AccountClient)
+class AsyncAccountClient(AsyncClient):
+
+    """
+    Asynchronous account api client. It has all methods of ``bandwidth.account.Client``
+    but they should be awaited and list_* methods return asynchronous iterators.
+
+    Example: Get number info::
+
+        async with AsyncAccountClient('u-user', 't-token', 's-secret') as api:
+            info = await api.get_number_info('+1234567890')
+    """
+
+    _upload_media_file = _async_method(AccountClient.upload_media_file)
+
+    async def upload_media_file(self, media_name, content=None, content_type='application/octet-stream',
+                                file_path=None):
+        """
+        Upload a file (see bandwidth.account.Client.upload_media_file())
+
+        :type media_name: str
+        :param media_name: name of file on bandwidth server
+        :type content: str|buffer|bytearray|stream|file
+        :param content: content of file to upload (file object and stream are read once)
+        :type content_type: str
+        :param content_type: mime type of file
+        :type file_path: str
+        :param file_path: path to file to upload
+        """
+        # the body is replayed after the response, so the file is read once before that
+        if file_path is not None and content is None:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+        elif hasattr(content, 'read'):
+            content = content.read()
+        return await self._upload_media_file(media_name, content, content_type)
+
+
+@async_client(MessagingClient)
+class AsyncMessagingClient(AsyncClient):
+
+    """
+    Asynchronous messaging api client. It has all methods of ``bandwidth.messaging.Client``
+    but they should be awaited and list_* methods return asynchronous iterators.
+
+    Example: Send a message::
+
+        async with AsyncMessagingClient('u-user', 't-token', 's-secret') as api:
+            message_id = await api.send_message(from_='+1234567980', to='+1234567981', text='SMS message')
+    """
+
+    _send_messages = _async_method(MessagingClient.send_messages)
+
+    async def send_messages(self, messages_data):
+        """
+        Send some messages by one request (see bandwidth.messaging.Client.send_messages())
+
+        :param list messages_data: List of messages to send (any iterable, it is read once)
+
+        :rtype: list
+        :returns: results of sent messages
+        """
+        # the body is replayed after the response, so an iterator would be exhausted by then
+        return await self._send_messages(list(messages_data))
@@ -0,0 +1,359 @@
+import copy
+import threading
+from bandwidth.convert_camel import convert_object_to_snake_case, snake_case_view
+from bandwidth.version import __version__ as version
+from bandwidth.transport import Transport, TransportRequest, RequestCoalescer
+from bandwidth.json_stream import StreamedItems
+from bandwidth.json_codec import get_codec
+from bandwidth.cache import HttpCache
+from bandwidth.lookup_cache import LookupCache
+from bandwidth.retry import RetryPolicy
+from bandwidth.rate_limit import RateLimiter
+from bandwidth.idempotency import IdempotencyKeys
+from bandwidth.connection_pool import DEFAULT_POOL_SIZE, DEFAULT_POOL_MAX_PER_HOST, DEFAULT_POOL_IDLE_TIMEOUT
+
+
+class BaseClient(object):
+
+    """
+    Base class of Catapult api clients. It makes http requests via a transport shared by all api families.
+    """
+
+    api_family = None
+    exception_class = Exception
+    _coalescer_class = RequestCoalescer
+    _retry_policy_class = RetryPolicy
+    _rate_limiter_class = RateLimiter
+    _idempotency_class = IdempotencyKeys
+
+    def __init__(self, user_id=None, api_token=None, api_secret=None, **other_options):
+        """
+        Initialize the catatpult client.
+        :type user_id: str
+        :param user_id: catapult user id
+        :type api_token: str
+        :param api_token: catapult api token
+        :type api_secret: str
+        :param api_secret: catapult api secret
+        :type api_endpoint: str
+        :param api_endpoint: catapult api endpoint (optional, default value is https://api.catapult.inetwork.com)
+        :type api_version: str
+        :param api_version: catapult api version (optional, default value is v1)
+        :type pool_size: int
+        :param pool_size: number of hosts to keep connection pools for (optional, default value is 10)
+        :type pool_max_per_host: int
+        :param pool_max_per_host: max number of kept-alive connections to single host
+            (optional, default value is 10)
+        :type pool_idle_timeout: float
+        :param pool_idle_timeout: seconds after which unused connections are dropped (optional, default value is 60)
+        :type connection_pool: bandwidth.connection_pool.ConnectionPool
+        :param connection_pool: existing connection pool to share with other clients (optional)
+        :type transport: bandwidth.transport.BaseTransport
+        :param transport: existing transport to share with other clients (optional, pool options are ignored then)
+        :type lazy_snake_case: bool
+        :param lazy_snake_case: return read-only snake_case views over received data instead of converting whole
+            responses (optional, default value is False)
+        :type raw: bool or str
+        :param raw: True to return parsed json data without conversion to snake_case,
+            'bytes' to return response bodies without parsing (optional, default value is False)
+        :type prefetch_pages: int
+        :param prefetch_pages: number of next pages which list_* collections fetch in background while
+            current page is consumed (optional, default value is 0 - no prefetching)
+        :type adaptive_page_size: bool or int
+        :param adaptive_page_size: True to let list_* collections start with a small page and grow size of next
+            pages (up to 1000 items) while they are consumed faster than fetched, a number to limit size of pages
+            (optional, default value is False)
+        :type stream_items: bool
+        :param stream_items: True to let list_* collections decode items of pages incrementally from
+            the response stream instead of parsing whole pages (optional, default value is False)
+        :type json_codec: str or bandwidth.json_codec.JsonCodec
+        :param json_codec: json codec or its name ('json', 'orjson', 'ujson') to encode requests and decode
+            responses (optional, default value is the fastest installed codec)
+        :type http_cache: bool or bandwidth.cache.HttpCache
+        :param http_cache: True or a cache (which can be shared with other clients) to cache GET responses and
+            revalidate them with ETag/Last-Modified (optional, default value is None - no caching)
+        :type lookup_cache: bool or bandwidth.lookup_cache.LookupCache
+        :param lookup_cache: True or a cache (which can be shared with other clients) to keep results of
+            number info, application, phone number and domain lookups (optional, default value is None - no caching)
+        :type coalesce_requests: bool or bandwidth.transport.RequestCoalescer
+        :param coalesce_requests: True or a coalescer to let concurrent identical GET requests share one in-flight
+            request, it is added to own transport of the client only (optional, default value is False)
+        :type retry: bool or bandwidth.retry.RetryPolicy
+        :param retry: True or a retry policy to retry 429 and 5xx responses and connection errors with backoff,
+            it is added to own transport of the client only (optional, default value is False - no retries)
+        :type rate_limit: float or bandwidth.rate_limit.RateLimiter
+        :param rate_limit: requests per second or a rate limiter (which can be shared with other clients),
+            it is added to own transport of the client only (optional, default value is None - no limit)
+        :type rate_limit_wait: float
+        :param rate_limit_wait: max seconds to wait for the rate limiter, 0 to fail fast with
+            bandwidth.rate_limit.RateLimitExceeded (optional, default value is max_wait of the limiter)
+        :type idempotency: bool or bandwidth.idempotency.IdempotencyKeys
+        :param idempotency: True or a middleware (which can be shared with other clients) to add idempotency keys
+            to creates of messages, calls and phone numbers, creates with keys passed by with_options() are retried
+            and repeated creates with the same key are resolved to the first one, it is added to own transport
+            of the client only (optional, default value is False)
+
+        :rtype: bandwidth.catapult.Client
+        :returns: bandwidth client
+
+        Init the catapult client::
+
+            api = bandwidth.catapult.Client('YOUR_USER_ID', 'YOUR_API_TOKEN', 'YOUR_API_SECRET')
+            # or
+            api = bandwidth.client('catapult', 'YOUR_USER_ID', 'YOUR_API_TOKEN', 'YOUR_API_SECRET')
+
+        Get responses as lazy snake_case views (keys are converted on access only)::
+
+            api = bandwidth.client('catapult', 'YOUR_USER_ID', 'YOUR_API_TOKEN', 'YOUR_API_SECRET',
+                                   lazy_snake_case=True)
+
+        Get responses in original camelCase form (or as bytes with raw='bytes')::
+
+            api = bandwidth.client('catapult', 'YOUR_USER_ID', 'YOUR_API_TOKEN', 'YOUR_API_SECRET', raw=True)
+
+        Release pooled connections when the client is not needed anymore::
+
+            with bandwidth.client('catapult', 'YOUR_USER_ID', 'YOUR_API_TOKEN', 'YOUR_API_SECRET') as api:
+                api.get_account()
+        """
+        if not all((user_id, api_token, api_secret)):
+            raise ValueError('Arguments user_id, api_token and api_secret are required. '
+                             'Use bandwidth.client("catapult", "YOUR-USER-ID", "YOUR-API-TOKEN", "YOUR-API-SECRET")')
+        self.user_id = user_id
+        self.api_endpoint = other_options.get(
+            'api_endpoint', 'https://api.catapult.inetwork.com')
+        self.api_version = other_options.get('api_version', 'v1')
+        self.auth = (api_token, api_secret)
+        self.lazy_snake_case = other_options.get('lazy_snake_case', False)
+        self.raw = other_options.get('raw', False)
+        self.prefetch_pages = other_options.get('prefetch_pages', 0)
+        self.adaptive_page_size = other_options.get('adaptive_page_size', False)
+        self.stream_items = other_options.get('stream_items', False)
+        self._local = threading.local()
+        self.json_codec = get_codec(other_options.get('json_codec'))
+        http_cache = other_options.get('http_cache')
+        # an empty cache has zero length, so it is checked by identity
+        self.http_cache = HttpCache() if http_cache is True else (None if http_cache is False else http_cache)
+        lookup_cache = other_options.get('lookup_cache')
+        self.lookup_cache = LookupCache() if lookup_cache is True else (
+            None if lookup_cache is False else lookup_cache)
+        coalescer = other_options.get('coalesce_requests')
+        self.request_coalescer = self._coalescer_class() if coalescer is True else (coalescer or None)
+        retry_policy = other_options.get('retry')
+        self.retry_policy = self._retry_policy_class() if retry_policy is True else (retry_policy or None)
+        rate_limit = other_options.get('rate_limit')
+        self.rate_limiter = self._rate_limiter_class(rate_limit) if isinstance(rate_limit, (int, float)) \
+            else rate_limit
+        self.rate_limit_wait = other_options.get('rate_limit_wait')
+        idempotency = other_options.get('idempotency')
+        self.idempotency_keys = self._idempotency_class() if idempotency is True else (idempotency or None)
+        self.idempotency_key = None
+        if other_options.get('transport') is not None:
+            for name, middleware in (('coalesce_requests', self.request_coalescer), ('retry', self.retry_policy),
+                                     ('rate_limit', self.rate_limiter), ('idempotency', self.idempotency_keys)):
+                if middleware is not None:
+                    raise ValueError('Option %s can\'t be used with a passed transport. '
+                                     'Add the middleware to the transport instead' % name)
+        self._owns_transport = other_options.get('transport') is None
+        self.transport = other_options.get('transport') or self._create_transport(other_options)
+
+    def _create_transport(self, options):
+        return Transport(
+            options.get('connection_pool'),
+            pool_size=options.get('pool_size', DEFAULT_POOL_SIZE),
+            pool_max_per_host=options.get('pool_max_per_host', DEFAULT_POOL_MAX_PER_HOST),
+            pool_idle_timeout=options.get('pool_idle_timeout', DEFAULT_POOL_IDLE_TIMEOUT),
+            json_codec=self.json_codec,
+            middlewares=self._get_own_middlewares())
+
+    def _get_own_middlewares(self):
+        # middlewares of a transport created by the client, a create gets its idempotency key before all retries,
+        # a coalesced request is retried once for all callers, each retry takes a token of the rate limiter
+        middlewares = [m for m in (self.idempotency_keys, self.request_coalescer, self.retry_policy,
+                                   self.rate_limiter) if m is not None]
+        return middlewares or None
+
+    # options which can be changed by with_options()
+    _call_options = ('lazy_snake_case', 'raw', 'prefetch_pages', 'adaptive_page_size', 'stream_items',
+                     'rate_limit_wait', 'idempotency_key')
+
+    def with_options(self, **options):
+        """
+        Returns a copy of the client with changed options. The copy shares transport (and pooled connections)
+        with the client.
+
+        :param bool lazy_snake_case: return read-only snake_case views over received data
+        :param raw: True to return parsed json data without conversion to snake_case,
+            'bytes' to return response bodies without parsing
+        :param int prefetch_pages: number of next pages which list_* collections fetch in background
+        :param adaptive_page_size: True to let list_* collections grow size of next pages
+        :param bool stream_items: True to let list_* collections decode items of pages from the response stream
+        :param float rate_limit_wait: max seconds to wait for the rate limiter (0 to fail fast,
+            float('inf') to wait as long as needed)
+        :param str idempotency_key: idempotency key of next creates of messages, calls and phone numbers
+            (it is used by the idempotency middleware, repeated creates with the key are resolved to the first one)
+
+        :rtype: bandwidth.base_client_module.BaseClient
+        :returns: client with changed options
+
+        Example: Forward messages in original camelCase form::
+
+            for message in api.with_options(raw=True).list_messages():
+                print(message['deliveryState'])
+
+        Example: Fetch next pages of a big list in background::
+
+            for transaction in api.with_options(prefetch_pages=2).list_account_transactions(size=1000):
+                save(transaction)
+
+        Example: Show first messages quickly and fetch the rest in bigger pages::
+
+            for message in api.with_options(adaptive_page_size=True).list_messages(size=25):
+                print(message['id'])
+        """
+        for name in options:
+            if name not in self._call_options:
+                raise ValueError('Invalid option "%s". Valid options are %s' % (name, ', '.join(self._call_options)))
+        client = copy.copy(self)
+        client._owns_transport = False
+        for name, value in options.items():
+            setattr(client, name, value)
+        return client
+
+    @property
+    def connection_pool(self):
+        return getattr(self.transport, 'connection_pool', None)
+
+    def close(self):
+        """
+        Close pooled connections of the client (a shared transport or connection pool passed to
+        the constructor stays open)
+
+        Example: Close the client::
+
+            api.close()
+        """
+        if self._owns_transport:
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _build_request(self, method, url, *args, **kwargs):
+        user_agent = 'PythonSDK_' + version
+        headers = kwargs.pop('headers', None)
+        if headers:
+            headers['User-Agent'] = user_agent
+        else:
+            headers = {
+                'User-Agent': user_agent
+            }
+        url = self._get_absolute_url(url)
+        kwargs['auth'] = self.auth
+        kwargs['headers'] = headers
+        options = {}
+        for name in ('rate_limit_wait', 'idempotency_key'):
+            if getattr(self, name) is not None:
+                options[name] = getattr(self, name)
+        return TransportRequest(method, url, args, kwargs, self.api_family, options or None)
+
+    def _get_absolute_url(self, url):
+        if url.startswith('/'):
+            # relative url
+            url = '%s/%s%s' % (self.api_endpoint, self.api_version, url)
+        return url
+
+    def _request(self, method, url, *args, **kwargs):
+        return self.transport.request(self._build_request(method, url, *args, **kwargs))
+
+    def _check_response(self, response):
+        if response.status_code >= 400:
+            if response.headers.get('content-type') is not None and \
+                    response.headers.get('content-type').startswith("application/json"):
+                data = self._decode_json(response)
+                raise self.exception_class(
+                    response.status_code, data['message'], code=data.get('code'))
+            else:
+                raise self.exception_class(
+                    response.status_code, response.content.decode('utf-8')[:79])
+
+    def _decode_json(self, response):
+        # the body is decoded from bytes without conversion to text
+        return self.json_codec.loads(response.content)
+
+    def _convert_data(self, data):
+        if self.lazy_snake_case:
+            return snake_case_view(data)
+        return convert_object_to_snake_case(data)
+
+    def _call_with_streamed_items(self, func):
+        # requests made by func in this thread return streamed items of json arrays
+        self._local.stream_items = True
+        try:
+            return func()
+        finally:
+            self._local.stream_items = False
+
+    def _lookup(self, name, resource_id, load):
+        # results differ in raw and lazy_snake_case modes, so the modes are a part of the key
+        if self.lookup_cache is None:
+            return load()
+        key = (name, self.user_id, resource_id, (self.raw, self.lazy_snake_case))
+        return self.lookup_cache.lookup(key, load)
+
+    def _invalidate_lookup(self, name, resource_id):
+        if self.lookup_cache is not None:
+            self.lookup_cache.invalidate(name, self.user_id, resource_id)
+
+    def _make_request(self, method, url, *args, **kwargs):
+        raw = kwargs.pop('raw', None)
+        if raw is None:
+            raw = self.raw
+        stream_items = kwargs.pop('stream_items', None)
+        if stream_items is None:
+            stream_items = getattr(self._local, 'stream_items', False)
+        stream_items = stream_items and raw != 'bytes'
+        if self.http_cache is None or stream_items:
+            return self._make_uncached_request(method, url, raw, stream_items, args, kwargs)
+        absolute_url = self._get_absolute_url(url)
+        if method.lower() != 'get':
+            # changed resource is fetched again on next get
+            self.http_cache.invalidate(absolute_url)
+            return self._make_uncached_request(method, url, raw, stream_items, args, kwargs)
+        params = tuple(sorted((k, str(v)) for k, v in (kwargs.get('params') or {}).items() if v is not None))
+        key = (self.user_id, absolute_url, params, raw, self.lazy_snake_case)
+
+        def make_request(validation_headers):
+            request_kwargs = kwargs
+            if validation_headers:
+                request_kwargs = dict(kwargs)
+                request_kwargs['headers'] = dict(kwargs.get('headers') or {}, **validation_headers)
+            return self._make_uncached_request(method, url, raw, stream_items, args, request_kwargs)
+        return self.http_cache.request(key, absolute_url, make_request)
+
+    def _make_uncached_request(self, method, url, raw, stream_items, args, kwargs):
+        if stream_items:
+            kwargs['stream'] = True
+        response = self._request(method, url, *args, **kwargs)
+        self._check_response(response)
+        data = None
+        id = None
+        if response.headers.get('content-type') is not None and \
+                response.headers.get('content-type').startswith("application/json"):
+            if raw == 'bytes':
+                data = response.content
+            elif stream_items:
+                data = StreamedItems(response, None if raw else self._convert_data)
+            elif raw:
+                data = self._decode_json(response)
+            else:
+                data = self._convert_data(self._decode_json(response))
+        elif stream_items:
+            response.close()
+        location = response.headers.get('location')
+        if location is not None:
+            id = location.split('/')[-1]
+        return (data, response, id)
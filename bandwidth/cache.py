@@ -0,0 +1,195 @@
+import threading
+import time
+from collections import OrderedDict
+from six.moves.urllib.parse import urlsplit
+
+DEFAULT_MAX_ENTRIES = 1000
+
+
+def _copy_data(data):
+    # cached dictionaries and lists are copied for each caller, read-only views and scalars are shared
+    if isinstance(data, dict):
+        return dict((k, _copy_data(v)) for k, v in data.items())
+    elif isinstance(data, list):
+        return [_copy_data(v) for v in data]
+    return data
+
+
+def get_resource_name(url):
+    """
+    Returns name of api resource of an url (first path segment after api version and user id)
+    :type url: str
+    :param url: absolute url of an api resource
+
+    :rtype: str
+    :returns: resource name (like 'applications' or 'phoneNumbers')
+
+    Example::
+
+        get_resource_name('https://api.catapult.inetwork.com/v1/users/u-123/applications/a-123')
+        ## 'applications'
+    """
+    segments = [s for s in urlsplit(url).path.split('/') if s]
+    if segments and segments[0].startswith('v') and segments[0][1:].isdigit():
+        segments = segments[1:]
+    if len(segments) > 2 and segments[0] == 'users':
+        segments = segments[2:]
+    return segments[0] if segments else ''
+
+
+class _CacheEntry(object):
+
+    __slots__ = ('data', 'response', 'etag', 'last_modified', 'expires')
+
+    def __init__(self, data, response, etag, last_modified, expires):
+        self.data = data
+        self.response = response
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+
+
+class HttpCache(object):
+
+    """
+    Cache of GET responses which are revalidated with ETag and Last-Modified validators.
+
+    While an entry is fresh (its ttl is not expired) it is returned without requests. After that a conditional
+    request (If-None-Match, If-Modified-Since) is made and the cached data is returned on "304 Not Modified",
+    so neither the body is downloaded nor json is parsed and converted. The cache is bounded, least recently used
+    entries are evicted. It is safe to share one cache between threads and clients.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=0, ttl_overrides=None):
+        """
+        Initialize the cache.
+
+        :type max_entries: int
+        :param max_entries: max number of cached responses (optional, default value is 1000)
+        :type ttl: float
+        :param ttl: seconds during which a cached response is used without revalidation
+            (optional, default value is 0 - every use is revalidated)
+        :type ttl_overrides: dict
+        :param ttl_overrides: ttl of resources by their names (like {'applications': 300, 'conferences': 0}),
+            None value disables caching of a resource (optional)
+
+        :rtype: bandwidth.cache.HttpCache
+        :returns: http cache
+
+        Example: Cache applications and phone numbers for 5 minutes and revalidate other resources::
+
+            cache = HttpCache(max_entries=500, ttl_overrides={'applications': 300, 'phoneNumbers': 300})
+            api = bandwidth.client('account', 'u-user', 't-token', 's-secret', http_cache=cache)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.ttl_overrides = dict(ttl_overrides or {})
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_ttl(self, url):
+        """
+        Returns ttl of an url (None if the url is not cached)
+        """
+        return self.ttl_overrides.get(get_resource_name(url), self.ttl)
+
+    def get(self, key):
+        """
+        Returns cached entry and moves it to the end of LRU order
+
+        :rtype: tuple
+        :returns: (data, response, fresh, validation headers) or None for missing entry
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._entries[key] = entry
+            headers = {}
+            if entry.etag is not None:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified is not None:
+                headers['If-Modified-Since'] = entry.last_modified
+            return entry.data, entry.response, time.time() < entry.expires, headers
+
+    def put(self, key, url, data, response):
+        """
+        Stores data of a response which has validators (or a ttl), entries over max_entries are evicted
+        """
+        ttl = self.get_ttl(url)
+        etag = response.headers.get('etag')
+        last_modified = response.headers.get('last-modified')
+        if ttl is None or (etag is None and last_modified is None and not ttl):
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = _CacheEntry(data, response, etag, last_modified, time.time() + ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key, url, response):
+        """
+        Extends life of an entry confirmed by "304 Not Modified" response
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires = time.time() + (self.get_ttl(url) or 0)
+                entry.etag = response.headers.get('etag', entry.etag)
+                entry.last_modified = response.headers.get('last-modified', entry.last_modified)
+
+    def invalidate(self, url=None):
+        """
+        Remove cached entries of an url (all entries if url is None)
+
+        :type url: str
+        :param url: absolute url of an api resource (optional)
+        """
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[1] == url]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def request(self, key, url, make_request):
+        """
+        Serves GET request from the cache or makes (conditional) request
+
+        :type key: tuple
+        :param key: key of the request (its first items should be user and url)
+        :type url: str
+        :param url: absolute url of the request
+        :type make_request: types.FunctionType
+        :param make_request: function which gets extra headers of the request (or None) and returns
+            tuple (data, response, id)
+
+        :rtype: tuple
+        :returns: (data, response, id)
+        """
+        if self.get_ttl(url) is None:
+            return make_request(None)
+        cached = self.get(key)
+        if cached is not None and cached[2]:
+            self._count('hits')
+            return _copy_data(cached[0]), cached[1], None
+        data, response, id = make_request(cached[3] if cached is not None else None)
+        if response.status_code == 304 and cached is not None:
+            self._count('revalidations')
+            self.refresh(key, url, response)
+            return _copy_data(cached[0]), cached[1], id
+        self._count('misses')
+        if response.status_code == 200:
+            self.put(key, url, data, response)
+            data = _copy_data(data)
+        return data, response, id
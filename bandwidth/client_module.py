@@ -15,6 +15,7 @@ def client(client_name, *args, **kwargs):
     :param str api_endpoint: catapult api endpoint
         (optional, default value is https://api.catapult.inetwork.com, for 'catapult' only)
     :param str api_version: catapult api version (optional, default value is v1, for 'catapult' only)
+    :param bandwidth.transport.BaseTransport transport: transport to share between clients (optional)
 
 
     :rtype: bandwidth.catapult.Client
@@ -28,6 +29,14 @@ def client(client_name, *args, **kwargs):
 
     >>> messaging_api = bandwidth.client('messaging', 'YOUR_USER_ID', 'YOUR_API_TOKEN', 'YOUR_API_SECRET')
 
+    :Example: Create clients which share pooled connections and middlewares
+
+    >>> transport = bandwidth.Transport()
+
+    >>> voice_api = bandwidth.client('voice', 'YOUR_USER_ID', 'YOUR_TOKEN', 'YOUR_SECRET', transport=transport)
+
+    >>> account_api = bandwidth.client('account', 'YOUR_USER_ID', 'YOUR_TOKEN', 'YOUR_SECRET', transport=transport)
+
     """
 
     global _client_classes
@@ -0,0 +1,121 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from bandwidth.json_codec import get_codec
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_MAX_PER_HOST = 10
+DEFAULT_POOL_IDLE_TIMEOUT = 60
+
+
+class _JsonCodecSession(requests.Session):
+
+    """
+    Session which encodes json bodies of requests with a json codec
+    """
+
+    def __init__(self, json_codec):
+        super(_JsonCodecSession, self).__init__()
+        self.json_codec = json_codec
+
+    def prepare_request(self, request):
+        if request.json is not None and not request.data and not request.files:
+            headers = CaseInsensitiveDict(request.headers or {})
+            headers.setdefault('Content-Type', 'application/json')
+            request.headers = headers
+            request.data = self.json_codec.dumps(request.json)
+            request.json = None
+        return super(_JsonCodecSession, self).prepare_request(request)
+
+
+class ConnectionPool(object):
+
+    """
+    Pool of keep-alive HTTP connections reused by all requests of a client.
+
+    The pool wraps a ``requests.Session`` so TCP and TLS handshakes are made once per connection
+    instead of once per api call. It is safe to share one pool between threads (and clients).
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, max_per_host=DEFAULT_POOL_MAX_PER_HOST,
+                 idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT, json_codec=None):
+        """
+        Initialize the connection pool.
+
+        :type pool_size: int
+        :param pool_size: number of hosts to keep connection pools for (optional, default value is 10)
+        :type max_per_host: int
+        :param max_per_host: max number of kept-alive connections to single host (optional, default value is 10)
+        :type idle_timeout: float
+        :param idle_timeout: seconds after which unused connections are dropped instead of reused
+            (optional, default value is 60, None disables the check)
+        :type json_codec: str or bandwidth.json_codec.JsonCodec
+        :param json_codec: codec to encode json bodies of requests (optional, default value is the fastest
+            installed codec)
+
+        :rtype: bandwidth.connection_pool.ConnectionPool
+        :returns: connection pool
+
+        Example: Share one pool between several clients::
+
+            pool = ConnectionPool(pool_size=4, max_per_host=50)
+            voice_api = bandwidth.client('voice', 'u-user', 't-token', 's-secret', connection_pool=pool)
+            messaging_api = bandwidth.client('messaging', 'u-user', 't-token', 's-secret', connection_pool=pool)
+        """
+        self.pool_size = pool_size
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.session = _JsonCodecSession(get_codec(json_codec))
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=max_per_host)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._last_used = time.time()
+        self.closed = False
+
+    def _acquire(self):
+        with self._lock:
+            if self.closed:
+                raise ValueError('Connection pool is closed')
+            now = time.time()
+            if self.idle_timeout is not None and self._in_flight == 0 and \
+                    now - self._last_used > self.idle_timeout:
+                # connections idle for too long are likely dropped by the server side
+                self.adapter.poolmanager.clear()
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._last_used = time.time()
+
+    def request(self, method, url, *args, **kwargs):
+        """
+        Make http request using pooled connections (arguments are the same as for ``requests.request``)
+
+        :rtype: requests.Response
+        :returns: http response
+        """
+        self._acquire()
+        try:
+            return self.session.request(method, url, *args, **kwargs)
+        finally:
+            self._release()
+
+    def close(self):
+        """
+        Close all pooled connections. The pool can't be used after that.
+        """
+        with self._lock:
+            if not self.closed:
+                self.closed = True
+                self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,4 +1,14 @@
 import re
+try:
+    from collections.abc import Mapping, Sequence
+except ImportError:
+    from collections import Mapping, Sequence
+
+_CAMEL_CASE_PATTERN = re.compile('((?<=[a-z0-9])[A-Z]|(?!^)[A-Z](?=[a-z]))')
+
+# api responses use few dozens of distinct keys, so converted keys are cached (the cache is reset when it is full)
+KEY_CACHE_SIZE = 4096
+_key_cache = {}
 
 
 def convert_string_to_snake_case(s):
@@ -8,8 +18,22 @@ def convert_string_to_snake_case(s):
     :rtype: String
     :rertuns: String converted to snake_case
     """
-    a = re.compile('((?<=[a-z0-9])[A-Z]|(?!^)[A-Z](?=[a-z]))')
-    return a.sub(r'_\1', s).lower()
+    new_s = _key_cache.get(s)
+    if new_s is None:
+        new_s = _CAMEL_CASE_PATTERN.sub(r'_\1', s).lower()
+        if len(_key_cache) >= KEY_CACHE_SIZE:
+            _key_cache.clear()
+        _key_cache[s] = new_s
+    return new_s
+
+
+def _convert_value(v):
+    # single pass over the tree: only dicts and lists are rebuilt, other values are returned as is
+    if isinstance(v, dict):
+        return convert_dict_to_snake_case(v)
+    elif isinstance(v, list):
+        return convert_list_to_snake_case(v)
+    return v
 
 
 def convert_list_to_snake_case(a):
@@ -20,15 +44,7 @@ def convert_list_to_snake_case(a):
     :rtype: list
     :rertuns: list with each key converted to snake_case
     """
-    new_arr = []
-    for i in a:
-        if isinstance(i, list):
-            new_arr.append(convert_list_to_snake_case(i))
-        elif isinstance(i, dict):
-            new_arr.append(convert_dict_to_snake_case(i))
-        else:
-            new_arr.append(i)
-    return new_arr
+    return [_convert_value(i) for i in a]
 
 
 def convert_dict_to_snake_case(d):
@@ -39,15 +55,13 @@ def convert_dict_to_snake_case(d):
     :rtype: dict
     :rertuns: dictionary with each key converted to snake_case
     """
+    get_key = _key_cache.get
     out = {}
-    for k in d:
-        new_k = convert_string_to_snake_case(k)
-        if isinstance(d[k], dict):
-            out[new_k] = convert_dict_to_snake_case(d[k])
-        elif isinstance(d[k], list):
-            out[new_k] = convert_list_to_snake_case(d[k])
-        else:
-            out[new_k] = d[k]
+    for k, v in d.items():
+        new_k = get_key(k)
+        if new_k is None:
+            new_k = convert_string_to_snake_case(k)
+        out[new_k] = _convert_value(v)
     return out
 
 
@@ -67,3 +81,101 @@ def convert_object_to_snake_case(o):
         return convert_string_to_snake_case(o)
     else:
         return o
+
+
+class SnakeCaseDictView(Mapping):
+
+    """
+    Read-only snake_case view of a dictionary with camelCase keys.
+    Keys of the dictionary are converted on first access, nested dictionaries and lists are wrapped on access only.
+    The view is equal to the dictionary which would be returned by convert_dict_to_snake_case().
+    """
+
+    __slots__ = ('_data', '_keys')
+
+    def __init__(self, data):
+        self._data = data
+        self._keys = None
+
+    def _get_keys(self):
+        if self._keys is None:
+            self._keys = dict((convert_string_to_snake_case(k), k) for k in self._data)
+        return self._keys
+
+    def __getitem__(self, key):
+        return snake_case_view(self._data[self._get_keys()[key]])
+
+    def __iter__(self):
+        return iter(self._get_keys())
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def to_dict(self):
+        """
+        Converts the view to a plain dictionary
+
+        :rtype: dict
+        :returns: dictionary with keys converted to snake_case
+        """
+        return convert_dict_to_snake_case(self._data)
+
+
+class SnakeCaseListView(Sequence):
+
+    """
+    Read-only view of a list whose dictionaries are presented as snake_case views
+    """
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SnakeCaseListView(self._data[index])
+        return snake_case_view(self._data[index])
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, tuple, SnakeCaseListView)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.to_list())
+
+    def to_list(self):
+        """
+        Converts the view to a plain list
+
+        :rtype: list
+        :returns: list with keys of nested dictionaries converted to snake_case
+        """
+        return convert_list_to_snake_case(self._data)
+
+
+def snake_case_view(o):
+    """
+    Wraps an object into read-only snake_case view without conversion of the whole object
+    :param o: Dictionary or Array of dictionaries to wrap
+    :rtype: bandwidth.convert_camel.SnakeCaseDictView
+    :rertuns: view for dictionaries and lists, other values are returned as is
+    """
+    if isinstance(o, dict):
+        return SnakeCaseDictView(o)
+    elif isinstance(o, list):
+        return SnakeCaseListView(o)
+    return o
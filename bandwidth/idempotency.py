@@ -0,0 +1,199 @@
+import threading
+import uuid
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from six.moves.urllib.parse import urlsplit
+
+from bandwidth.cache import get_resource_name
+from bandwidth.lookup_cache import LookupCache
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 100000
+
+# name of entries of the dedupe table
+IDEMPOTENCY = 'idempotency'
+# option of a request whose idempotency key is generated by the middleware
+GENERATED_KEY_OPTION = 'idempotency_key_generated'
+
+# resources whose POST creates a message, a call or orders a phone number
+CREATE_RESOURCES = ('messages', 'calls', 'phoneNumbers')
+
+# headers of a create response which are kept in the dedupe table
+_SAVED_HEADERS = ('location', 'content-type')
+
+
+def new_idempotency_key():
+    """
+    Returns new random idempotency key
+    """
+    return uuid.uuid4().hex
+
+
+def get_idempotency_key(request):
+    """
+    Returns idempotency key of a request (None if the request has no key)
+
+    :type request: bandwidth.transport.TransportRequest
+    :param request: request
+    """
+    headers = request.kwargs.get('headers') or {}
+    for name, value in headers.items():
+        if name.lower() == IDEMPOTENCY_HEADER.lower():
+            return value
+    return None
+
+
+def is_create_request(request, resources=CREATE_RESOURCES):
+    """
+    Returns True for POST to a collection of resources (like POST /users/u-user/messages)
+    """
+    if request.method.upper() != 'POST':
+        return False
+    resource = get_resource_name(request.url)
+    return resource in resources and urlsplit(request.url).path.rstrip('/').endswith('/' + resource)
+
+
+def _create_response(request, saved):
+    response = requests.Response()
+    response.status_code = saved['status']
+    response.url = request.url
+    response.headers = CaseInsensitiveDict(saved['headers'])
+    response._content = saved['content'].encode('utf-8')
+    return response
+
+
+class IdempotencyKeys(object):
+
+    """
+    Transport middleware which makes creates of messages, calls and phone numbers safe to repeat.
+
+    Each POST create gets the key passed with client.with_options(idempotency_key=...) or a generated key in
+    Idempotency-Key header, so the request keeps its key through all retries. The key of the caller is used for
+    creates only (other POST requests of the client are sent without it).
+
+    Creates with keys of the caller are repeated safely: bandwidth.retry.RetryPolicy retries them on any transient
+    failure like idempotent requests, the status, location and body of a successful create are kept in a dedupe
+    table by the key and a create repeated with the same key (like a replayed entry of bandwidth.outbox.Outbox
+    whose acknowledgement was lost) returns the id of the first create without a request. Concurrent creates with
+    the same key wait for the first one. An attempt whose response was lost (like a read timeout) is not in
+    the table, its retry carries the same key for the api to recognize it.
+
+    Generated keys are not saved (nobody can repeat them) and don't change retries unless the retry policy
+    has retry_unsafe_posts.
+
+    The dedupe table is a bandwidth.lookup_cache.LookupCache, a persistent store keeps it across restarts.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, store=None, resources=CREATE_RESOURCES,
+                 generate=True):
+        """
+        Initialize the middleware.
+
+        :type ttl: float
+        :param ttl: seconds during which a create is resolved by its key (optional, default value is 1 day)
+        :type max_entries: int
+        :param max_entries: max number of keys in memory (optional, default value is 100000)
+        :type store: bandwidth.lookup_store.LookupStore
+        :param store: persistent store of the dedupe table (optional)
+        :type resources: tuple
+        :param resources: resources whose creates get idempotency keys (optional, default value is
+            ('messages', 'calls', 'phoneNumbers'))
+        :type generate: bool
+        :param generate: False to add keys which are passed by the caller only (optional, default value is True)
+
+        :rtype: bandwidth.idempotency.IdempotencyKeys
+        :returns: middleware
+
+        Example: Retry creates on any transient failure when the api deduplicates them by generated keys::
+
+            api = bandwidth.client('voice', 'u-user', 't-token', 's-secret', idempotency=True,
+                                   retry=RetryPolicy(retry_unsafe_posts=True))
+
+        Example: Resolve a repeated create of an order to its first message::
+
+            keys = IdempotencyKeys(store=SqliteLookupStore('/var/lib/myapp/idempotency.db'))
+            api = bandwidth.client('messaging', 'u-user', 't-token', 's-secret', idempotency=keys)
+            message_id = api.with_options(idempotency_key='order-%s' % order.id).send_message(...)
+        """
+        self.table = LookupCache(ttl=ttl, max_entries=max_entries, store=store)
+        self.resources = tuple(resources)
+        self.generate = generate
+        self.requests = 0
+        self.deduplicated = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def prepare(self, request):
+        """
+        Adds idempotency key to a create request
+
+        :type request: bandwidth.transport.TransportRequest
+        :param request: request
+
+        :rtype: tuple
+        :returns: key of the dedupe table or None if the request has no idempotency key of the caller
+        """
+        if request.method.upper() != 'POST':
+            return None
+        key = get_idempotency_key(request)
+        if key is None:
+            if not is_create_request(request, self.resources):
+                return None
+            key = request.options.get('idempotency_key')
+            if key is None:
+                if not self.generate:
+                    return None
+                key = new_idempotency_key()
+                request.options[GENERATED_KEY_OPTION] = True
+            request.kwargs['headers'] = dict(request.kwargs.get('headers') or {}, **{IDEMPOTENCY_HEADER: key})
+        if request.options.get(GENERATED_KEY_OPTION):
+            return None
+        return (IDEMPOTENCY, request.family or '', key, request.url)
+
+    def get_response(self, request, key):
+        """
+        Returns saved response of the first create with the key (None if there is no such create)
+        """
+        saved = self.table.get(key)
+        if saved is None:
+            return None
+        with self._lock:
+            self.deduplicated += 1
+        return _create_response(request, saved[0])
+
+    def save_response(self, key, response):
+        """
+        Saves response of a successful create
+        """
+        with self._lock:
+            self.requests += 1
+        if 200 <= response.status_code < 300:
+            headers = dict((name, response.headers[name]) for name in _SAVED_HEADERS if name in response.headers)
+            self.table.put(key, {'status': response.status_code, 'headers': headers,
+                                 'content': (response.content or b'').decode('utf-8')})
+
+    def __call__(self, request, send):
+        key = self.prepare(request)
+        if key is None:
+            return send(request)
+        while True:
+            response = self.get_response(request, key)
+            if response is not None:
+                return response
+            with self._lock:
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = self._flights[key] = threading.Event()
+                    break
+            # the first create with the key is in progress
+            flight.wait()
+        try:
+            response = send(request)
+            self.save_response(key, response)
+            return response
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.set()
@@ -0,0 +1,168 @@
+"""
+Json codecs used by api clients to encode request bodies and to decode response bodies.
+
+The fastest installed backend is used by default: ``orjson`` (``pip install bandwidth-sdk[fast-json]``),
+then ``ujson`` and standard ``json`` module as a fallback. Codecs work with bytes, so response bodies are
+decoded without an intermediate text copy.
+"""
+import json
+
+import six
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JsonCodec(object):
+
+    """
+    Base class of json codecs
+    """
+
+    name = None
+
+    def dumps(self, data):
+        """
+        Encode data to json
+
+        :param data: data to encode
+        :rtype: bytes
+        :returns: utf-8 encoded json
+        """
+        raise NotImplementedError()
+
+    def loads(self, content):
+        """
+        Decode json
+
+        :type content: bytes
+        :param content: utf-8 encoded json
+        :returns: decoded data
+        """
+        raise NotImplementedError()
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, self.name)
+
+
+class StdlibJsonCodec(JsonCodec):
+
+    """
+    Codec which uses standard json module
+    """
+
+    name = 'json'
+
+    def dumps(self, data):
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, content):
+        # python 3.6+ decodes bytes directly
+        if six.PY3 and isinstance(content, bytes) and not hasattr(json, 'detect_encoding'):
+            content = content.decode('utf-8')
+        return json.loads(content)
+
+
+class OrjsonCodec(JsonCodec):
+
+    """
+    Codec which uses orjson. Data which orjson can't encode or decode (like integers bigger than 64 bits) is
+    handled by standard json module.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError('Codec "orjson" requires orjson. Use "pip install bandwidth-sdk[fast-json]"')
+        self._fallback = StdlibJsonCodec()
+
+    def dumps(self, data):
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            return self._fallback.dumps(data)
+
+    def loads(self, content):
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return self._fallback.loads(content)
+
+
+class UjsonCodec(JsonCodec):
+
+    """
+    Codec which uses ujson
+    """
+
+    name = 'ujson'
+
+    def __init__(self):
+        if ujson is None:
+            raise ImportError('Codec "ujson" requires ujson. Use "pip install ujson"')
+
+    def dumps(self, data):
+        return ujson.dumps(data, ensure_ascii=False, escape_forward_slashes=False).encode('utf-8')
+
+    def loads(self, content):
+        return ujson.loads(content)
+
+
+_codec_classes = {
+    'json': StdlibJsonCodec,
+    'orjson': OrjsonCodec,
+    'ujson': UjsonCodec
+}
+
+_default_codec = None
+
+
+def get_default_codec():
+    """
+    Returns codec of the fastest installed json library
+
+    :rtype: bandwidth.json_codec.JsonCodec
+    :returns: json codec
+    """
+    global _default_codec
+    if _default_codec is None:
+        if orjson is not None:
+            _default_codec = OrjsonCodec()
+        elif ujson is not None:
+            _default_codec = UjsonCodec()
+        else:
+            _default_codec = StdlibJsonCodec()
+    return _default_codec
+
+
+def get_codec(codec=None):
+    """
+    Returns json codec
+
+    :type codec: str or bandwidth.json_codec.JsonCodec
+    :param codec: codec or its name ('json', 'orjson', 'ujson'), None for the fastest installed codec
+
+    :rtype: bandwidth.json_codec.JsonCodec
+    :returns: json codec
+
+    Example: Use standard json module::
+
+        api = bandwidth.client('messaging', 'u-user', 't-token', 's-secret', json_codec='json')
+    """
+    if codec is None:
+        return get_default_codec()
+    if isinstance(codec, JsonCodec):
+        return codec
+    codec_class = _codec_classes.get(codec)
+    if codec_class is None:
+        raise ValueError('Invalid json codec "%s". Supported codecs are %s' % (
+            codec, ', '.join(sorted(_codec_classes))))
+    return codec_class()
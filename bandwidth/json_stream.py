@@ -0,0 +1,111 @@
+import codecs
+import json
+
+# size of chunks of response body read at once
+DEFAULT_CHUNK_SIZE = 65536
+
+_WHITESPACE = ' \t\n\r'
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(chunks, encoding='utf-8'):
+    """
+    Parses json array from chunks of bytes incrementally and yields its items as soon as they are decoded.
+    Only the text of items which are not decoded yet is kept in memory.
+
+    :type chunks: collections.Iterable
+    :param chunks: chunks of bytes (like response.iter_content())
+    :type encoding: str
+    :param encoding: encoding of the text (optional, default value is utf-8)
+
+    :rtype: types.GeneratorType
+    :returns: items of the array
+
+    Example::
+
+        list(iter_json_array([b'[{"id": 1}, {"i', b'd": 2}]']))
+        ## [{'id': 1}, {'id': 2}]
+    """
+    decoder = codecs.getincrementaldecoder(encoding)('replace')
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+    started = False
+    finished = False
+    while True:
+        # skip separators between items
+        while pos < len(buffer) and (buffer[pos] in _WHITESPACE or (started and buffer[pos] == ',')):
+            pos += 1
+        if pos < len(buffer):
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError('Json array is expected')
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except ValueError:
+                end = None
+            # a number at the end of the buffer may be incomplete, so a value is accepted when text follows it
+            if end is not None and (end < len(buffer) or finished):
+                yield item
+                pos = end
+                continue
+            if finished:
+                raise ValueError('Invalid json array')
+        elif finished:
+            raise ValueError('Unexpected end of json array')
+        chunk = next(chunks, None)
+        buffer = buffer[pos:] + (decoder.decode(b'', True) if chunk is None else decoder.decode(chunk))
+        pos = 0
+        finished = chunk is None
+
+
+class StreamedItems(object):
+
+    """
+    Items of a page which are decoded from the response stream on iteration. They can be iterated once.
+    """
+
+    def __init__(self, response, convert_item=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        :type response: requests.Response
+        :param response: streamed response with json array
+        :type convert_item: types.FunctionType
+        :param convert_item: function to apply to each decoded item (optional)
+        :type chunk_size: int
+        :param chunk_size: size of chunks read from the stream (optional, default value is 65536)
+        """
+        self.response = response
+        self.convert_item = convert_item
+        self.chunk_size = chunk_size
+        self.count = 0
+        self.complete = False
+        self._items = self._iterate()
+
+    def _iterate(self):
+        try:
+            for item in iter_json_array(self.response.iter_content(self.chunk_size), self.response.encoding or 'utf-8'):
+                self.count += 1
+                yield item if self.convert_item is None else self.convert_item(item)
+            self.complete = True
+        finally:
+            # the connection is released when the items are consumed or the iteration is stopped
+            self.response.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._items)
+
+    next = __next__
+
+    def close(self):
+        """
+        Stop decoding and release the connection
+        """
+        self._items.close()
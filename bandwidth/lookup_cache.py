@@ -0,0 +1,196 @@
+import threading
+import time
+from collections import OrderedDict
+from bandwidth.cache import _copy_data
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_TTL = 300
+
+# names of cached lookups
+NUMBER_INFO = 'numberInfo'
+APPLICATIONS = 'applications'
+PHONE_NUMBERS = 'phoneNumbers'
+DOMAINS = 'domains'
+
+
+class LookupCache(object):
+
+    """
+    In-memory cache of read-mostly lookups (number info, applications, phone numbers and domains).
+
+    Results of get_number_info(), get_application(), get_phone_number() and get_domain() are kept for a ttl and
+    returned without requests. The client drops cached results of a resource when it updates or deletes
+    the resource. The cache is bounded, least recently used entries are evicted. It is safe to share one cache
+    between threads and clients.
+
+    An optional persistent store (like bandwidth.lookup_store.SqliteLookupStore) sits behind the in-memory
+    entries: results missing in memory are taken from the store, loaded results are written to both tiers.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, ttl_overrides=None, store=None):
+        """
+        Initialize the cache.
+
+        :type ttl: float
+        :param ttl: seconds during which a result is returned from the cache (optional, default value is 300)
+        :type max_entries: int
+        :param max_entries: max number of cached results (optional, default value is 1000)
+        :type ttl_overrides: dict
+        :param ttl_overrides: ttl of lookups by their names ('numberInfo', 'applications', 'phoneNumbers',
+            'domains'), None value disables caching of a lookup (optional)
+        :type store: bandwidth.lookup_store.LookupStore
+        :param store: persistent store which keeps results across restarts and processes (optional)
+
+        :rtype: bandwidth.lookup_cache.LookupCache
+        :returns: lookup cache
+
+        Example: Keep CNAM information for a day and other lookups for 5 minutes::
+
+            cache = LookupCache(ttl=300, ttl_overrides={'numberInfo': 86400})
+            api = bandwidth.client('account', 'u-user', 't-token', 's-secret', lookup_cache=cache)
+
+        Example: Start workers with warm cache::
+
+            cache = LookupCache(store=SqliteLookupStore('/var/cache/myapp/bandwidth-lookups.db'))
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.ttl_overrides = dict(ttl_overrides or {})
+        self.store = store
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_ttl(self, name):
+        """
+        Returns ttl of a lookup (None if the lookup is not cached)
+        """
+        return self.ttl_overrides.get(name, self.ttl)
+
+    def get(self, key):
+        """
+        Returns fresh cached result and moves it to the end of LRU order
+
+        :type key: tuple
+        :param key: key of the lookup (name, user id, resource id, variant)
+
+        :rtype: tuple
+        :returns: tuple (result,) or None for missing or expired entry
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and time.time() < entry[1]:
+                self._entries[key] = entry
+                return (entry[0],)
+        if self.store is None:
+            return None
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+        self._put_entry(key, entry)
+        with self._lock:
+            self.store_hits += 1
+        return (entry[0],)
+
+    def put(self, key, result):
+        """
+        Stores result of a lookup, entries over max_entries are evicted
+        """
+        ttl = self.get_ttl(key[0])
+        if not ttl:
+            return
+        expires = time.time() + ttl
+        self._put_entry(key, (result, expires))
+        if self.store is not None:
+            self.store.put(key, result, expires)
+
+    def _put_entry(self, key, entry):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def lookup(self, key, load):
+        """
+        Returns cached result of a lookup or loads and stores it
+
+        :type key: tuple
+        :param key: key of the lookup (name, user id, resource id, variant)
+        :type load: types.FunctionType
+        :param load: function which makes the lookup
+
+        :returns: copy of the result
+        """
+        if self.get_ttl(key[0]) is None:
+            return load()
+        cached = self.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return _copy_data(cached[0])
+        result = load()
+        # a miss is counted when the lookup is done (a failed or interrupted lookup is not counted)
+        with self._lock:
+            self.misses += 1
+        self.put(key, result)
+        return _copy_data(result)
+
+    def invalidate(self, name=None, user_id=None, resource_id=None):
+        """
+        Remove cached results (of all lookups if name is None)
+
+        :type name: str
+        :param name: name of the lookup (optional)
+        :type user_id: str
+        :param user_id: user id (optional, all users if it is None)
+        :type resource_id: str
+        :param resource_id: id of the resource (optional, all resources if it is None)
+
+        Example: Drop cached applications::
+
+            cache.invalidate('applications')
+        """
+        pattern = (name, user_id, resource_id)
+        with self._lock:
+            keys = [key for key in self._entries
+                    if all(value is None or value == key[i] for i, value in enumerate(pattern))]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+        if self.store is not None:
+            self.store.invalidate(name, user_id, resource_id)
+
+    def clear(self):
+        """
+        Remove all cached results
+        """
+        self.invalidate()
+
+    def stats(self):
+        """
+        Returns statistics of the cache
+
+        :rtype: dict
+        :returns: dictionary with keys hits (store_hits of them are taken from the persistent store), misses,
+            evictions, invalidations, size and hit_ratio
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'store_hits': self.store_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'hit_ratio': float(self.hits) / total if total else 0.0
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,214 @@
+"""
+Persistent stores of lookup results which sit behind the in-memory bandwidth.lookup_cache.LookupCache.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from bandwidth.convert_camel import SnakeCaseDictView, SnakeCaseListView, snake_case_view
+
+# expired rows are removed by a put once per this number of seconds
+DEFAULT_COMPACT_INTERVAL = 60
+DEFAULT_MAX_ENTRIES = 100000
+# size of the database file which is read via memory mapping
+DEFAULT_MMAP_SIZE = 64 * 1024 * 1024
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS lookups (
+    name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (name, user_id, resource_id, variant)
+);
+CREATE INDEX IF NOT EXISTS lookups_expires ON lookups (expires);
+'''
+
+
+def _encode_result(result):
+    # returns tuple (kind, value), lazy snake_case views are stored as their camelCase data
+    if isinstance(result, bytes):
+        return 'bytes', result
+    if isinstance(result, (SnakeCaseDictView, SnakeCaseListView)):
+        return 'view', json.dumps(result._data).encode('utf-8')
+    return 'json', json.dumps(result).encode('utf-8')
+
+
+def _decode_result(kind, value):
+    value = bytes(value)
+    if kind == 'bytes':
+        return value
+    data = json.loads(value.decode('utf-8'))
+    return snake_case_view(data) if kind == 'view' else data
+
+
+class LookupStore(object):
+
+    """
+    Base class of persistent stores of lookup results. Keys are tuples (name, user id, resource id, variant).
+    """
+
+    def get(self, key):
+        """
+        Returns stored result which is not expired
+
+        :rtype: tuple
+        :returns: tuple (result, expires) or None
+        """
+        raise NotImplementedError()
+
+    def put(self, key, result, expires):
+        """
+        Stores result of a lookup until expires (unix time)
+        """
+        raise NotImplementedError()
+
+    def invalidate(self, name=None, user_id=None, resource_id=None):
+        """
+        Removes stored results (None values match any value)
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+class SqliteLookupStore(LookupStore):
+
+    """
+    Lookup store in a SQLite database file. The file survives restarts and is shared by processes on the same
+    host (the database uses write-ahead log, so readers don't wait for writers). Expired rows are removed
+    periodically, the oldest rows are removed when the store has more than max_entries rows. Threads of a process
+    share one connection.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, compact_interval=DEFAULT_COMPACT_INTERVAL,
+                 timeout=5.0, mmap_size=DEFAULT_MMAP_SIZE):
+        """
+        Initialize the store.
+
+        :type path: str
+        :param path: path of the database file (it is created if it doesn't exist)
+        :type max_entries: int
+        :param max_entries: max number of stored results (optional, default value is 100000)
+        :type compact_interval: float
+        :param compact_interval: seconds between removals of expired results (optional, default value is 60)
+        :type timeout: float
+        :param timeout: seconds to wait for a lock held by other process (optional, default value is 5)
+        :type mmap_size: int
+        :param mmap_size: bytes of the file which are read via memory mapping (optional, default value is 64 MiB)
+
+        :rtype: bandwidth.lookup_store.SqliteLookupStore
+        :returns: lookup store
+
+        Example: Keep CNAM information across restarts of workers::
+
+            store = SqliteLookupStore('/var/cache/myapp/bandwidth-lookups.db')
+            cache = LookupCache(ttl_overrides={'numberInfo': 86400}, store=store)
+            api = bandwidth.client('account', 'u-user', 't-token', 's-secret', lookup_cache=cache)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.compact_interval = compact_interval
+        self.timeout = timeout
+        self.mmap_size = mmap_size
+        self._connection = None
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._last_compact = time.time()
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.executescript(_SCHEMA)
+
+    def _get_connection(self):
+        # one connection of the process is used by all threads under the lock, so threads which exit
+        # don't leave connections open, a connection inherited by a forked process belongs to its parent
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._connection = None
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('PRAGMA mmap_size=%d' % int(self.mmap_size))
+            self._connection = connection
+        return self._connection
+
+    def get(self, key):
+        name, user_id, resource_id, variant = key
+        with self._lock:
+            row = self._get_connection().execute(
+                'SELECT kind, value, expires FROM lookups '
+                'WHERE name = ? AND user_id = ? AND resource_id = ? AND variant = ? AND expires > ?',
+                (name, str(user_id), str(resource_id), json.dumps(variant), time.time())).fetchone()
+        if row is None:
+            return None
+        return _decode_result(row[0], row[1]), row[2]
+
+    def put(self, key, result, expires):
+        name, user_id, resource_id, variant = key
+        kind, value = _encode_result(result)
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO lookups (name, user_id, resource_id, variant, kind, value, expires) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (name, str(user_id), str(resource_id), json.dumps(variant), kind, sqlite3.Binary(value),
+                     expires))
+        if time.time() - self._last_compact >= self.compact_interval:
+            self.compact(vacuum=False)
+
+    def invalidate(self, name=None, user_id=None, resource_id=None):
+        conditions = []
+        values = []
+        for column, value in (('name', name), ('user_id', user_id), ('resource_id', resource_id)):
+            if value is not None:
+                conditions.append('%s = ?' % column)
+                values.append(str(value))
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute(
+                    'DELETE FROM lookups' + (' WHERE ' + ' AND '.join(conditions) if conditions else ''), values)
+
+    def compact(self, vacuum=True):
+        """
+        Removes expired results and results over max_entries (which expire first)
+
+        :type vacuum: bool
+        :param vacuum: True to shrink the database file (optional, default value is True)
+
+        :rtype: int
+        :returns: number of removed results
+        """
+        self._last_compact = time.time()
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                removed = connection.execute('DELETE FROM lookups WHERE expires <= ?', (time.time(),)).rowcount
+                removed += connection.execute(
+                    'DELETE FROM lookups WHERE rowid IN (SELECT rowid FROM lookups ORDER BY expires DESC '
+                    'LIMIT -1 OFFSET ?)', (self.max_entries,)).rowcount
+            if vacuum:
+                connection.execute('VACUUM')
+        return removed
+
+    def __len__(self):
+        with self._lock:
+            return self._get_connection().execute('SELECT COUNT(*) FROM lookups').fetchone()[0]
+
+    def close(self):
+        """
+        Close the connection (a next call opens it again)
+        """
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
@@ -1,2 +1,4 @@
 from .client_module import Client
 from .api_exception_module import BandwidthMessageAPIException
+from .send_scheduler import SendScheduler
+from .batch_sender import BatchingSender
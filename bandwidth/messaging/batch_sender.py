@@ -0,0 +1,168 @@
+import threading
+import time
+from six.moves import queue
+
+from .api_exception_module import BandwidthMessageAPIException
+from .send_scheduler import ScheduledMessage
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_DELAY = 0.05
+DEFAULT_WORKERS = 2
+
+
+class BatchingSender(object):
+
+    """
+    Collects messages sent one by one (from many threads) and posts them in batches with
+    messaging.Client.send_messages(). A batch is sent when it has max_batch_size messages or when its oldest
+    message waits for max_delay seconds. Each caller gets its own message id (or error) from results of
+    the batch.
+    """
+
+    def __init__(self, client, max_batch_size=DEFAULT_BATCH_SIZE, max_delay=DEFAULT_MAX_DELAY,
+                 workers=DEFAULT_WORKERS):
+        """
+        Initialize the sender and start its threads.
+
+        :type client: bandwidth.messaging.Client
+        :param client: messaging client
+        :type max_batch_size: int
+        :param max_batch_size: max number of messages in one request (optional, default value is 100)
+        :type max_delay: float
+        :param max_delay: max seconds a message waits for other messages of its batch
+            (optional, default value is 0.05)
+        :type workers: int
+        :param workers: number of batches which can be sent at once (optional, default value is 2)
+
+        :rtype: bandwidth.messaging.batch_sender.BatchingSender
+        :returns: batching sender
+
+        Example: Send messages from request handlers::
+
+            sender = BatchingSender(api, max_delay=0.02)
+
+            def handle(request):
+                message_id = sender.send_message(from_='+1234567980', to=request.phone, text='Hello').wait()
+
+            ...
+            sender.close()
+        """
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.batches = 0
+        self.sent = 0
+        self.failed = 0
+        self._pending = []
+        self._flushing = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._batches = queue.Queue(workers)
+        self._threads = [threading.Thread(target=self._collect, name='bandwidth-batch-collector')]
+        for i in range(workers):
+            self._threads.append(threading.Thread(target=self._work, name='bandwidth-batch-%d' % i))
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+    def send_message(self, from_, to, **kwargs):
+        """
+        Adds a message to the current batch
+
+        :param str ``from_``: One of your telephone numbers the message should come from
+        :param str to: The phone number the message should be sent to
+        :param kwargs: other arguments of messaging.Client.send_message() (text, media, tag, etc)
+
+        :rtype: bandwidth.messaging.send_scheduler.ScheduledMessage
+        :returns: message whose wait() returns id of the sent message
+        """
+        scheduled = ScheduledMessage(dict(kwargs, from_=from_, to=to))
+        data = self.client._build_message(from_, to, **kwargs)
+        with self._condition:
+            if self._closed:
+                raise ValueError('Sender is closed')
+            self._pending.append((scheduled, data, time.time()))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                self._condition.notify_all()
+        return scheduled
+
+    def flush(self):
+        """
+        Sends collected messages without waiting for max_delay
+        """
+        with self._condition:
+            self._flushing = True
+            self._condition.notify_all()
+
+    def _take_batch(self):
+        # returns next batch or None when the sender is closed and all messages are taken
+        with self._condition:
+            while True:
+                if self._pending:
+                    wait = self._pending[0][2] + self.max_delay - time.time()
+                    if wait <= 0 or self._flushing or self._closed or len(self._pending) >= self.max_batch_size:
+                        batch = self._pending[:self.max_batch_size]
+                        del self._pending[:self.max_batch_size]
+                        self._flushing = self._flushing and bool(self._pending)
+                        return batch
+                    self._condition.wait(wait)
+                elif self._closed:
+                    return None
+                else:
+                    self._flushing = False
+                    self._condition.wait()
+
+    def _collect(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                break
+            # it blocks while all workers are busy, so next batch grows meanwhile
+            self._batches.put(batch)
+        for _ in self._threads[1:]:
+            self._batches.put(None)
+
+    def _work(self):
+        while True:
+            batch = self._batches.get()
+            if batch is None:
+                return
+            try:
+                results = self.client.send_messages([data for _, data, _ in batch])
+            except Exception as err:
+                results = None
+                error = err
+            sent = 0
+            for i, (scheduled, _, _) in enumerate(batch):
+                scheduled.attempts += 1
+                if results is None:
+                    scheduled._finish(error=error)
+                    continue
+                result = results[i]
+                if result.get('result') == 'accepted':
+                    sent += 1
+                    scheduled._finish(result['id'])
+                else:
+                    info = result.get('error') or {}
+                    scheduled._finish(error=BandwidthMessageAPIException(
+                        400, info.get('message', 'Message is not accepted'), code=info.get('code')))
+            with self._condition:
+                self.batches += 1
+                self.sent += sent
+                self.failed += len(batch) - sent
+
+    def close(self):
+        """
+        Stops accepting of messages and waits until all collected messages are sent
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
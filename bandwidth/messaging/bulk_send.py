@@ -0,0 +1,166 @@
+import itertools
+import threading
+from six.moves import queue
+
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_WORKERS = 4
+
+
+def iter_chunks(iterable, size):
+    """
+    Splits iterable into lists of given size (the last list may be shorter). Items are read on demand.
+
+    :type iterable: collections.Iterable
+    :param iterable: items
+    :type size: int
+    :param size: size of chunks
+
+    :rtype: types.GeneratorType
+    :returns: chunks
+
+    Example::
+
+        list(iter_chunks(range(5), 2))
+        ## [[0, 1], [2, 3], [4]]
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _create_error_results(chunk, error):
+    # results of messages of a chunk whose request failed
+    info = {'message': str(error), 'code': getattr(error, 'code', None)}
+    return [{'result': 'error', 'error': info, 'exception': error, 'id': None, 'message': message}
+            for message in chunk]
+
+
+class _ChunkWorkers(object):
+
+    """
+    Worker threads which send chunks and pass their results to the queue
+    """
+
+    def __init__(self, send_chunk, workers):
+        self.send_chunk = send_chunk
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+        self.threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name='bandwidth-bulk-send-%d' % i)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def _work(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                return
+            index, chunk = task
+            try:
+                results = self.send_chunk(chunk)
+            except Exception as err:
+                results = _create_error_results(chunk, err)
+            self.results.put((index, results))
+
+    def stop(self):
+        # chunks which are not taken by workers yet are not sent
+        while True:
+            try:
+                self.tasks.get_nowait()
+            except queue.Empty:
+                break
+        for _ in self.threads:
+            self.tasks.put(None)
+
+
+class BulkSend(object):
+
+    """
+    Iterator over results of messages which are sent by chunks concurrently. Messages are read from the input
+    only when a worker can take them and at most 2 * workers chunks are in memory at once, so the input can be
+    a generator of any length. Results with 'result' = 'unknown' (messages which may be sent) are counted
+    in unknown, not in failed.
+    """
+
+    def __init__(self, send_chunk, messages, chunk_size=DEFAULT_CHUNK_SIZE, workers=DEFAULT_WORKERS, ordered=True):
+        """
+        :type send_chunk: types.FunctionType
+        :param send_chunk: function which sends a list of messages and returns list of their results
+        :type messages: collections.Iterable
+        :param messages: messages to send
+        :type chunk_size: int
+        :param chunk_size: number of messages in one request (optional, default value is 100)
+        :type workers: int
+        :param workers: number of concurrent requests (optional, default value is 4)
+        :type ordered: bool
+        :param ordered: True to return results in order of messages, False to return results of chunks as soon
+            as they are sent (optional, default value is True)
+        """
+        self.send_chunk = send_chunk
+        self.messages = messages
+        self.chunk_size = chunk_size
+        self.workers = max(1, workers)
+        self.ordered = ordered
+        self.sent = 0
+        self.failed = 0
+        self.unknown = 0
+        self._items = self._iterate()
+
+    def _iterate(self):
+        # the workers don't refer to the iterator, so an abandoned iterator is collected and stops them
+        workers = _ChunkWorkers(self.send_chunk, self.workers)
+        max_chunks = 2 * self.workers
+        chunks = iter_chunks(self.messages, self.chunk_size)
+        try:
+            submitted = 0
+            done = 0
+            exhausted = False
+            completed = {}
+            while True:
+                # chunks are read while results of not more than max_chunks chunks are pending
+                while not exhausted and submitted - done < max_chunks:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                    else:
+                        workers.tasks.put((submitted, chunk))
+                        submitted += 1
+                if done == submitted:
+                    return
+                index, results = workers.results.get()
+                completed[index] = results
+                # in unordered mode results are returned in order of completion
+                next_index = done if self.ordered else index
+                while next_index in completed:
+                    results = completed.pop(next_index)
+                    done += 1
+                    for result in results:
+                        if result.get('result') == 'accepted':
+                            self.sent += 1
+                        elif result.get('result') == 'unknown':
+                            self.unknown += 1
+                        else:
+                            self.failed += 1
+                        yield result
+                    next_index = done if self.ordered else None
+        finally:
+            workers.stop()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._items)
+
+    next = __next__
+
+    def close(self):
+        """
+        Stop sending (chunks which are being sent are completed)
+        """
+        self._items.close()
@@ -1,11 +1,10 @@
-import requests
 import six
 import urllib
-import json
 import itertools
-from bandwidth.voice.lazy_enumerable import get_lazy_enumerator
-from bandwidth.convert_camel import convert_object_to_snake_case
-from bandwidth.version import __version__ as version
+from bandwidth.voice.lazy_enumerable import get_lazy_enumerator, limit_page_size
+from bandwidth.parallel_scan import scan_time_range, DEFAULT_SHARDS, DEFAULT_WORKERS
+from bandwidth.base_client_module import BaseClient
+from bandwidth.messaging.bulk_send import BulkSend, DEFAULT_CHUNK_SIZE, DEFAULT_WORKERS as DEFAULT_SEND_WORKERS
 
 from .api_exception_module import BandwidthMessageAPIException
 
@@ -13,81 +12,14 @@ quote = urllib.parse.quote if six.PY3 else urllib.quote
 lazy_map = map if six.PY3 else itertools.imap
 
 
-class Client:
+class Client(BaseClient):
 
     """
     Catapult client
     """
 
-    def __init__(self, user_id=None, api_token=None, api_secret=None, **other_options):
-        """
-        Initialize the catatpult client.
-        :type user_id: str
-        :param user_id: catapult user id
-        :type api_token: str
-        :param api_token: catapult api token
-        :type api_secret: str
-        :param api_secret: catapult api secret
-        :type api_endpoint: str
-        :param api_endpoint: catapult api endpoint (optional, default value is https://api.catapult.inetwork.com)
-        :type api_version: str
-        :param api_version: catapult api version (optional, default value is v1)
-
-        :rtype: bandwidth.catapult.Client
-        :returns: bandwidth client
-
-        Init the catapult client::
-
-            api = bandwidth.catapult.Client('YOUR_USER_ID', 'YOUR_API_TOKEN', 'YOUR_API_SECRET')
-            # or
-            api = bandwidth.client('catapult', 'YOUR_USER_ID', 'YOUR_API_TOKEN', 'YOUR_API_SECRET')
-        """
-        if not all((user_id, api_token, api_secret)):
-            raise ValueError('Arguments user_id, api_token and api_secret are required. '
-                             'Use bandwidth.client("catapult", "YOUR-USER-ID", "YOUR-API-TOKEN", "YOUR-API-SECRET")')
-        self.user_id = user_id
-        self.api_endpoint = other_options.get(
-            'api_endpoint', 'https://api.catapult.inetwork.com')
-        self.api_version = other_options.get('api_version', 'v1')
-        self.auth = (api_token, api_secret)
-
-    def _request(self, method, url, *args, **kwargs):
-        user_agent = 'PythonSDK_' + version
-        headers = kwargs.pop('headers', None)
-        if headers:
-            headers['User-Agent'] = user_agent
-        else:
-            headers = {
-                'User-Agent': user_agent
-            }
-        if url.startswith('/'):
-            # relative url
-            url = '%s/%s%s' % (self.api_endpoint, self.api_version, url)
-        return requests.request(method, url, auth=self.auth, headers=headers, *args, **kwargs)
-
-    def _check_response(self, response):
-        if response.status_code >= 400:
-            if response.headers.get('content-type') is not None and \
-                    response.headers.get('content-type').startswith("application/json"):
-                data = response.json()
-                raise BandwidthMessageAPIException(
-                    response.status_code, data['message'], code=data.get('code'))
-            else:
-                raise BandwidthMessageAPIException(
-                    response.status_code, response.content.decode('utf-8')[:79])
-
-    def _make_request(self, method, url, *args, **kwargs):
-        response = self._request(method, url, *args, **kwargs)
-        self._check_response(response)
-        data = None
-        id = None
-        if response.headers.get('content-type') is not None and \
-                response.headers.get('content-type').startswith("application/json"):
-            data = convert_object_to_snake_case(response.json())
-        location = response.headers.get('location')
-        if location is not None:
-            id = location.split('/')[-1]
-        return (data, response, id)
+    api_family = 'messaging'
+    exception_class = BandwidthMessageAPIException
 
     def list_messages(self,
                       from_=None,
@@ -99,6 +31,7 @@ class Client:
                       delivery_state=None,
                       sort_order=None,
                       size=None,
+                      limit=None,
                       **kwargs):
         """
         Get a list of user's messages
@@ -120,6 +53,7 @@ class Client:
         :param str sort_order: How to sort the messages. Values are 'asc' or 'desc'
         :param str size: Used for pagination to indicate the size of each page requested for querying a list
             of items. If no value is specified the default value is 25. (Maximum value 1000)
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
         :rtype: types.GeneratorType
         :returns: list of messages
 
@@ -144,10 +78,37 @@ class Client:
         kwargs['state'] = state
         kwargs['deliveryState'] = delivery_state
         kwargs['sortOrder'] = sort_order
-        kwargs['size'] = size
+        kwargs['size'] = limit_page_size(size, limit, self.adaptive_page_size)
 
         path = '/users/%s/messages' % self.user_id
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs), limit=limit)
+
+    def scan_messages(self, from_date_time, to_date_time, shards=DEFAULT_SHARDS, workers=DEFAULT_WORKERS,
+                      ordered=True, **kwargs):
+        """
+        Get a list of user's messages for a time range. The range is split into shards which are
+        fetched concurrently.
+
+        :param from_date_time: The starting date time of the range (datetime or string like 2014-05-25 12:00:00)
+        :param to_date_time: The ending date time of the range (datetime or string like 2014-05-25 12:00:00)
+        :param int shards: number of shards to split the range into (optional, default value is 8)
+        :param int workers: number of shards fetched at once (optional, default value is 4)
+        :param bool ordered: True to return messages shard by shard in order of time (items of a shard
+            keep the order of the api), False to return messages as soon as they are fetched
+            (optional, default value is True)
+        :param kwargs: other filters of list_messages() (like ``direction``, ``sort_order`` or ``size``)
+        :rtype: bandwidth.parallel_scan.ParallelScan
+        :returns: list of messages
+
+        Example: Export messages of a day::
+
+            for message in api.scan_messages('2017-01-01 00:00:00', '2017-01-01 23:59:59', size=1000):
+                save(message)
+        """
+        return scan_time_range(
+            lambda start, end: self.list_messages(from_date_time=start, to_date_time=end, **kwargs),
+            from_date_time, to_date_time, '%Y-%m-%d %H:%M:%S', shards, workers, ordered,
+            reverse=kwargs.get('sort_order') == 'desc')
 
     def send_message(self, from_, to,
                      text=None,
@@ -194,6 +155,21 @@ class Client:
                 media = ['http://host/path/to/file']
                 )
         """
+        data = self._build_message(from_, to, text, media, receipt_requested, callback_url, callback_http_method,
+                                   callback_timeout, fallback_url, tag, **kwargs)
+        return self._make_request('post', '/users/%s/messages' % self.user_id, json=data)[2]
+
+    def _build_message(self, from_, to,
+                       text=None,
+                       media=None,
+                       receipt_requested=None,
+                       callback_url=None,
+                       callback_http_method=None,
+                       callback_timeout=None,
+                       fallback_url=None,
+                       tag=None,
+                       **kwargs):
+        # body of a message in api format (arguments are the same as of send_message())
         kwargs['from'] = from_
         kwargs['to'] = to
         kwargs['text'] = text
@@ -204,8 +180,7 @@ class Client:
         kwargs['callbackTimeout'] = callback_timeout
         kwargs['fallbackUrl'] = fallback_url
         kwargs['tag'] = tag
-
-        return self._make_request('post', '/users/%s/messages' % self.user_id, json=kwargs)[2]
+        return kwargs
 
     def send_messages(self, messages_data):
         """
@@ -241,7 +216,8 @@ class Client:
                 Any string, it will be included in the callback events of the message.
 
         :rtype: list
-        :returns: results of sent messages
+        :returns: results of sent messages (messages whose results are missing in the response get results with
+            'result' = 'unknown', they may be sent)
 
         Example: Bulk Send Picture or Text messages (or both)::
 
@@ -251,13 +227,53 @@ class Client:
             ])
 
         """
-        results = self._make_request(
-            'post', '/users/%s/messages' % self.user_id, json=messages_data)[0]
+        messages_data = list(messages_data)
+        # results are read from parsed data in any raw mode of the client
+        results = list(self._make_request(
+            'post', '/users/%s/messages' % self.user_id, json=messages_data, raw=False)[0])
         for i in range(0, len(messages_data)):
-            item = results[i]
-            item['id'] = item.get('location', '').split('/')[-1]
+            if i < len(results):
+                item = results[i] = dict(results[i])
+                item['id'] = item.get('location', '').split('/')[-1]
+            else:
+                # the request succeeded, so the message may be sent
+                item = {'result': 'unknown', 'id': None, 'error': {
+                    'message': 'Expected %d results of messages but received %d' % (len(messages_data), len(results)),
+                    'code': None}}
+                results.append(item)
             item['message'] = messages_data[i]
-        return results
+        return results[:len(messages_data)]
+
+    def send_messages_in_chunks(self, messages_data, chunk_size=DEFAULT_CHUNK_SIZE, workers=DEFAULT_SEND_WORKERS,
+                                ordered=True):
+        """
+        Send any number of messages by chunks with concurrent requests. Messages are read from messages_data
+        on demand, so it can be a generator (like lines of a file), and results are returned as soon as
+        chunks are sent.
+
+        :type messages_data: collections.Iterable
+        :param messages_data: messages to send (see send_messages())
+        :param int chunk_size: number of messages in one request (default value is 100)
+        :param int workers: number of concurrent requests (default value is 4)
+        :param bool ordered: return results in order of messages (or in order of sent chunks)
+
+        :rtype: bandwidth.messaging.bulk_send.BulkSend
+        :returns: iterator over results of messages (see send_messages()), messages of a failed request
+            get results with 'result' = 'error', messages without results in a response get results with
+            'result' = 'unknown'
+
+        Example: Send a campaign from a file::
+
+            def read_messages(path):
+                with open(path) as f:
+                    for line in f:
+                        yield {'from': '+1234567980', 'to': line.strip(), 'text': 'Hello'}
+
+            for result in api.send_messages_in_chunks(read_messages('numbers.txt'), workers=8):
+                if result['result'] != 'accepted':
+                    print(result['message']['to'], result['error'])
+        """
+        return BulkSend(self.send_messages, messages_data, chunk_size, workers, ordered)
 
     def get_message(self, id):
         """
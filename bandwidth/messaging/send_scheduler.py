@@ -0,0 +1,308 @@
+import collections
+import heapq
+import itertools
+import threading
+import time
+
+from .api_exception_module import BandwidthMessageAPIException
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_REJECTIONS = 3
+DEFAULT_REJECTION_DELAY = 1.0
+
+# messages per second of a sending number by its class
+DEFAULT_RATE_CLASSES = {
+    'local': 1.0,
+    'toll_free': 25.0,
+    'short_code': 100.0
+}
+
+TOLL_FREE_PREFIXES = ('+1800', '+1833', '+1844', '+1855', '+1866', '+1877', '+1888')
+
+
+def get_rate_class(number):
+    """
+    Returns rate class of a sending number
+
+    :type number: str
+    :param number: phone number in E.164 format or short code
+
+    :rtype: str
+    :returns: 'toll_free', 'short_code' or 'local'
+
+    Example::
+
+        get_rate_class('+18005551212')
+        ## 'toll_free'
+    """
+    if number.startswith(TOLL_FREE_PREFIXES):
+        return 'toll_free'
+    if not number.startswith('+') and number.isdigit() and len(number) <= 6:
+        return 'short_code'
+    return 'local'
+
+
+class ScheduledMessage(object):
+
+    """
+    Message which waits for sending in a scheduler
+    """
+
+    def __init__(self, message):
+        """
+        :type message: dict
+        :param message: keyword arguments of messaging.Client.send_message()
+        """
+        self.message = message
+        self.id = None
+        self.error = None
+        self.attempts = 0
+        self._done = threading.Event()
+
+    def done(self):
+        """
+        Returns True if the message is sent or failed
+        """
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Waits until the message is sent
+
+        :type timeout: float
+        :param timeout: max seconds to wait (optional, default value is None - no limit)
+
+        :rtype: str
+        :returns: id of the sent message (None if the timeout is expired)
+        """
+        self._done.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.id
+
+    def _finish(self, id=None, error=None):
+        self.id = id
+        self.error = error
+        self._done.set()
+
+
+class _NumberQueue(object):
+
+    __slots__ = ('number', 'interval', 'messages', 'next_time', 'last_send_time', 'scheduled')
+
+    def __init__(self, number, rate):
+        self.number = number
+        self.interval = 1.0 / rate
+        self.messages = collections.deque()
+        self.next_time = 0.0
+        self.last_send_time = 0.0
+        self.scheduled = False
+
+
+class SendScheduler(object):
+
+    """
+    Sends messages with a queue per sending (from) number. Each number gets its own rate limit by its rate class,
+    so a burst from one number waits for that number only while other numbers keep sending. Numbers which are
+    ready to send are served in order of their ready time, so sends are interleaved fairly across numbers. A worker
+    checks the gap from the previous send of the number again when it starts sending, so delays of threads don't
+    put sends of a number closer than its rate allows.
+
+    A message rejected by the api with 429 status is put back to the head of its number queue and the number is
+    paused for rejection_delay seconds.
+    """
+
+    def __init__(self, client, rate_classes=None, number_classes=None, classify=get_rate_class,
+                 workers=DEFAULT_WORKERS, max_rejections=DEFAULT_MAX_REJECTIONS,
+                 rejection_delay=DEFAULT_REJECTION_DELAY):
+        """
+        Initialize the scheduler and start its threads.
+
+        :type client: bandwidth.messaging.Client
+        :param client: messaging client
+        :type rate_classes: dict
+        :param rate_classes: messages per second by rate class (optional, default value is
+            {'local': 1, 'toll_free': 25, 'short_code': 100}, given values update default ones)
+        :type number_classes: dict
+        :param number_classes: rate classes of numbers (optional, other numbers are classified by classify)
+        :type classify: types.FunctionType
+        :param classify: function which returns rate class of a number (optional, default value is get_rate_class)
+        :type workers: int
+        :param workers: number of threads which send messages (optional, default value is 4)
+        :type max_rejections: int
+        :param max_rejections: max number of 429 rejections of a message before it fails
+            (optional, default value is 3)
+        :type rejection_delay: float
+        :param rejection_delay: seconds to pause a number after a rejection (optional, default value is 1)
+
+        :rtype: bandwidth.messaging.send_scheduler.SendScheduler
+        :returns: send scheduler
+
+        Example: Send a campaign from several numbers::
+
+            with SendScheduler(api, rate_classes={'local': 2}) as scheduler:
+                scheduled = [scheduler.submit(from_=numbers[i % len(numbers)], to=to, text='Hello')
+                             for i, to in enumerate(recipients)]
+            print([message.id for message in scheduled])
+        """
+        self.client = client
+        self.rate_classes = dict(DEFAULT_RATE_CLASSES, **(rate_classes or {}))
+        self.number_classes = dict(number_classes or {})
+        self.classify = classify
+        self.max_rejections = max_rejections
+        self.rejection_delay = rejection_delay
+        self.sent = 0
+        self.failed = 0
+        self.rejected = 0
+        self._numbers = {}
+        self._ready = []
+        self._order = itertools.count()
+        self._in_flight = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._threads = []
+        for i in range(workers):
+            self._threads.append(threading.Thread(target=self._work, name='bandwidth-send-%d' % i))
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+    def get_rate(self, number):
+        """
+        Returns messages per second of a sending number
+        """
+        rate_class = self.number_classes.get(number) or self.classify(number)
+        return self.rate_classes[rate_class]
+
+    def submit(self, from_, to, **kwargs):
+        """
+        Adds a message to the queue of its sending number
+
+        :param str ``from_``: One of your telephone numbers the message should come from
+        :param str to: The phone number the message should be sent to
+        :param kwargs: other arguments of messaging.Client.send_message() (text, media, tag, etc)
+
+        :rtype: bandwidth.messaging.send_scheduler.ScheduledMessage
+        :returns: scheduled message
+        """
+        scheduled = ScheduledMessage(dict(kwargs, from_=from_, to=to))
+        with self._condition:
+            if self._closed:
+                raise ValueError('Scheduler is closed')
+            number_queue = self._numbers.get(from_)
+            if number_queue is None:
+                number_queue = self._numbers[from_] = _NumberQueue(from_, self.get_rate(from_))
+            number_queue.messages.append(scheduled)
+            self._schedule(number_queue)
+        return scheduled
+
+    def pending(self):
+        """
+        Returns number of waiting messages by sending numbers
+
+        :rtype: dict
+        :returns: dictionary {number: count}
+        """
+        with self._condition:
+            return dict((number, len(q.messages)) for number, q in self._numbers.items() if q.messages)
+
+    def _schedule(self, number_queue):
+        # should be called with acquired condition
+        if not number_queue.scheduled and number_queue.messages:
+            number_queue.scheduled = True
+            heapq.heappush(self._ready, (number_queue.next_time, next(self._order), number_queue))
+            self._condition.notify_all()
+
+    def _take_next(self):
+        # returns next message to send or None when the scheduler is closed and all messages are sent,
+        # it is called by a free worker, so the time slot of the number is taken when a worker can send its message
+        with self._condition:
+            while True:
+                if self._ready:
+                    ready_time, _, number_queue = self._ready[0]
+                    now = time.time()
+                    if ready_time <= now:
+                        heapq.heappop(self._ready)
+                        number_queue.scheduled = False
+                        scheduled = number_queue.messages.popleft()
+                        number_queue.next_time = max(ready_time, now) + number_queue.interval
+                        self._schedule(number_queue)
+                        self._in_flight += 1
+                        return scheduled
+                    self._condition.wait(ready_time - now)
+                elif self._closed and self._in_flight == 0:
+                    return None
+                else:
+                    self._condition.wait()
+
+    def _work(self):
+        while True:
+            scheduled = self._take_next()
+            if scheduled is None:
+                return
+            self._wait_send_time(scheduled)
+            scheduled.attempts += 1
+            try:
+                id = self.client.send_message(**scheduled.message)
+            except BandwidthMessageAPIException as err:
+                if err.status_code != 429 or scheduled.attempts > self.max_rejections:
+                    self._complete(scheduled, error=err)
+                else:
+                    self._reject(scheduled)
+            except Exception as err:
+                self._complete(scheduled, error=err)
+            else:
+                self._complete(scheduled, id=id)
+
+    def _wait_send_time(self, scheduled):
+        # the time slot of a message is taken by a worker before sending, but another worker may start sending
+        # a next message of the number earlier, so the send time of the number is recorded when a send starts
+        with self._condition:
+            number_queue = self._numbers[scheduled.message['from_']]
+            while True:
+                now = time.time()
+                send_time = number_queue.last_send_time + number_queue.interval
+                if send_time <= now:
+                    number_queue.last_send_time = now
+                    return
+                self._condition.wait(send_time - now)
+
+    def _complete(self, scheduled, id=None, error=None):
+        with self._condition:
+            self._in_flight -= 1
+            if error is None:
+                self.sent += 1
+            else:
+                self.failed += 1
+            self._condition.notify_all()
+        scheduled._finish(id, error)
+
+    def _reject(self, scheduled):
+        with self._condition:
+            self._in_flight -= 1
+            self.rejected += 1
+            number_queue = self._numbers[scheduled.message['from_']]
+            number_queue.messages.appendleft(scheduled)
+            number_queue.next_time = max(number_queue.next_time, time.time() + self.rejection_delay)
+            if number_queue.scheduled:
+                # the number is moved to its new ready time
+                self._ready = [item for item in self._ready if item[2] is not number_queue]
+                heapq.heapify(self._ready)
+                number_queue.scheduled = False
+            self._schedule(number_queue)
+
+    def close(self):
+        """
+        Stops accepting of messages and waits until all submitted messages are sent
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
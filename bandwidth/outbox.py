@@ -0,0 +1,423 @@
+import heapq
+import json
+import os
+import threading
+import time
+import zlib
+
+import requests
+
+from bandwidth.idempotency import new_idempotency_key
+from bandwidth.rate_limit import TokenBucket
+from bandwidth.retry import RetryPolicy, RETRY_STATUSES
+
+# seconds during which appended records are collected for one fsync
+DEFAULT_FSYNC_INTERVAL = 0.005
+DEFAULT_WORKERS = 4
+# the log is rewritten when it has this number of completed entries
+DEFAULT_COMPACT_THRESHOLD = 10000
+
+# operations which can be queued: (api family, client method)
+OPERATIONS = frozenset([('messaging', 'send_message'), ('voice', 'create_call')])
+
+_replace = getattr(os, 'replace', os.rename)
+
+
+def _encode_record(record):
+    payload = json.dumps(record, separators=(',', ':'), sort_keys=True)
+    return '%08x %s\n' % (zlib.crc32(payload.encode('utf-8')) & 0xffffffff, payload)
+
+
+def _decode_record(line):
+    # returns None for a damaged line (like a line which was being written on crash)
+    checksum, _, payload = line.rstrip('\n').partition(' ')
+    try:
+        if int(checksum, 16) != zlib.crc32(payload.encode('utf-8')) & 0xffffffff:
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+class OutboxLog(object):
+
+    """
+    Append-only log of queued entries and their completions. Each line is a json record with a crc32 checksum,
+    damaged lines (torn writes) are skipped on reading. Appended records are written to disk by one fsync per
+    fsync_interval (group commit), so a writer waits for its record to be durable without paying for
+    a separate fsync.
+    """
+
+    def __init__(self, path, fsync_interval=DEFAULT_FSYNC_INTERVAL):
+        """
+        Open the log and read its pending entries.
+
+        :type path: str
+        :param path: path of the log file (it is created if it doesn't exist)
+        :type fsync_interval: float
+        :param fsync_interval: seconds during which records are collected for one fsync
+            (optional, default value is 0.005)
+        """
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.pending = {}
+        self.completed = 0
+        self.last_seq = 0
+        torn = False
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                for line in f:
+                    self._apply(_decode_record(line))
+                    torn = not line.endswith('\n')
+        self._file = open(path, 'a')
+        if torn:
+            # the next record shouldn't be appended to the damaged line
+            self._file.write('\n')
+        self._written = 0
+        self._synced = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._file_lock = threading.Lock()
+        self._syncer = threading.Thread(target=self._sync, name='bandwidth-outbox-fsync')
+        self._syncer.daemon = True
+        self._syncer.start()
+
+    def _apply(self, record):
+        if record is None:
+            return
+        seq = record['seq']
+        self.last_seq = max(self.last_seq, seq)
+        if record['op'] == 'enqueue':
+            self.pending[seq] = record
+        elif self.pending.pop(seq, None) is not None:
+            self.completed += 1
+
+    def append(self, record, durable=True):
+        """
+        Appends a record
+
+        :type record: dict
+        :param record: record with keys op ('enqueue', 'ack', 'fail') and seq
+        :type durable: bool
+        :param durable: True to wait until the record is written to disk (optional, default value is True)
+        """
+        line = _encode_record(record)
+        with self._condition:
+            if self._closed:
+                raise ValueError('Outbox log is closed')
+            self._file.write(line)
+            self._apply(record)
+            self._written += 1
+            target = self._written
+            self._condition.notify_all()
+            while durable and self._synced < target and not self._closed:
+                self._condition.wait()
+
+    def next_seq(self):
+        with self._condition:
+            self.last_seq += 1
+            return self.last_seq
+
+    def _sync(self):
+        while True:
+            with self._condition:
+                while self._written == self._synced and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+            # records of concurrent writers are collected for one fsync
+            time.sleep(self.fsync_interval)
+            # the file isn't replaced by compact() during fsync, while writers can append next records
+            with self._file_lock:
+                with self._condition:
+                    if self._closed:
+                        return
+                    self._file.flush()
+                    target = self._written
+                os.fsync(self._file.fileno())
+            with self._condition:
+                self._synced = max(self._synced, target)
+                self._condition.notify_all()
+
+    def compact(self):
+        """
+        Rewrites the log with pending entries only
+        """
+        with self._file_lock, self._condition:
+            temp_path = self.path + '.compact'
+            with open(temp_path, 'w') as f:
+                for seq in sorted(self.pending):
+                    f.write(_encode_record(self.pending[seq]))
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            _replace(temp_path, self.path)
+            self._file = open(self.path, 'a')
+            self.completed = 0
+            self._synced = self._written
+
+    def close(self):
+        with self._file_lock, self._condition:
+            if self._closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._synced = self._written
+            self._closed = True
+            self._file.close()
+            self._condition.notify_all()
+        self._syncer.join()
+
+
+def is_transient_error(error):
+    """
+    Returns True for errors after which a request can succeed later (connection errors, timeouts,
+    429 and 5xx responses)
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    return getattr(error, 'status_code', None) in RETRY_STATUSES
+
+
+class Outbox(object):
+
+    """
+    Durable queue of messages and calls. send_message() and create_call() write the request to the log and
+    return at once, background workers send queued requests at a controlled rate, retry transient failures
+    with backoff and acknowledge each request in the log. Requests which are not acknowledged (like requests
+    which were queued before a crash) are sent again when the outbox is opened.
+
+    Delivery is at least once: a request which was sent but not acknowledged before a crash is sent again.
+    Each entry has its own idempotency key, so a client with bandwidth.idempotency.IdempotencyKeys sends
+    the repeated request with the key of the first one (and resolves it to the first create when the dedupe
+    table has a persistent store).
+    """
+
+    def __init__(self, path, messaging=None, voice=None, rate=None, workers=DEFAULT_WORKERS, retry_policy=None,
+                 on_delivered=None, on_failed=None, fsync_interval=DEFAULT_FSYNC_INTERVAL,
+                 compact_threshold=DEFAULT_COMPACT_THRESHOLD):
+        """
+        Open the outbox and start its workers.
+
+        :type path: str
+        :param path: path of the log file
+        :type messaging: bandwidth.messaging.Client
+        :param messaging: client to send messages (optional)
+        :type voice: bandwidth.voice.Client
+        :param voice: client to create calls (optional)
+        :type rate: float
+        :param rate: max requests per second (optional, default value is None - no limit)
+        :type workers: int
+        :param workers: number of concurrent requests (optional, default value is 4)
+        :type retry_policy: bandwidth.retry.RetryPolicy
+        :param retry_policy: policy whose max_attempts, max_elapsed and get_delay() are used for retries
+            (optional, default value is 10 attempts within an hour with delays up to a minute)
+        :type on_delivered: types.FunctionType
+        :param on_delivered: function which gets seq of the entry and result (id of the message or the call)
+            (optional)
+        :type on_failed: types.FunctionType
+        :param on_failed: function which gets seq of the entry and the error after which it was dropped
+            (optional)
+        :type fsync_interval: float
+        :param fsync_interval: seconds during which queued entries are collected for one fsync
+            (optional, default value is 0.005)
+        :type compact_threshold: int
+        :param compact_threshold: number of completed entries after which the log is rewritten
+            (optional, default value is 10000)
+
+        :rtype: bandwidth.outbox.Outbox
+        :returns: outbox
+
+        Example: Keep sending messages while the api is unavailable::
+
+            outbox = Outbox('/var/lib/myapp/outbox.log', messaging=api, rate=10)
+            outbox.send_message(from_='+1234567980', to='+1234567981', text='Hello')
+            ...
+            outbox.close()
+        """
+        self.clients = {'messaging': messaging, 'voice': voice}
+        self.bucket = TokenBucket(rate) if rate else None
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=10, backoff_max=60, max_elapsed=3600)
+        self.on_delivered = on_delivered
+        self.on_failed = on_failed
+        self.compact_threshold = compact_threshold
+        self.delivered = 0
+        self.failed = 0
+        self.retries = 0
+        self.log = OutboxLog(path, fsync_interval)
+        self._ready = []
+        self._attempts = {}
+        self._in_flight = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        for seq in sorted(self.log.pending):
+            # entries of the previous run are sent again
+            heapq.heappush(self._ready, (0, seq))
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name='bandwidth-outbox-%d' % i)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def enqueue(self, family, method, **kwargs):
+        """
+        Adds request to the outbox. It returns when the request is written to disk.
+
+        :type family: str
+        :param family: api family ('messaging' or 'voice')
+        :type method: str
+        :param method: client method ('send_message' or 'create_call')
+        :param kwargs: arguments of the method
+
+        :rtype: int
+        :returns: sequence number of the entry
+        """
+        if (family, method) not in OPERATIONS:
+            raise ValueError('Operation %s.%s can\'t be queued' % (family, method))
+        if self.clients.get(family) is None:
+            raise ValueError('Outbox has no %s client' % family)
+        seq = self.log.next_seq()
+        self.log.append({'op': 'enqueue', 'seq': seq, 'family': family, 'method': method, 'kwargs': kwargs,
+                         'key': new_idempotency_key()})
+        with self._condition:
+            heapq.heappush(self._ready, (0, seq))
+            self._condition.notify()
+        return seq
+
+    def send_message(self, from_, to, **kwargs):
+        """
+        Queues a message (arguments are the same as of messaging.Client.send_message())
+
+        :rtype: int
+        :returns: sequence number of the entry
+        """
+        return self.enqueue('messaging', 'send_message', from_=from_, to=to, **kwargs)
+
+    def create_call(self, from_, to, **kwargs):
+        """
+        Queues a call (arguments are the same as of voice.Client.create_call())
+
+        :rtype: int
+        :returns: sequence number of the entry
+        """
+        return self.enqueue('voice', 'create_call', from_=from_, to=to, **kwargs)
+
+    def pending(self):
+        """
+        Returns number of entries which are not acknowledged yet
+        """
+        return len(self.log.pending)
+
+    def _take(self):
+        # returns seq of the next entry or None when the outbox is closed
+        with self._condition:
+            while True:
+                if self._closed:
+                    return None
+                if self._ready:
+                    due, seq = self._ready[0]
+                    now = time.time()
+                    if due <= now:
+                        heapq.heappop(self._ready)
+                        self._in_flight += 1
+                        return seq
+                    self._condition.wait(due - now)
+                else:
+                    self._condition.wait()
+
+    def _work(self):
+        while True:
+            seq = self._take()
+            if seq is None:
+                return
+            try:
+                self._deliver(seq)
+            finally:
+                with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+
+    def _deliver(self, seq):
+        entry = self.log.pending.get(seq)
+        if entry is None:
+            return
+        if self.bucket is not None:
+            wait = self.bucket.reserve()
+            if wait > 0:
+                time.sleep(wait)
+        attempts, first_attempt = self._attempts.get(seq, (0, time.time()))
+        attempts += 1
+        try:
+            client = self.clients[entry['family']]
+            if getattr(client, 'idempotency_keys', None) is not None and entry.get('key'):
+                client = client.with_options(idempotency_key=entry['key'])
+            result = getattr(client, entry['method'])(**entry['kwargs'])
+        except Exception as err:
+            delay = self.retry_policy.get_delay(attempts - 1)
+            if is_transient_error(err) and attempts < self.retry_policy.max_attempts and \
+                    time.time() + delay - first_attempt <= self.retry_policy.max_elapsed:
+                with self._condition:
+                    self._attempts[seq] = (attempts, first_attempt)
+                    self.retries += 1
+                    heapq.heappush(self._ready, (time.time() + delay, seq))
+                    self._condition.notify()
+                return
+            self._complete(seq, {'op': 'fail', 'seq': seq, 'error': str(err)})
+            with self._condition:
+                self.failed += 1
+            if self.on_failed is not None:
+                self.on_failed(seq, err)
+            return
+        self._complete(seq, {'op': 'ack', 'seq': seq, 'result': result})
+        with self._condition:
+            self.delivered += 1
+        if self.on_delivered is not None:
+            self.on_delivered(seq, result)
+
+    def _complete(self, seq, record):
+        # a lost acknowledgement means a repeated request, so it is not waited for
+        self.log.append(record, durable=False)
+        with self._condition:
+            self._attempts.pop(seq, None)
+        if self.log.completed >= self.compact_threshold:
+            self.log.compact()
+
+    def wait_idle(self, timeout=None):
+        """
+        Waits until all entries which are due are sent (entries waiting for a retry are not waited for)
+
+        :type timeout: float
+        :param timeout: max seconds to wait (optional, default value is None - no limit)
+
+        :rtype: bool
+        :returns: True if the outbox is idle
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._in_flight or (self._ready and self._ready[0][0] <= time.time()):
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining if remaining is not None else 0.1)
+            return True
+
+    def close(self):
+        """
+        Stops the workers (requests which are being sent are completed) and closes the log.
+        Entries which are not sent stay in the log and are sent when the outbox is opened again.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self.log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
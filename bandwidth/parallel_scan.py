@@ -0,0 +1,200 @@
+import datetime
+import threading
+import six
+from six.moves import queue
+from dateutil import parser as date_parser
+
+DEFAULT_SHARDS = 8
+DEFAULT_WORKERS = 4
+DEFAULT_BATCH_SIZE = 100
+
+# each shard may keep this number of fetched batches of items waiting for the consumer
+_BUFFERED_BATCHES = 4
+
+
+def split_time_range(from_time, to_time, shards):
+    """
+    Splits time range into equal non overlapping shards. Range filters of the api are inclusive and have
+    precision of one second, so each shard ends one second before the next shard starts.
+
+    :type from_time: datetime.datetime or str
+    :param from_time: start of the range (inclusive)
+    :type to_time: datetime.datetime or str
+    :param to_time: end of the range (inclusive)
+    :type shards: int
+    :param shards: number of shards (it is decreased for ranges shorter than number of shards in seconds)
+
+    :rtype: list
+    :returns: list of tuples (start, end) of shards
+
+    Example: Split a day into 4 shards::
+
+        split_time_range('2017-01-01 00:00:00', '2017-01-01 23:59:59', 4)
+        ## [(datetime(2017, 1, 1, 0, 0), datetime(2017, 1, 1, 5, 59, 59)),
+        ##  (datetime(2017, 1, 1, 6, 0), datetime(2017, 1, 1, 11, 59, 59)),
+        ##  ...]
+    """
+    if isinstance(from_time, six.string_types):
+        from_time = date_parser.parse(from_time)
+    if isinstance(to_time, six.string_types):
+        to_time = date_parser.parse(to_time)
+    if to_time < from_time:
+        raise ValueError('End of time range should not be earlier than start')
+    seconds = int((to_time - from_time).total_seconds()) + 1
+    shards = max(1, min(shards, seconds))
+    starts = [from_time + datetime.timedelta(seconds=seconds * i // shards) for i in range(shards)]
+    ends = [start - datetime.timedelta(seconds=1) for start in starts[1:]] + [to_time]
+    return list(zip(starts, ends))
+
+
+class _ShardWorkers(object):
+
+    """
+    Worker threads which fetch shards and pass batches of items to the queues
+    """
+
+    def __init__(self, list_shard, shards, workers, ordered, batch_size):
+        self.list_shard = list_shard
+        self.shards = shards
+        self.batch_size = batch_size
+        self.stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._next_shard = 0
+        if ordered:
+            self.queues = [queue.Queue(_BUFFERED_BATCHES) for _ in shards]
+        else:
+            shared_queue = queue.Queue(_BUFFERED_BATCHES * workers)
+            self.queues = [shared_queue for _ in shards]
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name='bandwidth-scan-%d' % i)
+            thread.daemon = True
+            thread.start()
+
+    def _take_shard(self):
+        with self._lock:
+            index = self._next_shard
+            self._next_shard += 1
+        return index if index < len(self.shards) else None
+
+    def _put(self, index, value):
+        # returns False when the scan is stopped
+        if self.stopped.is_set():
+            return False
+        self.queues[index].put((index, value))
+        return not self.stopped.is_set()
+
+    def _work(self):
+        while True:
+            index = self._take_shard()
+            if index is None:
+                return
+            try:
+                batch = []
+                for item in self.list_shard(self.shards[index]):
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        if not self._put(index, batch):
+                            return
+                        batch = []
+                if batch and not self._put(index, batch):
+                    return
+                # None marks the end of the shard
+                if not self._put(index, None):
+                    return
+            except Exception as err:
+                self._put(index, err)
+                return
+
+    def stop(self):
+        # unblock workers, they stop before fetching of next page
+        self.stopped.set()
+        for shard_queue in set(self.queues):
+            while not shard_queue.empty():
+                shard_queue.get_nowait()
+
+
+class ParallelScan(object):
+
+    """
+    Iterator over items of several shards which are fetched concurrently by a pool of worker threads
+    """
+
+    def __init__(self, list_shard, shards, workers=DEFAULT_WORKERS, ordered=True, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        :type list_shard: types.FunctionType
+        :param list_shard: function which gets a shard and returns iterable of its items
+        :type shards: list
+        :param shards: list of shards
+        :type workers: int
+        :param workers: number of worker threads (optional, default value is 4)
+        :type ordered: bool
+        :param ordered: True to return items shard by shard in order of shards, False to return items as soon as
+            they are fetched (optional, default value is True)
+        :type batch_size: int
+        :param batch_size: number of items passed from workers at once (optional, default value is 100)
+        """
+        self.list_shard = list_shard
+        self.shards = list(shards)
+        self.workers = max(1, min(workers, len(self.shards)))
+        self.ordered = ordered
+        self.batch_size = batch_size
+        self._items = self._iterate()
+
+    def _iterate(self):
+        # the workers don't refer to the scan, so an abandoned scan is collected and stops them
+        workers = _ShardWorkers(self.list_shard, self.shards, self.workers, self.ordered, self.batch_size)
+        try:
+            remaining = len(self.shards)
+            index = 0
+            while remaining > 0:
+                _, value = workers.queues[index].get()
+                if value is None:
+                    remaining -= 1
+                    index = index + 1 if self.ordered else 0
+                elif isinstance(value, Exception):
+                    raise value
+                else:
+                    for item in value:
+                        yield item
+        finally:
+            workers.stop()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._items)
+
+    next = __next__
+
+    def close(self):
+        """
+        Stop the scan (workers stop before fetching of next page)
+        """
+        self._items.close()
+
+
+def scan_time_range(list_shard, from_time, to_time, time_format, shards=DEFAULT_SHARDS, workers=DEFAULT_WORKERS,
+                    ordered=True, reverse=False):
+    """
+    Scans time range by shards in parallel
+
+    :type list_shard: types.FunctionType
+    :param list_shard: function which gets formatted start and end of a shard and returns iterable of its items
+    :param from_time: start of the range (datetime or string)
+    :param to_time: end of the range (datetime or string)
+    :type time_format: str
+    :param time_format: strftime format of the api filter
+    :param int shards: number of shards
+    :param int workers: number of worker threads
+    :param bool ordered: return items shard by shard in order of shards (or as soon as they are fetched)
+    :param bool reverse: order shards from the latest to the earliest one (for descending sort order)
+
+    :rtype: bandwidth.parallel_scan.ParallelScan
+    :returns: iterator over items
+    """
+    ranges = [(start.strftime(time_format), end.strftime(time_format))
+              for start, end in split_time_range(from_time, to_time, shards)]
+    if reverse:
+        ranges.reverse()
+    return ParallelScan(lambda shard: list_shard(*shard), ranges, workers, ordered)
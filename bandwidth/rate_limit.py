@@ -0,0 +1,195 @@
+import threading
+import time
+
+import six
+
+from bandwidth.cache import get_resource_name
+
+
+class RateLimitExceeded(Exception):
+
+    """
+    Request is not sent because it would exceed the rate limit within allowed wait time
+    """
+
+    def __init__(self, limit, wait):
+        """
+        :type limit: str
+        :param limit: name of the exceeded limit ('client', api family or endpoint class)
+        :type wait: float
+        :param wait: seconds after which the request would be allowed
+        """
+        super(RateLimitExceeded, self).__init__(limit, wait)
+        self.limit = limit
+        self.wait = wait
+
+    def __str__(self):
+        return 'Rate limit "%s" is exceeded, next request is allowed in %.3f seconds' % (self.limit, self.wait)
+
+
+class TokenBucket(object):
+
+    """
+    Token bucket which is safe to share between threads and asynchronous tasks. Tokens are reserved
+    (the bucket may go into debt) and the caller waits outside of the lock, so waiting callers are served
+    in order of their reservations.
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        :type rate: float
+        :param rate: tokens added per second
+        :type burst: float
+        :param burst: capacity of the bucket (optional, default value is max(1, rate))
+        """
+        if rate <= 0:
+            raise ValueError('Rate should be positive')
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self._tokens = self.burst
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait=None):
+        """
+        Reserves a token
+
+        :type max_wait: float
+        :param max_wait: max seconds to wait for the token (optional, default value is None - no limit)
+
+        :rtype: float
+        :returns: seconds to wait before the token can be used (0 if it is available now),
+            negative value of the needed wait if it is longer than max_wait (nothing is reserved then)
+        """
+        with self._lock:
+            now = time.time()
+            # the clock may go backwards
+            self._tokens = min(self.burst, self._tokens + max(0.0, now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return -wait
+            self._tokens -= 1
+            return wait
+
+    def refund(self):
+        """
+        Returns a reserved token which was not used
+        """
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+
+def _create_bucket(limit):
+    # limit is requests per second or tuple (requests per second, burst)
+    if isinstance(limit, TokenBucket):
+        return limit
+    if isinstance(limit, (tuple, list)):
+        return TokenBucket(*limit)
+    return TokenBucket(limit)
+
+
+class RateLimiter(object):
+
+    """
+    Transport middleware which keeps request rate under limits with token buckets. A request takes a token from
+    the client bucket, from the bucket of its api family and from the bucket of its endpoint class.
+
+    Endpoint class is the resource of the url (like 'messages', 'calls', 'phoneNumbers') optionally prefixed with
+    an upper case method ('POST messages'). When a token is not available the request waits for it, fails
+    with RateLimitExceeded if the wait would be longer than max_wait (so max_wait=0 means fail fast).
+    Retries made by bandwidth.retry.RetryPolicy take tokens too.
+    """
+
+    def __init__(self, rate=None, burst=None, family_rates=None, endpoint_rates=None, max_wait=None):
+        """
+        Initialize the limiter.
+
+        :type rate: float
+        :param rate: requests per second of the client (optional, default value is None - no limit)
+        :type burst: float
+        :param burst: number of requests which can be sent at once after idle time (optional,
+            default value is max(1, rate))
+        :type family_rates: dict
+        :param family_rates: requests per second (or tuples (rate, burst)) by api family like {'messaging': 10}
+            (optional)
+        :type endpoint_rates: dict
+        :param endpoint_rates: requests per second (or tuples (rate, burst)) by endpoint class like
+            {'POST messages': 1, 'phoneNumbers': 5} (optional)
+        :type max_wait: float
+        :param max_wait: max seconds to wait for a token, 0 to fail fast (optional, default value is None -
+            wait as long as needed)
+
+        :rtype: bandwidth.rate_limit.RateLimiter
+        :returns: rate limiter
+
+        Example: Send up to 1 message per second and other requests up to 10 per second::
+
+            limiter = RateLimiter(rate=10, endpoint_rates={'POST messages': 1})
+            api = bandwidth.client('messaging', 'u-user', 't-token', 's-secret', rate_limit=limiter)
+
+        Example: Fail instead of waiting in a latency sensitive handler::
+
+            try:
+                api.with_options(rate_limit_wait=0).send_message(...)
+            except RateLimitExceeded as err:
+                reply_later(err.wait)
+        """
+        self.max_wait = max_wait
+        self.bucket = _create_bucket(rate if burst is None else (rate, burst)) if rate is not None else None
+        self.family_buckets = dict((k, _create_bucket(v)) for k, v in six.iteritems(family_rates or {}))
+        self.endpoint_buckets = dict((k, _create_bucket(v)) for k, v in six.iteritems(endpoint_rates or {}))
+        self.delayed = 0
+        self.rejected = 0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def _get_buckets(self, request):
+        buckets = []
+        if self.bucket is not None:
+            buckets.append(('client', self.bucket))
+        if request.family in self.family_buckets:
+            buckets.append((request.family, self.family_buckets[request.family]))
+        if self.endpoint_buckets:
+            resource = get_resource_name(request.url)
+            for name in ('%s %s' % (request.method.upper(), resource), resource):
+                if name in self.endpoint_buckets:
+                    buckets.append((name, self.endpoint_buckets[name]))
+        return buckets
+
+    def acquire(self, request):
+        """
+        Takes tokens for a request
+
+        :type request: bandwidth.transport.TransportRequest
+        :param request: request to send
+
+        :rtype: float
+        :returns: seconds to wait before sending of the request
+        """
+        max_wait = self.max_wait
+        if request.options and 'rate_limit_wait' in request.options:
+            max_wait = request.options['rate_limit_wait']
+        reserved = []
+        wait = 0.0
+        for name, bucket in self._get_buckets(request):
+            bucket_wait = bucket.reserve(max_wait)
+            if bucket_wait < 0:
+                for reserved_bucket in reserved:
+                    reserved_bucket.refund()
+                with self._lock:
+                    self.rejected += 1
+                raise RateLimitExceeded(name, -bucket_wait)
+            reserved.append(bucket)
+            wait = max(wait, bucket_wait)
+        if wait > 0:
+            with self._lock:
+                self.delayed += 1
+                self.waited += wait
+        return wait
+
+    def __call__(self, request, send):
+        wait = self.acquire(request)
+        if wait > 0:
+            time.sleep(wait)
+        return send(request)
@@ -0,0 +1,213 @@
+import calendar
+import random
+import threading
+import time
+from email.utils import parsedate_tz, mktime_tz
+
+import requests
+
+from bandwidth.idempotency import get_idempotency_key, GENERATED_KEY_OPTION
+
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30
+DEFAULT_MAX_ELAPSED = 60
+
+# statuses of transient failures
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# methods which can be repeated without side effects
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+# statuses which mean that a request was rejected without processing (so any method can be retried)
+REJECTED_STATUSES = (429,)
+
+
+def parse_retry_after(value, now=None):
+    """
+    Parses value of Retry-After header
+
+    :type value: str
+    :param value: number of seconds or http date
+    :type now: float
+    :param now: current unix time (optional)
+
+    :rtype: float
+    :returns: seconds to wait (None for missing or invalid value)
+
+    Example::
+
+        parse_retry_after('120')
+        ## 120.0
+        parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', now=1445412470)
+        ## 10.0
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    timestamp = mktime_tz(parsed) if parsed[9] is not None else calendar.timegm(parsed[:9])
+    return max(0.0, timestamp - (time.time() if now is None else now))
+
+
+class RetryPolicy(object):
+
+    """
+    Transport middleware which retries transient failures (429 and 5xx responses, connection errors and timeouts)
+    with exponential backoff and full jitter.
+
+    Idempotent requests (GET, HEAD, OPTIONS, PUT, DELETE and creates with idempotency keys passed by the caller,
+    see bandwidth.idempotency.IdempotencyKeys) are retried on any transient failure. Other requests
+    are retried only when the api rejected them without processing (429 response or connect timeout), so
+    a message is never sent twice. Retry-After header of a response is respected. All retries of a request
+    should fit into max_elapsed seconds, a response or an error which can't be retried in time is returned
+    as is (so the client raises its usual exception).
+    """
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_max=DEFAULT_BACKOFF_MAX, max_elapsed=DEFAULT_MAX_ELAPSED, retry_statuses=RETRY_STATUSES,
+                 idempotent_methods=IDEMPOTENT_METHODS, retry_unsafe_posts=False):
+        """
+        Initialize the policy.
+
+        :type max_attempts: int
+        :param max_attempts: max number of attempts of a request including the first one
+            (optional, default value is 4)
+        :type backoff_base: float
+        :param backoff_base: max delay in seconds before the first retry, it doubles with each retry
+            (optional, default value is 0.5)
+        :type backoff_max: float
+        :param backoff_max: max delay in seconds between attempts (optional, default value is 30)
+        :type max_elapsed: float
+        :param max_elapsed: seconds from the first attempt after which a request is not retried anymore
+            (optional, default value is 60)
+        :type retry_statuses: tuple
+        :param retry_statuses: statuses of responses to retry (optional, default value is (429, 500, 502, 503, 504))
+        :type idempotent_methods: tuple
+        :param idempotent_methods: upper case names of methods which are retried on any transient failure
+            (optional, default value is ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+        :type retry_unsafe_posts: bool
+        :param retry_unsafe_posts: True to retry creates with generated idempotency keys on any transient failure
+            too, it is safe only if the api deduplicates requests by the key (optional, default value is False)
+
+        :rtype: bandwidth.retry.RetryPolicy
+        :returns: retry policy
+
+        Example: Retry requests of a client for up to 2 minutes::
+
+            api = bandwidth.client('messaging', 'u-user', 't-token', 's-secret',
+                                   retry=RetryPolicy(max_attempts=6, max_elapsed=120))
+            ...
+            print(api.retry_policy.retries)
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_elapsed = max_elapsed
+        self.retry_statuses = tuple(retry_statuses)
+        self.idempotent_methods = tuple(idempotent_methods)
+        self.retry_unsafe_posts = retry_unsafe_posts
+        self.retries = 0
+        self.retried_requests = 0
+        self.exhausted = 0
+        self.retries_by_reason = {}
+        self._lock = threading.Lock()
+
+    def is_idempotent(self, request):
+        """
+        Returns True if the request can be repeated without side effects
+
+        :type request: bandwidth.transport.TransportRequest
+        :param request: request
+        """
+        if request.method.upper() in self.idempotent_methods:
+            return True
+        # the caller which passes idempotency key expects the create to be repeated (see bandwidth.idempotency),
+        # a generated key helps only if the api deduplicates requests by it
+        if get_idempotency_key(request) is None:
+            return False
+        return self.retry_unsafe_posts or not request.options.get(GENERATED_KEY_OPTION)
+
+    def get_retry_reason(self, request, response=None, error=None):
+        """
+        Returns reason to retry a request (None if the request should not be retried)
+
+        :type request: bandwidth.transport.TransportRequest
+        :param request: request
+        :type response: requests.Response
+        :param response: received response (optional)
+        :type error: Exception
+        :param error: error of the request (optional)
+
+        :rtype: str
+        :returns: reason (status code or name of the error class)
+        """
+        idempotent = self.is_idempotent(request)
+        if error is not None:
+            if isinstance(error, requests.ConnectTimeout) or \
+                    (idempotent and isinstance(error, (requests.ConnectionError, requests.Timeout))):
+                return error.__class__.__name__
+            return None
+        if response.status_code in self.retry_statuses and \
+                (idempotent or response.status_code in REJECTED_STATUSES):
+            return str(response.status_code)
+        return None
+
+    def get_delay(self, retry, response=None):
+        """
+        Returns delay before a retry: random value between 0 and exponentially growing limit (full jitter)
+        or value of Retry-After header of the response if it is bigger
+
+        :type retry: int
+        :param retry: number of the retry (starting from 0)
+        :type response: requests.Response
+        :param response: response which is retried (optional)
+
+        :rtype: float
+        :returns: seconds to wait
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** retry)))
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('retry-after'))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        return delay
+
+    def _get_next_delay(self, request, attempt, start, response, error):
+        # returns delay before next attempt or None to give up
+        reason = self.get_retry_reason(request, response, error)
+        if reason is None:
+            return None
+        delay = self.get_delay(attempt - 1, response)
+        if attempt >= self.max_attempts or time.time() + delay - start > self.max_elapsed:
+            with self._lock:
+                self.exhausted += 1
+            return None
+        with self._lock:
+            self.retries += 1
+            if attempt == 1:
+                self.retried_requests += 1
+            self.retries_by_reason[reason] = self.retries_by_reason.get(reason, 0) + 1
+        if response is not None and request.kwargs.get('stream'):
+            # the connection of a streamed response is released before the wait
+            response.close()
+        return delay
+
+    def __call__(self, request, send):
+        start = time.time()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = send(request)
+            except Exception as err:
+                delay = self._get_next_delay(request, attempt, start, None, err)
+                if delay is None:
+                    raise
+            else:
+                delay = self._get_next_delay(request, attempt, start, response, None)
+                if delay is None:
+                    return response
+            time.sleep(delay)
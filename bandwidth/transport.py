@@ -0,0 +1,306 @@
+import threading
+import time
+from bandwidth.connection_pool import ConnectionPool, DEFAULT_POOL_SIZE, DEFAULT_POOL_MAX_PER_HOST, \
+    DEFAULT_POOL_IDLE_TIMEOUT
+
+
+class TransportRequest(object):
+
+    """
+    Http request passed through transport middlewares
+    """
+
+    def __init__(self, method, url, args=(), kwargs=None, family=None, options=None):
+        """
+        :type method: str
+        :param method: http method
+        :type url: str
+        :param url: absolute url
+        :type args: tuple
+        :param args: extra positional arguments of ``requests.request``
+        :type kwargs: dict
+        :param kwargs: keyword arguments of ``requests.request`` (auth, headers, params, json, etc)
+        :type family: str
+        :param family: api family of the client which made the request ('voice', 'account', 'messaging')
+        :type options: dict
+        :param options: options of the call for middlewares (like rate_limit_wait)
+        """
+        self.method = method
+        self.url = url
+        self.args = args
+        self.kwargs = kwargs if kwargs is not None else {}
+        self.family = family
+        self.options = options if options is not None else {}
+
+
+class BaseTransport(object):
+
+    """
+    Base class of transports used by api clients to make http requests.
+
+    A transport runs each request through its middlewares and then sends it with ``send()``
+    which is implemented by concrete backends. Middleware is a callable ``middleware(request, send)``
+    which gets ``bandwidth.transport.TransportRequest`` and should return response (usually
+    by calling ``send(request)``). It is the single place to plug retries, caching, metrics, etc in
+    for all api families at once.
+    """
+
+    def __init__(self, middlewares=None):
+        self.middlewares = list(middlewares or [])
+
+    def add_middleware(self, middleware):
+        """
+        Add a middleware to the end of the chain (it will be called right before the backend)
+
+        :type middleware: callable
+        :param middleware: middleware to add
+
+        Example: Log all requests::
+
+            def log_requests(request, send):
+                print(request.method, request.url)
+                return send(request)
+
+            api.transport.add_middleware(log_requests)
+        """
+        self.middlewares.append(middleware)
+
+    def request(self, request):
+        """
+        Make http request
+
+        :type request: bandwidth.transport.TransportRequest
+        :param request: request to make
+
+        :rtype: requests.Response
+        :returns: http response
+        """
+        return self._build_chain(0)(request)
+
+    def _build_chain(self, index):
+        if index >= len(self.middlewares):
+            return self.send
+        middleware = self.middlewares[index]
+        next_send = self._build_chain(index + 1)
+        return lambda request: middleware(request, next_send)
+
+    def send(self, request):
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Transport(BaseTransport):
+
+    """
+    Synchronous transport which sends requests over pooled keep-alive connections
+    """
+
+    def __init__(self, connection_pool=None, middlewares=None, pool_size=DEFAULT_POOL_SIZE,
+                 pool_max_per_host=DEFAULT_POOL_MAX_PER_HOST, pool_idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT,
+                 json_codec=None):
+        """
+        Initialize the transport.
+
+        :type connection_pool: bandwidth.connection_pool.ConnectionPool
+        :param connection_pool: existing connection pool to use (optional, it is created if missing)
+        :type middlewares: list
+        :param middlewares: list of middlewares (optional)
+        :type pool_size: int
+        :param pool_size: number of hosts to keep connection pools for (optional, default value is 10)
+        :type pool_max_per_host: int
+        :param pool_max_per_host: max number of kept-alive connections to single host
+            (optional, default value is 10)
+        :type pool_idle_timeout: float
+        :param pool_idle_timeout: seconds after which unused connections are dropped (optional, default value is 60)
+        :type json_codec: str or bandwidth.json_codec.JsonCodec
+        :param json_codec: codec to encode json bodies of requests (optional, default value is the fastest
+            installed codec, it is ignored if connection_pool is passed)
+
+        Example: Share one transport between all api clients::
+
+            transport = Transport(pool_max_per_host=50)
+            voice_api = bandwidth.client('voice', 'u-user', 't-token', 's-secret', transport=transport)
+            account_api = bandwidth.client('account', 'u-user', 't-token', 's-secret', transport=transport)
+        """
+        super(Transport, self).__init__(middlewares)
+        self._owns_connection_pool = connection_pool is None
+        self.connection_pool = connection_pool or ConnectionPool(pool_size, pool_max_per_host, pool_idle_timeout,
+                                                                 json_codec)
+
+    def send(self, request):
+        return self.connection_pool.request(request.method, request.url, *request.args, **request.kwargs)
+
+    def close(self):
+        """
+        Close own connection pool (a shared connection pool passed to the constructor stays open)
+        """
+        if self._owns_connection_pool:
+            self.connection_pool.close()
+
+
+class RecordedTransport(BaseTransport):
+
+    """
+    Transport which doesn't touch the network. It returns prerecorded responses in order
+    and keeps all made requests (useful for tests and offline runs).
+    """
+
+    def __init__(self, responses=None, middlewares=None):
+        """
+        :type responses: list
+        :param responses: list of ``requests.Response`` to return (an exception instance will be raised instead)
+        :type middlewares: list
+        :param middlewares: list of middlewares (optional)
+        """
+        super(RecordedTransport, self).__init__(middlewares)
+        self.responses = list(responses or [])
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def send(self, request):
+        with self._lock:
+            self.requests.append(request)
+            if not self.responses:
+                raise AssertionError('No recorded response for %s %s' % (request.method.upper(), request.url))
+            response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class RequestMetrics(object):
+
+    """
+    Middleware which counts requests, errors and total request time per api family
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.errors = {}
+        self.elapsed = {}
+
+    def __call__(self, request, send):
+        start = time.time()
+        failed = True
+        try:
+            response = send(request)
+            failed = response.status_code >= 400
+            return response
+        finally:
+            with self._lock:
+                family = request.family
+                self.requests[family] = self.requests.get(family, 0) + 1
+                self.elapsed[family] = self.elapsed.get(family, 0.0) + time.time() - start
+                if failed:
+                    self.errors[family] = self.errors.get(family, 0) + 1
+
+
+# methods of requests which can be coalesced by default
+COALESCED_METHODS = ('GET', 'HEAD')
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def get_coalescing_key(request, methods=COALESCED_METHODS):
+    """
+    Returns key which is equal for identical idempotent requests (None for requests which can't be coalesced)
+
+    :type request: bandwidth.transport.TransportRequest
+    :param request: request
+    :type methods: tuple
+    :param methods: upper case names of idempotent methods (optional, default value is ('GET', 'HEAD'))
+
+    :rtype: tuple
+    :returns: key of the request
+    """
+    kwargs = request.kwargs
+    method = request.method.upper()
+    if method not in methods or request.args or kwargs.get('stream') or kwargs.get('json') is not None \
+            or kwargs.get('data') is not None:
+        return None
+    key = (method, request.url, _freeze(kwargs.get('params')), _freeze(kwargs.get('headers')), kwargs.get('auth'),
+           kwargs.get('timeout'))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class _Flight(object):
+
+    __slots__ = ('done', 'response', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class RequestCoalescer(object):
+
+    """
+    Middleware which lets concurrent identical GET requests (same method, url, params, headers and auth) share
+    one in-flight request. All callers receive its response (or its error). Requests which are made after
+    the response is received are sent again, so there is no caching.
+    """
+
+    def __init__(self, methods=COALESCED_METHODS):
+        """
+        :type methods: tuple
+        :param methods: upper case names of methods to coalesce (optional, default value is ('GET', 'HEAD'))
+
+        Example: Share one request between threads which handle callbacks of the same call::
+
+            api = bandwidth.client('voice', 'u-user', 't-token', 's-secret', coalesce_requests=True)
+            ...
+            print(api.request_coalescer.coalesced)
+        """
+        self.methods = tuple(methods)
+        self.requests = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, request, send):
+        key = get_coalescing_key(request, self.methods)
+        if key is None:
+            return send(request)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.requests += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.response
+        try:
+            flight.response = send(request)
+            return flight.response
+        except BaseException as err:
+            flight.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
@@ -1,12 +1,9 @@
-import requests
 import six
 import urllib
-import json
 import itertools
-from bandwidth.voice.lazy_enumerable import get_lazy_enumerator
-from bandwidth.convert_camel import convert_object_to_snake_case
+from bandwidth.voice.lazy_enumerable import get_lazy_enumerator, limit_page_size
 from bandwidth.voice.decorators import play_audio
-from bandwidth.version import __version__ as version
+from bandwidth.base_client_module import BaseClient
 
 from .api_exception_module import BandwidthVoiceAPIException
 
@@ -15,6 +12,9 @@ lazy_map = map if six.PY3 else itertools.imap
 
 
 def _set_media_name(recording):
+    if not isinstance(recording, dict):
+        # lazy snake_case views are read-only
+        recording = dict(recording)
     recording['media_name'] = recording.get('media', '').split('/')[-1]
     return recording
 
@@ -22,81 +22,14 @@ def _set_media_name(recording):
 @play_audio('call')
 @play_audio('bridge')
 @play_audio('conference')
-class Client:
+class Client(BaseClient):
 
     """
     Catapult client
     """
 
-    def __init__(self, user_id=None, api_token=None, api_secret=None, **other_options):
-        """
-        Initialize the catatpult client.
-        :type user_id: str
-        :param user_id: catapult user id
-        :type api_token: str
-        :param api_token: catapult api token
-        :type api_secret: str
-        :param api_secret: catapult api secret
-        :type api_endpoint: str
-        :param api_endpoint: catapult api endpoint (optional, default value is https://api.catapult.inetwork.com)
-        :type api_version: str
-        :param api_version: catapult api version (optional, default value is v1)
-
-        :rtype: bandwidth.catapult.Client
-        :returns: bandwidth client
-
-        Init the catapult client::
-
-            api = bandwidth.catapult.Client('YOUR_USER_ID', 'YOUR_API_TOKEN', 'YOUR_API_SECRET')
-            # or
-            api = bandwidth.client('catapult', 'YOUR_USER_ID', 'YOUR_API_TOKEN', 'YOUR_API_SECRET')
-        """
-        if not all((user_id, api_token, api_secret)):
-            raise ValueError('Arguments user_id, api_token and api_secret are required. '
-                             'Use bandwidth.client("catapult", "YOUR-USER-ID", "YOUR-API-TOKEN", "YOUR-API-SECRET")')
-        self.user_id = user_id
-        self.api_endpoint = other_options.get(
-            'api_endpoint', 'https://api.catapult.inetwork.com')
-        self.api_version = other_options.get('api_version', 'v1')
-        self.auth = (api_token, api_secret)
-
-    def _request(self, method, url, *args, **kwargs):
-        user_agent = 'PythonSDK_' + version
-        headers = kwargs.pop('headers', None)
-        if headers:
-            headers['User-Agent'] = user_agent
-        else:
-            headers = {
-                'User-Agent': user_agent
-            }
-        if url.startswith('/'):
-            # relative url
-            url = '%s/%s%s' % (self.api_endpoint, self.api_version, url)
-        return requests.request(method, url, auth=self.auth, headers=headers, *args, **kwargs)
-
-    def _check_response(self, response):
-        if response.status_code >= 400:
-            if response.headers.get('content-type') is not None and \
-                    response.headers.get('content-type').startswith("application/json"):
-                data = response.json()
-                raise BandwidthVoiceAPIException(
-                    response.status_code, data['message'], code=data.get('code'))
-            else:
-                raise BandwidthVoiceAPIException(
-                    response.status_code, response.content.decode('utf-8')[:79])
-
-    def _make_request(self, method, url, *args, **kwargs):
-        response = self._request(method, url, *args, **kwargs)
-        self._check_response(response)
-        data = None
-        id = None
-        if response.headers.get('content-type') is not None and \
-                response.headers.get('content-type').startswith("application/json"):
-            data = convert_object_to_snake_case(response.json())
-        location = response.headers.get('location')
-        if location is not None:
-            id = location.split('/')[-1]
-        return (data, response, id)
+    api_family = 'voice'
+    exception_class = BandwidthVoiceAPIException
 
     def build_sentence(self, sentence, gender=None, locale=None, voice=None, loop_enabled=None, **kwargs):
         """
@@ -149,7 +82,8 @@ class Client:
         kwargs["loopEnabled"] = loop_enabled
         return kwargs
 
-    def list_calls(self, bridge_id=None, conference_id=None, from_=None, to=None, size=None, sort_order=None, **kwargs):
+    def list_calls(self, bridge_id=None, conference_id=None, from_=None, to=None, size=None, sort_order=None,
+                   limit=None, **kwargs):
         """
         Get a list of calls
 
@@ -161,6 +95,7 @@ class Client:
             Values are asc or desc If no value is specified the default value is desc
         :param int size: Used for pagination to indicate the size of each page requested for querying a list of items. \
             If no value is specified the default value is 25. (Maximum value 1000)
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
 
         :rtype: types.GeneratorType
         :returns: list of calls
@@ -225,11 +160,11 @@ class Client:
         kwargs["conferenceId"] = conference_id
         kwargs["from"] = from_
         kwargs["to"] = to
-        kwargs["size"] = size
+        kwargs["size"] = limit_page_size(size, limit, self.adaptive_page_size)
         kwargs["sortOrder"] = sort_order
 
         path = '/users/%s/calls' % self.user_id
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs), limit=limit)
 
     def create_call(self,
                     from_,
@@ -456,12 +391,13 @@ class Client:
         self._make_request('post', '/users/%s/calls/%s/dtmf' %
                            (self.user_id, call_id), json=kwargs)
 
-    def list_call_recordings(self, call_id):
+    def list_call_recordings(self, call_id, limit=None):
         """
         Get a list of recordings of a call
 
         :type call_id: str
         :param call_id: id of a call
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
 
         :rtype: types.GeneratorType
         :returns: list of recordings
@@ -471,14 +407,15 @@ class Client:
             list = api.get_call_recordings('callId')
         """
         path = '/users/%s/calls/%s/recordings' % (self.user_id, call_id)
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path), limit=limit)
 
-    def list_call_transcriptions(self, call_id):
+    def list_call_transcriptions(self, call_id, limit=None):
         """
         Get a list of transcriptions of a call
 
         :type call_id: str
         :param call_id: id of a call
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
 
         :rtype: types.GeneratorType
         :returns: list of transcriptions
@@ -488,13 +425,14 @@ class Client:
             list = api.get_call_transcriptions('callId')
         """
         path = '/users/%s/calls/%s/transcriptions' % (self.user_id, call_id)
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path), limit=limit)
 
-    def list_call_events(self, call_id):
+    def list_call_events(self, call_id, limit=None):
         """
         Get a list of events of a call
 
         :param str call_id: id of a call
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
 
         :rtype: types.GeneratorType
         :returns: list of events
@@ -504,7 +442,7 @@ class Client:
             list = api.get_call_events('callId')
         """
         path = '/users/%s/calls/%s/events' % (self.user_id, call_id)
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path), limit=limit)
 
     def get_call_event(self, call_id, event_id):
         """
@@ -688,15 +626,18 @@ class Client:
             ## False
 
         """
-        call_status = self.get_call(call_id)
-        recording_enabled = call_status['recording_enabled']
+        # the state is read from parsed data in any raw mode of the client
+        data, response, _ = self._make_request('get', '/users/%s/calls/%s' % (self.user_id, call_id), raw=True)
+        recording_enabled = data.get('recordingEnabled')
 
         if recording_enabled is True:
             return self.disable_call_recording(call_id)
         elif recording_enabled is False:
             return self.enable_call_recording(call_id)
+        elif self.raw == 'bytes':
+            return response.content
         else:
-            return call_status
+            return data if self.raw else self._convert_data(data)
 
     def transfer_call(self, call_id, to, caller_id=None, whisper_audio=None, callback_url=None, **kwargs):
         """
@@ -746,12 +687,13 @@ class Client:
                                 whisper_audio=whisper_audio,
                                 **kwargs)
 
-    def list_bridges(self, size=None, **kwargs):
+    def list_bridges(self, size=None, limit=None, **kwargs):
         """
         Get a list of bridges
 
         :param int size: Used for pagination to indicate the size of each page requested for querying a list of items.
             If no value is specified the default value is 25. (Maximum value 1000)
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
 
         :rtype: types.GeneratorType
         :returns: list of bridges
@@ -769,9 +711,9 @@ class Client:
             ## brg-dvpvd7cuy
             ## brg-5ws2buzmq
         """
-        kwargs["size"] = size
+        kwargs["size"] = limit_page_size(size, limit, self.adaptive_page_size)
         path = '/users/%s/bridges' % self.user_id
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs), limit=limit)
 
     def create_bridge(self, call_ids=None, bridge_audio=None, **kwargs):
         """
@@ -852,12 +794,13 @@ class Client:
         self._make_request('post', '/users/%s/bridges/%s' %
                            (self.user_id, bridge_id), json=kwargs)
 
-    def list_bridge_calls(self, bridge_id):
+    def list_bridge_calls(self, bridge_id, limit=None):
         """
         Get a list of calls of a bridge
 
         :type bridge_id: str
         :param bridge_id: id of a bridge
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
 
         :rtype: types.GeneratorType
         :returns: list of calls
@@ -897,7 +840,7 @@ class Client:
             ## ]
         """
         path = '/users/%s/bridges/%s/calls' % (self.user_id, bridge_id)
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path), limit=limit)
 
     def play_audio_to_bridge(self, bridge_id,
                              file_url=None,
@@ -1130,12 +1073,13 @@ class Client:
         self._make_request('post', '/users/%s/conferences/%s/audio' %
                            (self.user_id, conference_id), json=kwargs)
 
-    def list_conference_members(self, conference_id):
+    def list_conference_members(self, conference_id, limit=None):
         """
         Get a list of members of a conference
 
         :type conference_id: str
         :param conference_id: id of a conference
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
 
         :rtype: types.GeneratorType
         :returns: list of recordings
@@ -1177,7 +1121,7 @@ class Client:
         """
         path = '/users/%s/conferences/%s/members' % (
             self.user_id, conference_id)
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path), limit=limit)
 
     def create_conference_member(self,
                                  conference_id,
@@ -1627,12 +1571,13 @@ class Client:
         """
         self.update_conference(conference_id, mute=mute)
 
-    def list_recordings(self, size=None, **kwargs):
+    def list_recordings(self, size=None, limit=None, **kwargs):
         """
         Get a list of call recordings
 
         :param int size: Used for pagination to indicate the size of each page requested for querying a list
             of items. If no value is specified the default value is 25. (Maximum value 1000)
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
         :rtype: types.GeneratorType
         :returns: list of recordings
 
@@ -1661,10 +1606,10 @@ class Client:
             ##     }
             ## ]
         """
-        kwargs['size'] = size
+        kwargs['size'] = limit_page_size(size, limit, self.adaptive_page_size)
         path = '/users/%s/recordings' % self.user_id
-        return lazy_map(_set_media_name,
-                        get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs)))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs), _set_media_name,
+                                   limit=limit)
 
     def get_recording(self, recording_id):
         """
@@ -1692,9 +1637,11 @@ class Client:
             ## }
         """
         path = '/users/%s/recordings/%s' % (self.user_id, recording_id)
-        return _set_media_name(self._make_request('get', path)[0])
+        data = self._make_request('get', path)[0]
+        # raw data is returned as received
+        return data if self.raw else _set_media_name(data)
 
-    def list_transcriptions(self, recording_id, size=None, **kwargs):
+    def list_transcriptions(self, recording_id, size=None, limit=None, **kwargs):
         """
         Get a list of transcriptions
 
@@ -1702,6 +1649,7 @@ class Client:
         :param recording_id: id of a recording
         :param int size: Used for pagination to indicate the size of each page requested for querying a list
             of items. If no value is specified the default value is 25. (Maximum value 1000)
+        :param int limit: max number of items to return, next pages are not fetched after the limit is reached
         :rtype: types.GeneratorType
         :returns: list of transcriptions
 
@@ -1730,10 +1678,10 @@ class Client:
             ##     }
             ## ]
         """
-        kwargs['size'] = size
+        kwargs['size'] = limit_page_size(size, limit, self.adaptive_page_size)
         path = '/users/%s/recordings/%s/transcriptions' % (
             self.user_id, recording_id)
-        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs))
+        return get_lazy_enumerator(self, lambda: self._make_request('get', path, params=kwargs), limit=limit)
 
     def create_transcription(self, recording_id):
         """
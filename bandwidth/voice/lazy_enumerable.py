@@ -1,5 +1,542 @@
+import threading
+from timeit import default_timer
+from six.moves import queue
+from six.moves.urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from bandwidth.json_stream import StreamedItems
+
+# page size used by the api when size is not specified
+DEFAULT_PAGE_SIZE = 25
+
+# max page size supported by the api
+MAX_PAGE_SIZE = 1000
+
+# size of first page in adaptive page size mode (next pages grow while they are consumed faster than fetched)
+ADAPTIVE_FIRST_PAGE_SIZE = 10
+
+
+def get_next_page_url(response):
+    """
+    Extracts url of next page of data from "link" header of the response
+    :type response: requests.Response
+    :param response: response with a page of data
+
+    :rtype: str
+    :returns: url of next page or None for last page
+    """
+    links = response.headers.get('link', '').split(',')
+    for link in links:
+        values = link.split(';')
+        if len(values) == 2 and values[1].strip() == 'rel="next"':
+            return values[0].replace('<', ' ').replace('>', ' ').strip() or None
+    return None
+
+
+class Page(object):
+
+    """
+    Page of api results with its metadata
+    """
+
+    __slots__ = ('items', 'response', 'next_page_url', 'latency', 'url')
+
+    def __init__(self, items, response, next_page_url, latency, url=None):
+        """
+        :param items: items of the page (unparsed body of the page in 'bytes' raw mode, iterator of items
+            which are decoded on demand in stream_items mode)
+        :type response: requests.Response
+        :param response: response with the page
+        :type next_page_url: str
+        :param next_page_url: url of next page or None for last page
+        :type latency: float
+        :param latency: seconds spent to fetch the page
+        :type url: str
+        :param url: url of the page (None for first page of the collection)
+        """
+        self.items = items
+        self.response = response
+        self.next_page_url = next_page_url
+        self.latency = latency
+        self.url = url
+
+    @property
+    def size(self):
+        """
+        Number of items of the page (None for unparsed body and for streamed items which are not decoded yet)
+        """
+        if isinstance(self.items, StreamedItems):
+            return self.items.count if self.items.complete else None
+        return None if isinstance(self.items, bytes) else len(self.items)
+
+    def __repr__(self):
+        return '<Page size=%s next_page_url=%r latency=%.3f>' % (self.size, self.next_page_url, self.latency)
+
+
+def fetch_page(get_data, url=None):
+    """
+    Fetches a page of data
+    :type get_data: types.FunctionType
+    :param get_data: function which returns result of client's _make_request() for the page
+    :type url: str
+    :param url: url of the page (None for first page of the collection)
+
+    :rtype: bandwidth.voice.lazy_enumerable.Page
+    :returns: page with its metadata
+    """
+    started = default_timer()
+    items, response, _ = get_data()
+    return Page(items if items is not None else [], response, get_next_page_url(response),
+                default_timer() - started, url)
+
+
+class _Cursor(object):
+
+    """
+    Position of enumeration: url of a page (None for first page) and number of consumed items of the page
+    """
+
+    def __init__(self, page_url=None, offset=0, done=False):
+        self.page_url = page_url
+        self.offset = offset
+        self.done = done
+
+    def move(self, page, count, page_size):
+        # a consumed page is skipped on resume, page_size is None while size of a streamed page is not known
+        if page_size is None or count < page_size:
+            self.page_url, self.offset = page.url, count
+        elif page.next_page_url is None:
+            self.page_url, self.offset, self.done = None, 0, True
+        else:
+            self.page_url, self.offset = page.next_page_url, 0
+
+    def to_dict(self):
+        return {'page_url': self.page_url, 'offset': self.offset, 'done': self.done}
+
+    @staticmethod
+    def from_dict(data):
+        if not isinstance(data, dict) or 'page_url' not in data:
+            raise ValueError('Invalid cursor %r' % (data,))
+        return _Cursor(data['page_url'], int(data.get('offset') or 0), bool(data.get('done')))
+
+
+def limit_page_size(size, limit, adaptive_page_size=False):
+    """
+    Returns size of first page of a collection whose items are limited
+    :type size: int
+    :param size: requested size of pages (None for default size)
+    :type limit: int
+    :param limit: max number of items (None for no limit)
+    :type adaptive_page_size: bool or int
+    :param adaptive_page_size: adaptive_page_size option of the collection, the first page is small then
+        (optional, default value is False)
+
+    :rtype: int
+    :returns: size of first page (None for default size)
+    """
+    if adaptive_page_size:
+        size = min(size or DEFAULT_PAGE_SIZE, ADAPTIVE_FIRST_PAGE_SIZE)
+    if limit is None:
+        return size
+    return max(1, min(size or DEFAULT_PAGE_SIZE, limit))
+
+
+def _get_page_params(url):
+    # returns (page, size) of a page url or None if the url has no page number and size
+    values = dict(parse_qsl(urlsplit(url).query))
+    try:
+        return int(values['page']), int(values['size'])
+    except (KeyError, ValueError):
+        return None
+
+
+def _resize_page_url(url, new_size):
+    # pages are numbered in units of page size, so the page is resized only if its first item stays the same
+    page_params = _get_page_params(url)
+    if page_params is None:
+        return url
+    page, size = page_params
+    if (page * size) % new_size != 0:
+        return url
+    parts = urlsplit(url)
+    new_values = {'page': str(page * size // new_size), 'size': str(new_size)}
+    query = urlencode([(key, new_values.get(key, value))
+                       for key, value in parse_qsl(parts.query, keep_blank_values=True)])
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, parts.fragment))
+
+
+def _shrink_page_url(url, max_size):
+    # the smallest size not less than max_size which keeps the first item of the page
+    page_params = _get_page_params(url)
+    if page_params is None or page_params[1] <= max_size:
+        return url
+    page, size = page_params
+    for new_size in range(max(1, max_size), size):
+        if (page * size) % new_size == 0:
+            return _resize_page_url(url, new_size)
+    return url
+
+
+class _PageSizer(object):
+
+    """
+    Grows size of next pages while the consumer spends less time on a page than the network does. Pages are
+    measured when the consumer takes them, so prefetched pages are sized by the speed of the consumer too.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._delivered = None
+        self._measure = None
+
+    def page_delivered(self, page):
+        # the consumer takes the page
+        self._delivered = (page.size, page.latency, default_timer())
+
+    def page_consumed(self):
+        # the consumer asks for next page
+        if self._delivered is not None:
+            size, latency, delivered_at = self._delivered
+            self._measure = (size, latency, default_timer() - delivered_at)
+            self._delivered = None
+
+    def get_next_page_url(self, url):
+        if self._measure is None:
+            return url
+        size, latency, consume_time = self._measure
+        if consume_time >= latency:
+            return url
+        page_params = _get_page_params(url)
+        if page_params is None:
+            return url
+        page, url_size = page_params
+        # size of pages which the consumer would consume as long as they are fetched
+        target_size = self.max_size if consume_time <= 0 else \
+            min(self.max_size, int((size or url_size) * latency / consume_time))
+        # the page keeps its first item, so its size should divide number of previous items
+        for new_size in range(target_size, url_size, -1):
+            if (page * url_size) % new_size == 0:
+                return _resize_page_url(url, new_size)
+        return url
+
+
+class _PageLimit(object):
 
-def get_lazy_enumerator(client, get_first_page):
+    """
+    Counts fetched items and shrinks next pages to number of items which are still needed
+    """
+
+    def __init__(self, limit):
+        self.remaining = limit
+
+    def page_fetched(self, count):
+        self.remaining -= count
+
+    @property
+    def reached(self):
+        return self.remaining <= 0
+
+    def get_next_page_url(self, url):
+        return _shrink_page_url(url, self.remaining)
+
+
+class _PageFetcher(object):
+
+    """
+    Fetches pages of data one by one following "next" links
+    """
+
+    def __init__(self, client, get_first_page, raw, start_url=None, sizer=None, limit=None, start_offset=0,
+                 stream_items=False):
+        self.client = client
+        self.get_first_page = get_first_page
+        self.raw = raw
+        self.stream_items = stream_items
+        self.start_url = start_url
+        self.sizer = sizer
+        self.limit = limit
+        self.start_offset = start_offset
+
+    def _get_page(self, url):
+        if url is None:
+            if self.stream_items:
+                return fetch_page(lambda: self.client._call_with_streamed_items(self.get_first_page))
+            return fetch_page(self.get_first_page)
+        return fetch_page(lambda: self.client._make_request('get', url, raw=self.raw,
+                                                            stream_items=self.stream_items), url)
+
+    def pages(self):
+        url = self.start_url
+        skip = self.start_offset
+        while True:
+            page = self._get_page(url)
+            yield page
+            if self.limit is not None:
+                # streamed items are counted when the page is consumed
+                self.limit.page_fetched((page.size or 0) - skip)
+                skip = 0
+            url = page.next_page_url
+            if url is None or (self.limit is not None and self.limit.reached):
+                break
+            if self.sizer is not None:
+                url = self.sizer.get_next_page_url(url)
+            if self.limit is not None:
+                url = self.limit.get_next_page_url(url)
+
+
+class LazyEnumerator(object):
+
+    """
+    Lazy collection of api results. Makes api requests for new parts of data on demand only.
+    """
+
+    def __init__(self, client, get_first_page, map_item=None, raw=None, prefetch_pages=None,
+                 adaptive_page_size=None, limit=None, stream_items=None):
+        """
+        :type client: bandwidth.catapult.Client
+        :param client: catapult client
+        :type get_first_page: types.FunctionType
+        :param get_first_page: function which returns contane of first part (page) of data
+        :type map_item: types.FunctionType
+        :param map_item: function to apply to each item (optional, it is not applied to raw data)
+        :type raw: bool or str
+        :param raw: True to yield parsed json items without conversion to snake_case, 'bytes' to yield
+            unparsed body of each page (optional, default value is client's raw option)
+        :type prefetch_pages: int
+        :param prefetch_pages: number of next pages to fetch in background while current page is consumed
+            (optional, default value is client's prefetch_pages option, 0 disables prefetching)
+        :type adaptive_page_size: bool or int
+        :param adaptive_page_size: True to grow size of next pages (up to 1000 items) while they are consumed
+            faster than fetched, a number to limit size of pages (optional, default value is client's
+            adaptive_page_size option)
+        :type limit: int
+        :param limit: max number of items to return, next pages are not fetched after the limit is reached
+            (optional, it is not supported in 'bytes' raw mode)
+        :type stream_items: bool
+        :param stream_items: True to decode items of pages incrementally from the response stream, pages are
+            not prefetched then (optional, default value is client's stream_items option)
+        """
+        self.client = client
+        self.get_first_page = get_first_page
+        self.raw = getattr(client, 'raw', False) if raw is None else raw
+        self.prefetch_pages = getattr(client, 'prefetch_pages', 0) if prefetch_pages is None else prefetch_pages
+        self.adaptive_page_size = getattr(client, 'adaptive_page_size', False) \
+            if adaptive_page_size is None else adaptive_page_size
+        if limit is not None and self.raw == 'bytes':
+            raise ValueError('Argument limit is not supported for unparsed pages (raw="bytes")')
+        self.limit = limit
+        self.stream_items = getattr(client, 'stream_items', False) if stream_items is None else stream_items
+        self.map_item = None if self.raw else map_item
+        self._cursor = _Cursor()
+        self._started = False
+        self._items = self._iterate()
+
+    def _get_page_items(self, items):
+        # unparsed page is yielded as single item
+        return [items] if self.raw == 'bytes' else items
+
+    def _map_page(self, page):
+        if self.map_item is not None:
+            page.items = [self.map_item(item) for item in page.items]
+        return page
+
+    def _prefetch_pages(self, fetcher):
+        # pages are fetched by background thread into bounded queue, None marks the end of data
+        pages = queue.Queue(self.prefetch_pages)
+        stopped = threading.Event()
+        # the thread doesn't refer to the enumerator, so an abandoned enumerator is collected and stops the thread
+
+        def fetch():
+            try:
+                for page in fetcher.pages():
+                    pages.put((page, None))
+                    if stopped.is_set():
+                        return
+                pages.put(None)
+            except Exception as err:
+                pages.put((None, err))
+
+        thread = threading.Thread(target=fetch, name='bandwidth-prefetch')
+        thread.daemon = True
+        thread.start()
+        try:
+            while True:
+                result = pages.get()
+                if result is None:
+                    break
+                page, err = result
+                if err is not None:
+                    raise err
+                yield page
+        finally:
+            # unblock the thread, it stops before next request
+            stopped.set()
+            while not pages.empty():
+                pages.get_nowait()
+
+    def _create_sizer(self):
+        if not self.adaptive_page_size:
+            return None
+        return _PageSizer(MAX_PAGE_SIZE if self.adaptive_page_size is True else self.adaptive_page_size)
+
+    def _create_limit(self):
+        return None if self.limit is None else _PageLimit(self.limit)
+
+    def _measure_pages(self, pages, sizer):
+        # the sizer measures time which the consumer spends on each page
+        try:
+            for page in pages:
+                sizer.page_delivered(page)
+                yield page
+                sizer.page_consumed()
+        finally:
+            pages.close()
+
+    def _get_pages(self):
+        self._started = True
+        stream_items = self.stream_items and self.raw != 'bytes'
+        sizer = self._create_sizer()
+        fetcher = _PageFetcher(self.client, self.get_first_page, self.raw, self._cursor.page_url,
+                               sizer, self._create_limit(), self._cursor.offset, stream_items)
+        # streamed pages are consumed while they are downloaded, so they are not prefetched
+        if self.prefetch_pages and not stream_items:
+            pages = self._prefetch_pages(fetcher)
+        else:
+            pages = fetcher.pages()
+        return pages if sizer is None else self._measure_pages(pages, sizer)
+
+    def _iterate(self):
+        cursor = self._cursor
+        if cursor.done:
+            return
+        skip = cursor.offset
+        remaining = self.limit
+        page = None
+        pages = self._get_pages()
+        try:
+            for page in pages:
+                items = self._get_page_items(page.items)
+                size = page.size if self.raw != 'bytes' else 1
+                count = 0
+                for count, item in enumerate(items, 1):
+                    if count <= skip:
+                        continue
+                    if remaining is not None:
+                        if remaining <= 0:
+                            return
+                        remaining -= 1
+                    cursor.move(page, count, size)
+                    yield item if self.map_item is None else self.map_item(item)
+                cursor.move(page, count, count)
+                skip = 0
+        finally:
+            if page is not None and isinstance(page.items, StreamedItems):
+                page.items.close()
+            pages.close()
+
+    def _iterate_pages(self):
+        cursor = self._cursor
+        if cursor.done:
+            return
+        skip = cursor.offset
+        remaining = self.limit
+        pages = self._get_pages()
+        try:
+            for page in pages:
+                if remaining is not None and remaining <= 0:
+                    return
+                if isinstance(page.items, StreamedItems):
+                    page.items = list(page.items)
+                size = len(self._get_page_items(page.items))
+                count = size
+                if skip:
+                    page.items = page.items[skip:]
+                    count -= skip
+                if remaining is not None and count > remaining:
+                    page.items = page.items[:remaining]
+                    count = remaining
+                cursor.move(page, skip + count, size)
+                skip = 0
+                if remaining is not None:
+                    remaining -= count
+                yield self._map_page(page)
+        finally:
+            pages.close()
+
+    def iter_pages(self):
+        """
+        Returns whole pages of the collection with their metadata instead of single items.
+        Pages are returned from the position of a restored cursor (the rest of partially consumed page
+        is returned as a page).
+
+        :rtype: types.GeneratorType
+        :returns: pages (bandwidth.voice.lazy_enumerable.Page) with attributes items, size,
+            next_page_url, latency and response
+
+        Example: Save messages page by page::
+
+            for page in api.list_messages(size=1000).iter_pages():
+                db.insert_many(page.items)
+                print('%d messages fetched in %.2f s' % (page.size, page.latency))
+        """
+        return self._iterate_pages()
+
+    def checkpoint(self):
+        """
+        Returns position of the enumeration: url of current page and number of consumed items of the page.
+        The position is a json serializable dictionary which can be passed to restore() of a new collection.
+
+        :rtype: dict
+        :returns: cursor with keys page_url (None for first page), offset and done
+
+        Example: Save position of an export::
+
+            transactions = api.list_account_transactions(size=1000)
+            for transaction in transactions:
+                save(transaction)
+                save_cursor(json.dumps(transactions.checkpoint()))
+        """
+        return self._cursor.to_dict()
+
+    def restore(self, cursor):
+        """
+        Moves the enumeration to a position returned by checkpoint(). Items consumed before the checkpoint
+        are not returned again and pages before the checkpoint are not fetched.
+        It should be called before the enumeration starts.
+
+        :type cursor: dict
+        :param cursor: position returned by checkpoint() of a collection returned by the same method
+            with the same arguments
+
+        :rtype: bandwidth.voice.lazy_enumerable.LazyEnumerator
+        :returns: the collection
+
+        Example: Resume an export::
+
+            transactions = api.list_account_transactions(size=1000).restore(json.loads(load_cursor()))
+            for transaction in transactions:
+                save(transaction)
+        """
+        if self._started:
+            raise ValueError('Cursor can be restored before the enumeration only')
+        self._cursor = _Cursor.from_dict(cursor)
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._items)
+
+    next = __next__
+
+    def close(self):
+        """
+        Stop the enumeration (no more requests will be made, results of a prefetch request being made are dropped)
+        """
+        self._items.close()
+
+
+def get_lazy_enumerator(client, get_first_page, map_item=None, raw=None, prefetch_pages=None,
+                        adaptive_page_size=None, limit=None, stream_items=None):
     """
     Returns api results as "lazy" collection.
     Makes api requests for new parts of data on demand only.
@@ -7,24 +544,30 @@ def get_lazy_enumerator(client, get_first_page):
     :param client: catapult client
     :type get_first_page: types.FunctionType
     :param get_first_page: function which returns contane of first part (page) of data
+    :type map_item: types.FunctionType
+    :param map_item: function to apply to each item (optional, it is not applied to raw data)
+    :type raw: bool or str
+    :param raw: True to yield parsed json items without conversion to snake_case, 'bytes' to yield
+        unparsed body of each page (optional, default value is client's raw option).
+        It is applied to next pages, get_first_page should request first page in the same mode.
+    :type prefetch_pages: int
+    :param prefetch_pages: number of next pages to fetch in background while current page is consumed
+        (optional, default value is client's prefetch_pages option, 0 disables prefetching)
+    :type adaptive_page_size: bool or int
+    :param adaptive_page_size: True to grow size of next pages (up to 1000 items) while they are consumed
+        faster than fetched, a number to limit size of pages (optional, default value is client's
+        adaptive_page_size option). The first page keeps size requested by get_first_page, so it should request
+        first page of size limit_page_size(size, limit, adaptive_page_size).
+    :type limit: int
+    :param limit: max number of items to return, next pages are not fetched after the limit is reached and
+        the last page is shrunk to needed number of items (optional, it is not supported in 'bytes' raw mode).
+        get_first_page should request first page of size limit_page_size(size, limit).
+    :type stream_items: bool
+    :param stream_items: True to decode items of pages incrementally from the response stream, pages are
+        not prefetched then (optional, default value is client's stream_items option)
 
-    :rtype: types.GeneratorType
+    :rtype: bandwidth.voice.lazy_enumerable.LazyEnumerator
     :returns: lazy collection
     """
-    get_data = get_first_page
-    while True:
-        items, response, _ = get_data()
-        next_page_url = ''
-        for item in items:
-            yield item
-        links = response.headers.get('link', '').split(',')
-        for link in links:
-            values = link.split(';')
-            if len(values) == 2 and values[1].strip() == 'rel="next"':
-                next_page_url = values[0].replace('<', ' ').replace('>', ' ').strip()
-                break
-        if len(next_page_url) == 0:
-            break
-
-        def get_data():
-            return client._make_request('get', next_page_url)
+    return LazyEnumerator(client, get_first_page, map_item, raw, prefetch_pages, adaptive_page_size, limit,
+                          stream_items)
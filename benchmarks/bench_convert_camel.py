@@ -0,0 +1,45 @@
+"""
+Compares camelCase to snake_case conversion of api responses with the previous (uncached) implementation.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_convert_camel
+"""
+from __future__ import print_function
+import re
+import timeit
+from tests.camel_test_values import before_array_dict
+from bandwidth.convert_camel import convert_object_to_snake_case, snake_case_view
+
+
+def legacy_convert_string_to_snake_case(s):
+    a = re.compile('((?<=[a-z0-9])[A-Z]|(?!^)[A-Z](?=[a-z]))')
+    return a.sub(r'_\1', s).lower()
+
+
+def legacy_convert_object_to_snake_case(o):
+    if isinstance(o, list):
+        return [legacy_convert_object_to_snake_case(i) if isinstance(i, (list, dict)) else i for i in o]
+    elif isinstance(o, dict):
+        out = {}
+        for k in o:
+            new_k = legacy_convert_string_to_snake_case(k)
+            out[new_k] = legacy_convert_object_to_snake_case(o[k]) if isinstance(o[k], (list, dict)) else o[k]
+        return out
+    return o
+
+
+def main(page_size=1000, repeat=5):
+    # a page of list_* results built from the test values
+    page = (before_array_dict * (page_size // len(before_array_dict) + 1))[:page_size]
+    assert legacy_convert_object_to_snake_case(page) == convert_object_to_snake_case(page)
+    for name, func in [('legacy', legacy_convert_object_to_snake_case), ('cached', convert_object_to_snake_case)]:
+        best = min(timeit.repeat(lambda: func(page), number=1, repeat=repeat))
+        print('%-8s %d items: %.2f ms per page' % (name, page_size, best * 1000))
+    # lazy views convert keys of accessed dictionaries only (here one field of each item is read)
+    best = min(timeit.repeat(lambda: [item['code'] for item in snake_case_view(page)], number=1, repeat=repeat))
+    print('%-8s %d items: %.2f ms per page (one field per item)' % ('lazy', page_size, best * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Compares json codecs on request and response bodies of messaging and voice api.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_json_codec
+"""
+from __future__ import print_function
+import json
+import timeit
+import requests
+from bandwidth.json_codec import get_codec, orjson, ujson
+
+
+def create_message(i):
+    return {
+        'id': 'm-%020d' % i,
+        'messageId': 'm-%020d' % i,
+        'from': '+19195551212',
+        'to': '+1919555%04d' % (i % 10000),
+        'text': 'Your verification code is %06d. It expires in 10 minutes.' % i,
+        'time': '2017-02-06T18:41:37Z',
+        'direction': 'out',
+        'state': 'sent',
+        'deliveryState': 'delivered',
+        'deliveryCode': 0,
+        'deliveryDescription': 'Message delivered to carrier',
+        'media': [],
+        'callbackUrl': 'https://example.com/callbacks/messages',
+        'receiptRequested': 'all',
+        'tag': 'campaign-%d' % (i % 10)
+    }
+
+
+def create_call(i):
+    return {
+        'id': 'c-%020d' % i,
+        'activeTime': '2017-02-06T18:41:37Z',
+        'chargeableDuration': 60,
+        'direction': 'out',
+        'endTime': '2017-02-06T18:42:37Z',
+        'events': 'https://api.catapult.inetwork.com/v1/users/u-user/calls/c-%020d/events' % i,
+        'from': '+19195551212',
+        'recordingEnabled': False,
+        'recordingFileFormat': 'wav',
+        'recordings': 'https://api.catapult.inetwork.com/v1/users/u-user/calls/c-%020d/recordings' % i,
+        'startTime': '2017-02-06T18:41:30Z',
+        'state': 'completed',
+        'to': '+1919555%04d' % (i % 10000),
+        'transcriptionEnabled': False,
+        'transcriptions': 'https://api.catapult.inetwork.com/v1/users/u-user/calls/c-%020d/transcriptions' % i
+    }
+
+
+def decode_with_requests(content):
+    # previous implementation: response.json() decodes the body to text first
+    response = requests.Response()
+    response._content = content
+    response.encoding = 'utf-8'
+    return response.json()
+
+
+def main(page_size=1000, batch_size=100, repeat=5, number=20):
+    send_message = {'from': '+19195551212', 'to': '+19195551213', 'text': 'Hello',
+                    'receiptRequested': 'all', 'callbackUrl': 'https://example.com/callbacks/messages'}
+    send_messages = [dict(send_message, to='+1919555%04d' % i) for i in range(batch_size)]
+    messages_page = json.dumps([create_message(i) for i in range(page_size)]).encode('utf-8')
+    calls_page = json.dumps([create_call(i) for i in range(page_size)]).encode('utf-8')
+    codecs = [get_codec('json')] + [get_codec(name) for name, module in [('orjson', orjson), ('ujson', ujson)]
+                                    if module is not None]
+    cases = [
+        ('encode send_message body', lambda codec: codec.dumps(send_message), number * 100),
+        ('encode send_messages body (%d messages)' % batch_size, lambda codec: codec.dumps(send_messages), number),
+        ('decode list_messages page (%d items)' % page_size, lambda codec: codec.loads(messages_page), number),
+        ('decode list_calls page (%d items)' % page_size, lambda codec: codec.loads(calls_page), number)
+    ]
+    for title, func, count in cases:
+        print(title)
+        if title.startswith('decode'):
+            page = messages_page if 'messages' in title else calls_page
+            best = min(timeit.repeat(lambda: decode_with_requests(page), number=count, repeat=repeat))
+            print('    %-18s %.3f ms' % ('response.json()', best * 1000 / count))
+        for codec in codecs:
+            best = min(timeit.repeat(lambda: func(codec), number=count, repeat=repeat))
+            print('    %-18s %.3f ms' % (codec.name, best * 1000 / count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Measures throughput of the durable outbox against a local stub of the messaging api: rate of durable enqueues
+(group commit) and rate of sending of queued messages.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_outbox
+"""
+from __future__ import print_function
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+from six.moves import BaseHTTPServer, socketserver
+
+import bandwidth
+from bandwidth.outbox import Outbox
+
+
+class StubServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    ids = itertools.count()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(201)
+        self.send_header('Location', '/v1/users/u-user/messages/m-%d' % next(self.ids))
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def enqueue(outbox, count, threads):
+    def run(n):
+        for i in range(n):
+            outbox.send_message(from_='+19195551212', to='+1919555%04d' % i, text='Hello %d' % i)
+    workers = [threading.Thread(target=run, args=(count // threads,)) for _ in range(threads)]
+    start = time.time()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.time() - start
+
+
+def main(count=2000):
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    api = bandwidth.client('messaging', 'u-user', 't-token', 's-secret',
+                           api_endpoint='http://127.0.0.1:%d' % server.server_address[1])
+    directory = tempfile.mkdtemp()
+    try:
+        for threads in (1, 16):
+            path = os.path.join(directory, 'enqueue-%d.log' % threads)
+            # without workers only enqueueing (fsync of the log) is measured
+            outbox = Outbox(path, messaging=api, workers=0)
+            elapsed = enqueue(outbox, count, threads)
+            outbox.close()
+            print('enqueue %2d threads: %7.0f messages/s' % (threads, count / elapsed))
+        for workers in (1, 4, 16):
+            path = os.path.join(directory, 'enqueue-16.log')
+            start = time.time()
+            outbox = Outbox(path, messaging=api, workers=workers)
+            outbox.wait_idle()
+            elapsed = time.time() - start
+            outbox.close()
+            rate = outbox.delivered / elapsed
+            print('send    %2d workers: %7.0f messages/s (%d sent)' % (workers, rate, outbox.delivered))
+            # the next run sends the same messages again
+            shutil.copy(os.path.join(directory, 'enqueue-1.log'), path)
+    finally:
+        shutil.rmtree(directory)
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
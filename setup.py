@@ -35,4 +35,8 @@ setup(
         'six',
         'lxml'
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'fast-json': ['orjson; python_version >= "3.8"']
+    },
 )
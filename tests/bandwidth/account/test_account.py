@@ -20,7 +20,7 @@ class AccountTests(unittest.TestCase):
         estimated_json = """
         {"balance": "538.37250","accountType":"pre-pay"}
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_account()
             p.assert_called_with(
@@ -30,6 +30,36 @@ class AccountTests(unittest.TestCase):
                 headers=headers)
             self.assertEqual('pre-pay', data['account_type'])
 
+    def test_scan_account_transactions(self):
+        """
+        scan_account_transactions() should return account transactions of all shards of the range
+        """
+        def request(method, url, **kwargs):
+            return create_response(200, '[{"id": "%s"}]' % kwargs['params']['fromDate'])
+        with patch('requests.Session.request', side_effect=request) as p:
+            client = get_client()
+            data = list(client.scan_account_transactions('2017-01-01T00:00:00Z', '2017-01-01T23:59:59Z', shards=2,
+                                                         trans_type='charge'))
+            self.assertEqual(['2017-01-01T00:00:00Z', '2017-01-01T12:00:00Z'], [t['id'] for t in data])
+            self.assertEqual(2, p.call_count)
+            params = sorted((c[1]['params'] for c in p.call_args_list), key=lambda p: p['fromDate'])
+            self.assertEqual('2017-01-01T11:59:59Z', params[0]['toDate'])
+            self.assertEqual('2017-01-01T23:59:59Z', params[1]['toDate'])
+            self.assertEqual('charge', params[1]['type'])
+
+    def test_scan_account_transactions_desc(self):
+        """
+        scan_account_transactions() should return shards from the newest one for descending sort order
+        """
+        def request(method, url, **kwargs):
+            return create_response(200, '[{"id": "%s"}]' % kwargs['params']['fromDate'])
+        with patch('requests.Session.request', side_effect=request) as p:
+            client = get_client()
+            data = list(client.scan_account_transactions('2017-01-01T00:00:00Z', '2017-01-01T23:59:59Z', shards=2,
+                                                         sort_order='desc'))
+            self.assertEqual(['2017-01-01T12:00:00Z', '2017-01-01T00:00:00Z'], [t['id'] for t in data])
+            self.assertEqual(['desc', 'desc'], [c[1]['params']['sortOrder'] for c in p.call_args_list])
+
     def test_list_account_transactions(self):
         """
         list_account_transactions() should return account transactions
@@ -40,7 +70,8 @@ class AccountTests(unittest.TestCase):
             'fromDate': None,
             'type': None,
             'size': None,
-            'number': None
+            'number': None,
+            'sortOrder': None
         }
         estimated_json = """
             [
@@ -55,7 +86,7 @@ class AccountTests(unittest.TestCase):
                 }
             ]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_account_transactions())
             p.assert_called_with(
@@ -9,6 +9,7 @@ else:
     from mock import patch
 
 from bandwidth.voice import Client
+from bandwidth.account import Client as AccountClient
 
 
 class AvailableNumberTests(unittest.TestCase):
@@ -39,7 +40,7 @@ class AvailableNumberTests(unittest.TestCase):
             "price": "0.60"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.search_available_local_numbers(quantity=1)
             p.assert_called_with(
@@ -66,7 +67,7 @@ class AvailableNumberTests(unittest.TestCase):
         "price": "0.75"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.search_available_toll_free_numbers(quantity=1, pattern='*456')
             p.assert_called_with(
@@ -98,7 +99,7 @@ class AvailableNumberTests(unittest.TestCase):
         "location": "https://.../v1/users/.../phoneNumbers/{numberId1}"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.search_and_order_local_numbers(zip_code='27606', quantity=1)
             p.assert_called_with(
@@ -123,7 +124,7 @@ class AvailableNumberTests(unittest.TestCase):
         "location": "https://.../v1/users/.../phoneNumbers/{numberId1}"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.search_and_order_toll_free_numbers(quantity=1)
             p.assert_called_with(
@@ -134,3 +135,26 @@ class AvailableNumberTests(unittest.TestCase):
                 params=estimated_json_request)
             self.assertEqual('{national_number1}', data[0]['national_number'])
             self.assertEqual('{numberId1}', data[0]['id'])
+
+    def test_search_and_order_with_lazy_snake_case(self):
+        """
+        search_and_order_*_numbers() should add ids to numbers when responses are lazy snake_case views
+        """
+        estimated_json = '[{"nationalNumber": "{national_number1}", "location": "https://.../numbers/{numberId1}"}]'
+        client = AccountClient('userId', 'apiToken', 'apiSecret', lazy_snake_case=True)
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)):
+            for data in (client.search_and_order_local_numbers(zip_code='27606', quantity=1),
+                         client.search_and_order_toll_free_numbers(quantity=1)):
+                self.assertEqual('{national_number1}', data[0]['national_number'])
+                self.assertEqual('{numberId1}', data[0]['id'])
+
+    def test_search_and_order_with_raw(self):
+        """
+        search_and_order_*_numbers() should return raw data as received
+        """
+        estimated_json = '[{"nationalNumber": "{national_number1}", "location": "https://.../numbers/{numberId1}"}]'
+        client = AccountClient('userId', 'apiToken', 'apiSecret', raw=True)
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)):
+            data = client.search_and_order_toll_free_numbers(quantity=1)
+        self.assertEqual([{'nationalNumber': '{national_number1}', 'location': 'https://.../numbers/{numberId1}'}],
+                         data)
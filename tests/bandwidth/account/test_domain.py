@@ -23,7 +23,7 @@ class DomainTests(unittest.TestCase):
             "name": "domainName"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_domains())
             p.assert_called_with(
@@ -45,7 +45,7 @@ class DomainTests(unittest.TestCase):
         }
         estimated_response = create_response(201)
         estimated_response.headers['Location'] = 'http://localhost/domainId'
-        with patch('requests.request', return_value=estimated_response) as p:
+        with patch('requests.Session.request', return_value=estimated_response) as p:
             client = get_client()
             data = {'name': 'myDomain'}
             id = client.create_domain(**data)
@@ -67,7 +67,7 @@ class DomainTests(unittest.TestCase):
                 "id"          : "rd-domainId",
                 "name"        : "qwerty"}
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_domain('rd-domainId')
             p.assert_called_with(
@@ -81,7 +81,7 @@ class DomainTests(unittest.TestCase):
         """
         delete_domain() should remove an domain
         """
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             client.delete_domain('domainId')
             p.assert_called_with(
@@ -22,7 +22,7 @@ class EndpointTests(unittest.TestCase):
             "id": "endpointId"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_domain_endpoints('domainId'))
             p.assert_called_with(
@@ -48,7 +48,7 @@ class EndpointTests(unittest.TestCase):
                 'password': 'abc123'
             }
         }
-        with patch('requests.request', return_value=estimated_response) as p:
+        with patch('requests.Session.request', return_value=estimated_response) as p:
             client = get_client()
             data = {'name': 'mysip', 'password': 'abc123'}
             id = client.create_domain_endpoint('domainId', **data)
@@ -70,7 +70,7 @@ class EndpointTests(unittest.TestCase):
             "name": "mysip"
         }
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_domain_endpoint('domainId', 'endpointId')
             p.assert_called_with(
@@ -92,7 +92,7 @@ class EndpointTests(unittest.TestCase):
                 'password': None
             }
         }
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             data = {'description': 'My SIP'}
             client.update_domain_endpoint('domainId', 'endpointId', **data)
@@ -107,7 +107,7 @@ class EndpointTests(unittest.TestCase):
         """
         delete_domain_endpoint() should remove an endpoint
         """
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             client.delete_domain_endpoint('domainId', 'endpointId')
             p.assert_called_with(
@@ -126,7 +126,7 @@ class EndpointTests(unittest.TestCase):
             "expires": 3600
         }
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             t = client.create_domain_endpoint_auth_token('domainId', 'endpointId')
             p.assert_called_with(
@@ -26,7 +26,7 @@ class ErrorTests(unittest.TestCase):
             "code" : "no-application-for-number"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_errors())
             p.assert_called_with(
@@ -50,7 +50,7 @@ class ErrorTests(unittest.TestCase):
             "code" : "no-application-for-number"
         }
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_error('errorId')
             p.assert_called_with(
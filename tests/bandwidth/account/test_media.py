@@ -24,7 +24,7 @@ class MediaTests(unittest.TestCase):
             "mediaName": "file1"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_media_files())
             p.assert_called_with(
@@ -38,7 +38,7 @@ class MediaTests(unittest.TestCase):
         """
         upload_media_file() should upload file
         """
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             upload_headers = {
                 'content-type': 'application/octet-stream',
                 'User-Agent': headers['User-Agent']
@@ -52,7 +52,7 @@ class MediaTests(unittest.TestCase):
         """
         upload_media_file() should upload file by file path
         """
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             upload_headers = {
                 'content-type': 'application/octet-stream',
                 'User-Agent': headers['User-Agent']
@@ -74,7 +74,7 @@ class MediaTests(unittest.TestCase):
         """
         estimated_response = create_response(200, '123', 'text/plain')
         estimated_response.raw = MagicMock()
-        with patch('requests.request', return_value=estimated_response) as p:
+        with patch('requests.Session.request', return_value=estimated_response) as p:
             client = get_client()
             content, content_type = client.download_media_file('file1')
             p.assert_called_with(
@@ -90,7 +90,7 @@ class MediaTests(unittest.TestCase):
         """
         delete_media_file() should remove a media file
         """
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             client.delete_media_file('file1')
             p.assert_called_with(
@@ -25,7 +25,7 @@ class NumberInfoTests(unittest.TestCase):
         "updated": "2013-09-23T16:42:18Z"
         }
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_number_info('1234567890')
             p.assert_called_with(
@@ -0,0 +1,368 @@
+"""
+Tests of asynchronous clients. The module uses python 3.5 syntax, so it is imported by test_async_client only
+on python 3.5+.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+import six
+from tests.bandwidth.helpers import create_response, AUTH, headers
+
+from bandwidth.async_client_module import AsyncVoiceClient, AsyncAccountClient, AsyncMessagingClient, \
+    AsyncRecordedTransport, AsyncTransport, AsyncLazyEnumerator, AsyncRequestCoalescer, AsyncRetryPolicy, \
+    AsyncRateLimiter, AsyncIdempotencyKeys, AsyncClient, async_client, _to_aiohttp_params, _to_aiohttp_kwargs, \
+    aiohttp
+from bandwidth.voice import BandwidthVoiceAPIException, Client as VoiceClient
+from bandwidth.json_codec import get_codec
+from bandwidth.transport import TransportRequest
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine) if sys.version_info < (3, 7) \
+        else asyncio.run(coroutine)
+
+
+async def collect_items(enumerator):
+    # async comprehensions require python 3.6
+    items = []
+    async for item in enumerator:
+        items.append(item)
+    return items
+
+
+def collect(enumerator):
+    return run(collect_items(enumerator))
+
+
+class AsyncClientTests(unittest.TestCase):
+
+    def test_get_call(self):
+        """
+        get_call() should be awaitable and return call data
+        """
+        transport = AsyncRecordedTransport([create_response(200, '{"id": "callId", "recordingEnabled": false}')])
+        client = AsyncVoiceClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        data = run(client.get_call('callId'))
+        self.assertEqual({'id': 'callId', 'recording_enabled': False}, data)
+        request = transport.requests[0]
+        self.assertEqual('get', request.method)
+        self.assertEqual('https://api.catapult.inetwork.com/v1/users/userId/calls/callId', request.url)
+        self.assertEqual({'auth': AUTH, 'headers': headers}, request.kwargs)
+        self.assertEqual('voice', request.family)
+
+    def test_method_with_several_requests(self):
+        """
+        toggle_call_recording() should make all requests of synchronous version
+        """
+        response = create_response(200)
+        response.headers['Location'] = 'http://localhost/callId'
+        transport = AsyncRecordedTransport([create_response(200, '{"id": "callId", "recordingEnabled": false}'),
+                                            response])
+        client = AsyncVoiceClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        self.assertEqual('callId', run(client.toggle_call_recording('callId')))
+        self.assertEqual(['get', 'post'], [r.method for r in transport.requests])
+        self.assertTrue(transport.requests[1].kwargs['json']['recordingEnabled'])
+
+    def test_method_with_error(self):
+        """
+        methods should raise api exceptions
+        """
+        transport = AsyncRecordedTransport([create_response(404, '{"message": "Not found", "code": "not-found"}')])
+        client = AsyncVoiceClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        with self.assertRaises(BandwidthVoiceAPIException) as r:
+            run(client.get_call('callId'))
+        self.assertEqual('not-found', r.exception.code)
+
+    def test_list_method(self):
+        """
+        list_*() should return asynchronous lazy collection
+        """
+        response1 = create_response(200, '[{"id": "1", "media": "http://localhost/media/1.wav"}]')
+        response1.headers['link'] = '<https://localhost/recordings?page=1&size=1>; rel="next"'
+        response2 = create_response(200, '[{"id": "2", "media": "http://localhost/media/2.wav"}]')
+        transport = AsyncRecordedTransport([response1, response2])
+        client = AsyncVoiceClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        recordings = client.list_recordings(size=1)
+        self.assertIsInstance(recordings, AsyncLazyEnumerator)
+        self.assertEqual(0, len(transport.requests))
+        data = collect(recordings)
+        self.assertEqual(['1.wav', '2.wav'], [item['media_name'] for item in data])
+        self.assertEqual({'size': 1}, transport.requests[0].kwargs['params'])
+        self.assertEqual('https://localhost/recordings?page=1&size=1', transport.requests[1].url)
+
+    def test_list_method_iter_pages(self):
+        """
+        iter_pages() should return pages of asynchronous lazy collection
+        """
+        response1 = create_response(200, '[{"id": "1", "media": "http://localhost/media/1.wav"}]')
+        response1.headers['link'] = '<https://localhost/recordings?page=1&size=1>; rel="next"'
+        response2 = create_response(200, '[{"id": "2", "media": "http://localhost/media/2.wav"}]')
+        transport = AsyncRecordedTransport([response1, response2])
+        client = AsyncVoiceClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        pages = collect(client.list_recordings(size=1).iter_pages())
+        self.assertEqual([['1.wav'], ['2.wav']], [[item['media_name'] for item in page.items] for page in pages])
+        self.assertEqual(['https://localhost/recordings?page=1&size=1', None],
+                         [page.next_page_url for page in pages])
+        self.assertEqual(2, len(transport.requests))
+
+    def test_list_method_restore(self):
+        """
+        restore() should resume asynchronous lazy collection from a checkpoint
+        """
+        response1 = create_response(200, '[{"id": "2"}, {"id": "3"}]')
+        response1.headers['link'] = '<https://localhost/messages?page=2>; rel="next"'
+        response2 = create_response(200, '[{"id": "4"}]')
+        transport = AsyncRecordedTransport([response1, response2])
+        client = AsyncMessagingClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        messages = client.list_messages().restore({'page_url': 'https://localhost/messages?page=1', 'offset': 1})
+        self.assertEqual([{'id': '3'}, {'id': '4'}], collect(messages))
+        self.assertEqual('https://localhost/messages?page=1', transport.requests[0].url)
+        self.assertEqual({'page_url': None, 'offset': 0, 'done': True}, messages.checkpoint())
+
+    def test_list_method_with_limit(self):
+        """
+        list_*() should not fetch pages after the limit
+        """
+        response1 = create_response(200, '[{"id": "1"}, {"id": "2"}]')
+        response1.headers['link'] = '<https://localhost/messages?page=1&size=2>; rel="next"'
+        response2 = create_response(200, '[{"id": "3"}]')
+        transport = AsyncRecordedTransport([response1, response2])
+        client = AsyncMessagingClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        self.assertEqual([{'id': '1'}, {'id': '2'}, {'id': '3'}], collect(client.list_messages(size=2, limit=3)))
+        self.assertEqual('https://localhost/messages?page=2&size=1', transport.requests[1].url)
+        transport = AsyncRecordedTransport([response1])
+        client = AsyncMessagingClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        self.assertEqual([{'id': '1'}], collect(client.list_messages(limit=1)))
+        self.assertEqual(1, len(transport.requests))
+
+    def test_list_method_aclose(self):
+        """
+        aclose() should stop the enumeration
+        """
+        response = create_response(200, '[{"id": "1"}, {"id": "2"}]')
+        response.headers['link'] = '<https://localhost/messages?page=1>; rel="next"'
+        transport = AsyncRecordedTransport([response])
+        client = AsyncMessagingClient('userId', 'apiToken', 'apiSecret', transport=transport)
+
+        async def read_first():
+            messages = client.list_messages()
+            async for message in messages:
+                await messages.aclose()
+                return message, await collect_items(messages)
+        self.assertEqual(({'id': '1'}, []), run(read_first()))
+        self.assertEqual(1, len(transport.requests))
+
+    def test_concurrent_requests(self):
+        """
+        methods should be run concurrently in single event loop
+        """
+        transport = AsyncRecordedTransport([create_response(200, '{"number": "%d"}' % i) for i in range(200)])
+        client = AsyncAccountClient('userId', 'apiToken', 'apiSecret', transport=transport)
+
+        async def get_all():
+            return await asyncio.gather(*[client.get_number_info('+1%d' % i) for i in range(200)])
+        self.assertEqual(200, len(run(get_all())))
+        self.assertEqual(200, len(transport.requests))
+
+    def test_local_methods(self):
+        """
+        methods without requests should stay synchronous
+        """
+        client = AsyncVoiceClient('userId', 'apiToken', 'apiSecret', transport=AsyncRecordedTransport())
+        self.assertEqual({'fileUrl': 'url', 'loopEnabled': None}, client.build_audio_playback('url'))
+
+    def test_upload_media_file(self):
+        """
+        upload_media_file() should send content of opened file
+        """
+        transport = AsyncRecordedTransport([create_response(200)])
+        client = AsyncAccountClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        run(client.upload_media_file('file.txt', six.BytesIO(b'data'), 'text/plain'))
+        self.assertEqual(b'data', transport.requests[0].kwargs['data'])
+
+    def test_upload_media_file_path(self):
+        """
+        upload_media_file() should read the file once
+        """
+        transport = AsyncRecordedTransport([create_response(200)])
+        client = AsyncAccountClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b'data')
+        try:
+            run(client.upload_media_file('file.txt', file_path=f.name))
+        finally:
+            os.remove(f.name)
+        self.assertEqual(b'data', transport.requests[0].kwargs['data'])
+
+    def test_unknown_method(self):
+        """
+        A method which is not known to be replayed safely should not get an asynchronous version
+        """
+        class SyncClient(VoiceClient):
+            def import_calls(self, calls):
+                pass
+        with self.assertRaises(TypeError):
+            @async_client(SyncClient)
+            class Client(AsyncClient):
+                pass
+
+        @async_client(SyncClient)
+        class OwnClient(AsyncClient):
+            async def import_calls(self, calls):
+                pass
+        self.assertFalse(hasattr(OwnClient.import_calls, '__wrapped__'))
+
+    def test_send_messages_with_generator(self):
+        """
+        send_messages() should read a generator of messages once
+        """
+        transport = AsyncRecordedTransport([create_response(
+            202, '[{"result": "accepted", "location": "http://localhost/m1"}, '
+                 '{"result": "accepted", "location": "http://localhost/m2"}]')])
+        client = AsyncMessagingClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        messages = ({'from': '+1234567980', 'to': to, 'text': 'Hello'} for to in ('+1234567981', '+1234567982'))
+        results = run(client.send_messages(messages))
+        self.assertEqual(['m1', 'm2'], [result['id'] for result in results])
+        self.assertEqual('+1234567982', results[1]['message']['to'])
+        self.assertEqual(1, len(transport.requests))
+        self.assertEqual(2, len(transport.requests[0].kwargs['json']))
+
+    def test_close(self):
+        """
+        close() should close own transport only
+        """
+        async def use_client():
+            async with AsyncVoiceClient('userId', 'apiToken', 'apiSecret', max_connections=10) as client:
+                self.assertIsInstance(client.transport, AsyncTransport)
+                self.assertEqual(10, client.transport.max_connections)
+        run(use_client())
+
+    def test_to_aiohttp_params(self):
+        """
+        _to_aiohttp_params() should skip None values and convert values to strings
+        """
+        self.assertEqual([('a', '1'), ('b', 'x'), ('b', 'y')],
+                         _to_aiohttp_params({'a': 1, 'b': ['x', 'y'], 'c': None}))
+
+    def test_to_aiohttp_kwargs_with_json(self):
+        """
+        _to_aiohttp_kwargs() should encode json body with the codec
+        """
+        kwargs = _to_aiohttp_kwargs({'json': {'text': 'hello'}, 'headers': {'User-Agent': 'test'}},
+                                    get_codec('json'))
+        self.assertEqual(b'{"text":"hello"}', kwargs['data'])
+        self.assertEqual({'User-Agent': 'test', 'Content-Type': 'application/json'}, kwargs['headers'])
+
+    def test_coalesce_requests(self):
+        """
+        Concurrent identical GET requests should share one request
+        """
+        sent = []
+
+        async def send(request):
+            sent.append(request)
+            await asyncio.sleep(0.01)
+            return create_response(200, '{"id": "callId", "state": "active"}')
+
+        async def get_calls():
+            async with AsyncVoiceClient('userId', 'apiToken', 'apiSecret', coalesce_requests=True) as client:
+                client.transport.send = send
+                calls = await asyncio.gather(*[client.get_call('callId') for _ in range(5)])
+                await client.get_call('callId')
+                return calls, client.request_coalescer
+        calls, coalescer = run(get_calls())
+        self.assertEqual([{'id': 'callId', 'state': 'active'}] * 5, calls)
+        self.assertEqual(2, len(sent))
+        self.assertIsInstance(coalescer, AsyncRequestCoalescer)
+        self.assertEqual((2, 4), (coalescer.requests, coalescer.coalesced))
+
+    def test_coalesce_requests_with_cancelled_request(self):
+        """
+        Waiting requests should be sent again when the shared request is cancelled
+        """
+        coalescer = AsyncRequestCoalescer()
+        sent = []
+
+        async def send(request):
+            sent.append(request)
+            await asyncio.sleep(0.01)
+            return create_response(200)
+
+        async def make_requests():
+            request = TransportRequest('get', 'http://localhost')
+            leader = asyncio.ensure_future(coalescer(request, send))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(coalescer(request, send))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+        self.assertEqual(200, run(make_requests()).status_code)
+        self.assertEqual(2, len(sent))
+        self.assertEqual({}, coalescer._flights)
+
+    def test_retry(self):
+        """
+        Transient failures should be retried
+        """
+        responses = [create_response(503), aiohttp.ClientConnectionError('reset'), create_response(200, '{"id": "c"}')]
+
+        async def send(request):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        async def get_call():
+            async with AsyncVoiceClient('userId', 'apiToken', 'apiSecret', retry=AsyncRetryPolicy(backoff_base=0.001)) \
+                    as client:
+                client.transport.send = send
+                return await client.get_call('c'), client.retry_policy
+        data, policy = run(get_call())
+        self.assertEqual({'id': 'c'}, data)
+        self.assertEqual({'503': 1, 'ClientConnectionError': 1}, policy.retries_by_reason)
+
+    def test_rate_limit(self):
+        """
+        Requests should wait for tokens of the rate limiter
+        """
+        transport_responses = [create_response(200, '{"id": "c"}') for _ in range(3)]
+
+        async def send(request):
+            return transport_responses.pop(0)
+
+        async def get_calls():
+            async with AsyncVoiceClient('userId', 'apiToken', 'apiSecret',
+                                        rate_limit=AsyncRateLimiter(rate=100, burst=1)) as client:
+                client.transport.send = send
+                await asyncio.gather(*[client.get_call('c') for _ in range(3)])
+                return client.rate_limiter
+        limiter = run(get_calls())
+        self.assertIsInstance(limiter, AsyncRateLimiter)
+        self.assertEqual(2, limiter.delayed)
+
+    def test_idempotency(self):
+        """
+        Concurrent creates with the same idempotency key should share the first one
+        """
+        requests = []
+
+        async def send(request):
+            requests.append(request)
+            await asyncio.sleep(0.01)
+            response = create_response(201)
+            response.headers['Location'] = 'http://localhost/c1'
+            return response
+
+        async def create_calls():
+            async with AsyncVoiceClient('userId', 'apiToken', 'apiSecret', idempotency=True) as client:
+                client.transport.send = send
+                keyed = client.with_options(idempotency_key='k1')
+                ids = await asyncio.gather(*[keyed.create_call(from_='+1', to='+2') for _ in range(3)])
+                return ids, client.idempotency_keys
+        ids, keys = run(create_calls())
+        self.assertIsInstance(keys, AsyncIdempotencyKeys)
+        self.assertEqual(['c1'] * 3, ids)
+        self.assertEqual(1, len(requests))
+        self.assertEqual('k1', requests[0].kwargs['headers']['Idempotency-Key'])
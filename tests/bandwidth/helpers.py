@@ -1,3 +1,4 @@
+import io
 import requests
 from bandwidth.voice import Client as VoiceClient
 from bandwidth.account import Client as AccountClient
@@ -29,4 +30,13 @@ def create_response(status_code=200, content='', content_type='application/json'
         response._content = content.encode('utf-8')
     return response
 
+
+def create_streamed_response(content, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers['content-type'] = 'application/json'
+    response.raw = io.BytesIO(content.encode('utf-8'))
+    return response
+
+
 AUTH = ('apiToken', 'apiSecret')
@@ -0,0 +1,84 @@
+import json
+import threading
+import unittest
+import six
+import requests
+from tests.bandwidth.helpers import create_response
+if six.PY3:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+from bandwidth.messaging import Client, BandwidthMessageAPIException, BatchingSender
+
+
+def send_messages(method, url, **kwargs):
+    results = []
+    for message in kwargs['json']:
+        if message['to'] == 'bad':
+            results.append({'result': 'error', 'error': {'code': 'invalid-to', 'message': 'Invalid number'}})
+        else:
+            results.append({'result': 'accepted', 'location': 'http://localhost/m-%s' % message['to']})
+    return create_response(200, json.dumps(results))
+
+
+class BatchingSenderTests(unittest.TestCase):
+
+    def test_batches(self):
+        """
+        Messages should be sent by batches and each caller should get own id
+        """
+        client = Client('userId', 'apiToken', 'apiSecret')
+        with patch('requests.Session.request', side_effect=send_messages) as p:
+            with BatchingSender(client, max_batch_size=3, max_delay=10) as sender:
+                messages = [sender.send_message('+1234567980', str(i), text='Hello') for i in range(7)]
+                self.assertEqual(['m-0', 'm-1', 'm-2', 'm-3', 'm-4', 'm-5'], [m.wait() for m in messages[:6]])
+                self.assertFalse(messages[6].done())
+            self.assertEqual('m-6', messages[6].wait())
+            self.assertEqual([3, 3, 1], [len(c[1]['json']) for c in p.call_args_list])
+            self.assertEqual({'from': '+1234567980', 'to': '0', 'text': 'Hello', 'media': None,
+                              'receiptRequested': None, 'callbackUrl': None, 'callbackHttpMethod': None,
+                              'callbackTimeout': None, 'fallbackUrl': None, 'tag': None},
+                             p.call_args_list[0][1]['json'][0])
+        self.assertEqual((3, 7, 0), (sender.batches, sender.sent, sender.failed))
+
+    def test_max_delay(self):
+        """
+        Incomplete batch should be sent after max_delay
+        """
+        client = Client('userId', 'apiToken', 'apiSecret')
+        with patch('requests.Session.request', side_effect=send_messages) as p:
+            sender = BatchingSender(client, max_delay=0.01)
+            threads = [threading.Thread(target=sender.send_message, args=('+1234567980', str(i)))
+                       for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual('m-x', sender.send_message('+1234567980', 'x').wait(5))
+            sender.close()
+            self.assertEqual(5, sum(len(c[1]['json']) for c in p.call_args_list))
+
+    def test_errors(self):
+        """
+        Rejected messages and failed batches should raise errors to their callers
+        """
+        client = Client('userId', 'apiToken', 'apiSecret')
+        with patch('requests.Session.request', side_effect=send_messages):
+            with BatchingSender(client, max_batch_size=2) as sender:
+                good = sender.send_message('+1234567980', '1')
+                bad = sender.send_message('+1234567980', 'bad')
+            self.assertEqual('m-1', good.wait())
+            with self.assertRaises(BandwidthMessageAPIException) as context:
+                bad.wait()
+            self.assertEqual('invalid-to', context.exception.code)
+        with patch('requests.Session.request', side_effect=requests.ConnectionError('reset')):
+            with BatchingSender(client) as sender:
+                messages = [sender.send_message('+1234567980', str(i)) for i in range(2)]
+                sender.flush()
+            for message in messages:
+                with self.assertRaises(requests.ConnectionError):
+                    message.wait()
+        self.assertEqual((1, 0, 2), (sender.batches, sender.sent, sender.failed))
+        with self.assertRaises(ValueError):
+            sender.send_message('+1234567980', '1')
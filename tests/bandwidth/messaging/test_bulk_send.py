@@ -0,0 +1,111 @@
+import json
+import threading
+import unittest
+import six
+from tests.bandwidth.helpers import create_response
+if six.PY3:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+from bandwidth.messaging import Client, BandwidthMessageAPIException
+from bandwidth.messaging.bulk_send import BulkSend, iter_chunks
+
+
+def send_messages(method, url, **kwargs):
+    results = [{'result': 'accepted', 'location': 'http://localhost/m-%s' % message['to']}
+               for message in kwargs['json']]
+    return create_response(200, json.dumps(results))
+
+
+class BulkSendTests(unittest.TestCase):
+
+    def test_iter_chunks(self):
+        """
+        iter_chunks() should split items into lists
+        """
+        self.assertEqual([[0, 1], [2, 3], [4]], list(iter_chunks(range(5), 2)))
+        self.assertEqual([], list(iter_chunks([], 2)))
+
+    def test_send_messages_in_chunks(self):
+        """
+        send_messages_in_chunks() should send messages of a generator by chunks and return results in order
+        """
+        read = []
+
+        def generate_messages():
+            for i in range(250):
+                read.append(i)
+                yield {'from': '+1234567980', 'to': str(i), 'text': 'Hello'}
+        client = Client('userId', 'apiToken', 'apiSecret')
+        with patch('requests.Session.request', side_effect=send_messages) as p:
+            results = client.send_messages_in_chunks(generate_messages(), chunk_size=20, workers=2)
+            first = next(results)
+            # not more than 2 * workers chunks are read ahead
+            self.assertTrue(len(read) <= 80)
+            results = [first] + list(results)
+            self.assertEqual(13, p.call_count)
+        self.assertEqual(['m-%d' % i for i in range(250)], [r['id'] for r in results])
+        self.assertEqual(str(249), results[249]['message']['to'])
+
+    def test_failed_chunk(self):
+        """
+        Messages of a failed request should get error results
+        """
+        def send_chunk(chunk):
+            if chunk[0] == 2:
+                raise BandwidthMessageAPIException(500, 'Server error')
+            return [{'result': 'accepted', 'id': str(m), 'message': m} for m in chunk]
+        bulk = BulkSend(send_chunk, range(6), chunk_size=2, workers=3, ordered=False)
+        results = sorted(bulk, key=lambda r: r['message'])
+        self.assertEqual(['accepted', 'accepted', 'error', 'error', 'accepted', 'accepted'],
+                         [r['result'] for r in results])
+        self.assertEqual('500', results[2]['error']['code'])
+        self.assertIsInstance(results[3]['exception'], BandwidthMessageAPIException)
+        self.assertEqual((4, 2), (bulk.sent, bulk.failed))
+
+    def test_missing_results(self):
+        """
+        Messages whose results are missing in a response should get unknown results, other results should be kept
+        """
+        def send_part(method, url, **kwargs):
+            results = [{'result': 'accepted', 'location': 'http://localhost/m-%s' % message['to']}
+                       for message in kwargs['json'][:1]]
+            return create_response(200, json.dumps(results))
+        client = Client('userId', 'apiToken', 'apiSecret')
+        with patch('requests.Session.request', side_effect=send_part):
+            bulk = client.send_messages_in_chunks(({'from': '+1', 'to': str(i)} for i in range(4)), chunk_size=2)
+            results = list(bulk)
+        self.assertEqual(['accepted', 'unknown', 'accepted', 'unknown'], [r['result'] for r in results])
+        self.assertEqual(['m-0', None, 'm-2', None], [r['id'] for r in results])
+        self.assertEqual('3', results[3]['message']['to'])
+        self.assertEqual('Expected 2 results of messages but received 1', results[1]['error']['message'])
+        self.assertEqual((2, 0, 2), (bulk.sent, bulk.failed, bulk.unknown))
+
+    def test_close(self):
+        """
+        Closed bulk send should not send next chunks
+        """
+        sent = []
+        lock = threading.Lock()
+
+        def send_chunk(chunk):
+            with lock:
+                sent.append(chunk)
+            return [{'result': 'accepted', 'message': m} for m in chunk]
+        bulk = BulkSend(send_chunk, range(1000), chunk_size=10, workers=2)
+        next(bulk)
+        bulk.close()
+        self.assertTrue(len(sent) <= 6)
+        with self.assertRaises(StopIteration):
+            next(bulk)
+
+    def test_send_messages_with_wrong_results(self):
+        """
+        send_messages() should return unknown results of messages which have no results in the response
+        """
+        client = Client('userId', 'apiToken', 'apiSecret')
+        message = {'from': '+1234567980', 'to': '+1234567981', 'text': 'Hello'}
+        with patch('requests.Session.request', return_value=create_response(200, '[]')):
+            results = client.send_messages([message])
+        self.assertEqual([('unknown', None, message)], [(r['result'], r['id'], r['message']) for r in results])
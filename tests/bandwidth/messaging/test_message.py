@@ -9,6 +9,7 @@ else:
     from mock import patch
 
 from bandwidth.voice import Client
+from bandwidth.messaging import Client as MessagingClient
 
 
 class MessageTests(unittest.TestCase):
@@ -33,7 +34,7 @@ class MessageTests(unittest.TestCase):
             'sortOrder': None,
             'size': None
         }
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_messages())
             p.assert_called_with(
@@ -44,6 +45,23 @@ class MessageTests(unittest.TestCase):
                 params=estimated_request)
             self.assertEqual('messageId', data[0]['id'])
 
+    def test_scan_messages(self):
+        """
+        scan_messages() should return messages of all shards of the range
+        """
+        def request(method, url, **kwargs):
+            return create_response(200, '[{"id": "%s"}]' % kwargs['params']['fromDateTime'])
+        with patch('requests.Session.request', side_effect=request) as p:
+            client = get_client()
+            data = list(client.scan_messages('2017-01-01 00:00:00', '2017-01-01 23:59:59', shards=2,
+                                             sort_order='desc'))
+            self.assertEqual(['2017-01-01 12:00:00', '2017-01-01 00:00:00'], [m['id'] for m in data])
+            self.assertEqual(2, p.call_count)
+            params = sorted((c[1]['params'] for c in p.call_args_list), key=lambda p: p['fromDateTime'])
+            self.assertEqual('2017-01-01 11:59:59', params[0]['toDateTime'])
+            self.assertEqual('2017-01-01 23:59:59', params[1]['toDateTime'])
+            self.assertEqual('desc', params[1]['sortOrder'])
+
     def test_send_message(self):
         """
         send_message() should create an message and return id
@@ -62,7 +80,7 @@ class MessageTests(unittest.TestCase):
             'fallbackUrl': None,
             'tag': None
         }
-        with patch('requests.request', return_value=estimated_response) as p:
+        with patch('requests.Session.request', return_value=estimated_response) as p:
             client = get_client()
             messageID = client.send_message(
                 from_='num1',
@@ -86,7 +104,7 @@ class MessageTests(unittest.TestCase):
             {"result": "accepted", "location": "http://localhost/messageId"}
         ]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = [{'from': 'num1', 'to': 'num2', 'text': 'text'}]
             results = client.send_messages(data)
@@ -98,6 +116,34 @@ class MessageTests(unittest.TestCase):
                 json=data)
             self.assertEqual('messageId', results[0]['id'])
 
+    def test_send_messages_with_raw(self):
+        """
+        send_messages() should read results in any raw mode
+        """
+        estimated_json = '[{"result": "accepted", "location": "http://localhost/messageId"}]'
+        for raw in (True, 'bytes'):
+            with patch('requests.Session.request', return_value=create_response(200, estimated_json)):
+                client = MessagingClient('userId', 'apiToken', 'apiSecret', raw=raw)
+                results = client.send_messages([{'from': 'num1', 'to': 'num2', 'text': 'text'}])
+                self.assertEqual('messageId', results[0]['id'])
+
+    def test_send_messages_with_lazy_snake_case(self):
+        """
+        send_messages() should add ids to results when responses are lazy snake_case views
+        """
+        estimated_json = """
+        [
+            {"result": "accepted", "location": "http://localhost/messageId"}
+        ]
+        """
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)):
+            client = MessagingClient('userId', 'apiToken', 'apiSecret', lazy_snake_case=True)
+            data = [{'from': 'num1', 'to': 'num2', 'text': 'text'}]
+            results = client.send_messages(data)
+            self.assertEqual('messageId', results[0]['id'])
+            self.assertEqual('accepted', results[0]['result'])
+            self.assertEqual(data[0], results[0]['message'])
+
     def test_get_message(self):
         """
         get_message() should return a message
@@ -107,7 +153,7 @@ class MessageTests(unittest.TestCase):
             "id": "messageId"
         }
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_message('messageId')
             p.assert_called_with(
@@ -0,0 +1,157 @@
+import threading
+import time
+import unittest
+import six
+if six.PY3:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+from bandwidth.messaging import BandwidthMessageAPIException, SendScheduler
+from bandwidth.messaging.send_scheduler import get_rate_class
+
+
+class FakeClock(object):
+
+    """
+    Clock of the scheduler which remembers the last time returned to each thread
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def time(self):
+        self._local.time = time.time()
+        return self._local.time
+
+    def last_time(self):
+        return getattr(self._local, 'time', None)
+
+
+class FakeClient(object):
+
+    def __init__(self, rejections=None, clock=None):
+        self.sent = []
+        self.rejections = dict(rejections or {})
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    def send_message(self, from_, to, **kwargs):
+        # the send time is the time of the scheduler when the worker started sending (if the clock is patched)
+        send_time = self.clock.last_time() if self.clock else time.time()
+        with self._lock:
+            if self.rejections.get(to):
+                self.rejections[to] -= 1
+                raise BandwidthMessageAPIException(429, 'Too many requests')
+            self.sent.append((from_, to, send_time))
+            return 'm-%s' % to
+
+
+class SendSchedulerTests(unittest.TestCase):
+
+    def test_get_rate_class(self):
+        """
+        get_rate_class() should detect toll-free numbers and short codes
+        """
+        self.assertEqual('toll_free', get_rate_class('+18885551212'))
+        self.assertEqual('local', get_rate_class('+19195551212'))
+        self.assertEqual('short_code', get_rate_class('12345'))
+
+    def test_per_number_rate(self):
+        """
+        Messages of a number should be sent with its rate while other numbers are not delayed
+        """
+        clock = FakeClock()
+        client = FakeClient(clock=clock)
+        rate_classes = {'local': 20, 'toll_free': 200}
+        with patch('bandwidth.messaging.send_scheduler.time', clock), \
+                SendScheduler(client, rate_classes=rate_classes) as scheduler:
+            messages = [scheduler.submit('+19195550001', 'l%d' % i, text='Hi') for i in range(5)]
+            messages += [scheduler.submit('+18885550001', 't%d' % i, text='Hi') for i in range(20)]
+        self.assertEqual(['m-l%d' % i for i in range(5)] + ['m-t%d' % i for i in range(20)],
+                         [message.wait() for message in messages])
+        for number, interval in (('+19195550001', 0.05), ('+18885550001', 0.005)):
+            times = sorted(t for from_, to, t in client.sent if from_ == number)
+            self.assertTrue(all(b - a >= interval for a, b in zip(times, times[1:])))
+        # toll-free messages are not queued behind the slow local number
+        last_toll_free = max(t for from_, to, t in client.sent if from_ == '+18885550001')
+        last_local = max(t for from_, to, t in client.sent if from_ == '+19195550001')
+        self.assertTrue(last_toll_free < last_local)
+        self.assertEqual((25, 0), (scheduler.sent, scheduler.failed))
+
+    def test_rate_after_stalled_workers(self):
+        """
+        Messages of a number should keep its rate after all workers were busy
+        """
+        clock = FakeClock()
+        client = FakeClient(clock=clock)
+        send_message = client.send_message
+
+        def send_slowly(from_, to, **kwargs):
+            if to == 'slow':
+                time.sleep(0.2)
+            return send_message(from_, to, **kwargs)
+        client.send_message = send_slowly
+        with patch('bandwidth.messaging.send_scheduler.time', clock), \
+                SendScheduler(client, rate_classes={'local': 20}, workers=1) as scheduler:
+            scheduler.submit('+19195550001', 'slow')
+            time.sleep(0.01)
+            for i in range(3):
+                scheduler.submit('+19195550002', 'b%d' % i)
+        times = [t for from_, to, t in client.sent if from_ == '+19195550002']
+        self.assertEqual(3, len(times))
+        self.assertTrue(all(b - a >= 0.05 for a, b in zip(times, times[1:])))
+
+    def test_rate_with_delayed_worker(self):
+        """
+        A worker which starts sending late should keep the gap from a send of another worker
+        """
+        clock = FakeClock()
+        client = FakeClient(clock=clock)
+        take_next = SendScheduler._take_next
+
+        def take_slowly(scheduler):
+            scheduled = take_next(scheduler)
+            if scheduled is not None and scheduled.message['to'] == 'a0':
+                # the next message of the number is taken by another worker meanwhile
+                time.sleep(0.07)
+            return scheduled
+        with patch('bandwidth.messaging.send_scheduler.time', clock), \
+                patch.object(SendScheduler, '_take_next', take_slowly), \
+                SendScheduler(client, rate_classes={'local': 20}, workers=2) as scheduler:
+            for i in range(2):
+                scheduler.submit('+19195550001', 'a%d' % i)
+        times = dict((to, t) for from_, to, t in client.sent)
+        self.assertLess(times['a1'], times['a0'])
+        self.assertGreaterEqual(times['a0'] - times['a1'], 0.05)
+
+    def test_fair_interleaving(self):
+        """
+        Ready numbers should be served in turn
+        """
+        client = FakeClient()
+        with SendScheduler(client, rate_classes={'local': 1000}, workers=1) as scheduler:
+            for i in range(3):
+                scheduler.submit('+19195550001', 'a%d' % i)
+            for i in range(3):
+                scheduler.submit('+19195550002', 'b%d' % i)
+        self.assertEqual(['a0', 'b0', 'a1', 'b1', 'a2', 'b2'], [to for from_, to, t in client.sent])
+
+    def test_rejected_message(self):
+        """
+        Rejected messages should be sent again after the pause of the number
+        """
+        client = FakeClient(rejections={'a0': 1, 'b0': 5})
+        with SendScheduler(client, rate_classes={'local': 1000}, rejection_delay=0.01, max_rejections=2) \
+                as scheduler:
+            first = scheduler.submit('+19195550001', 'a0')
+            second = scheduler.submit('+19195550001', 'a1')
+            failed = scheduler.submit('+19195550002', 'b0')
+        self.assertEqual('m-a0', first.wait())
+        self.assertEqual(['a0', 'a1'], sorted(to for from_, to, t in client.sent))
+        self.assertEqual('m-a1', second.wait())
+        with self.assertRaises(BandwidthMessageAPIException):
+            failed.wait()
+        self.assertEqual((2, 1, 3), (scheduler.sent, scheduler.failed, scheduler.rejected))
+        with self.assertRaises(ValueError):
+            scheduler.submit('+19195550001', 'a2')
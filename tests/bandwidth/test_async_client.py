@@ -0,0 +1,9 @@
+import sys
+import unittest
+
+if sys.version_info >= (3, 5):
+    from tests.bandwidth.async_client_tests import AsyncClientTests
+else:
+    @unittest.skip('asynchronous clients require python 3.5+')
+    class AsyncClientTests(unittest.TestCase):
+        pass
@@ -0,0 +1,106 @@
+import unittest
+import six
+from tests.bandwidth.helpers import create_response, AUTH, headers
+if six.PY3:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+from bandwidth.account import Client
+from bandwidth.cache import HttpCache, get_resource_name
+
+APP_URL = 'https://api.catapult.inetwork.com/v1/users/userId/applications/a-1'
+
+
+def create_app_response(etag='"v1"', name='MyApp'):
+    response = create_response(200, '{"id": "a-1", "name": "%s", "autoAnswer": true}' % name)
+    response.headers['ETag'] = etag
+    return response
+
+
+class HttpCacheTests(unittest.TestCase):
+
+    def test_get_resource_name(self):
+        """
+        get_resource_name() should return first path segment after api version and user id
+        """
+        self.assertEqual('applications', get_resource_name(APP_URL))
+        self.assertEqual('phoneNumbers', get_resource_name(
+            'https://api.catapult.inetwork.com/v1/phoneNumbers/numberInfo/%2B1234567890'))
+        self.assertEqual('account', get_resource_name('https://api.catapult.inetwork.com/v1/users/userId/account'))
+
+    def test_conditional_request(self):
+        """
+        Cached response should be revalidated and returned on "304 Not Modified"
+        """
+        cache = HttpCache()
+        client = Client('userId', 'apiToken', 'apiSecret', http_cache=cache)
+        with patch('requests.Session.request', side_effect=[create_app_response(), create_response(304)]) as p:
+            self.assertEqual({'id': 'a-1', 'name': 'MyApp', 'auto_answer': True}, client.get_application('a-1'))
+            data = client.get_application('a-1')
+            self.assertEqual({'id': 'a-1', 'name': 'MyApp', 'auto_answer': True}, data)
+            p.assert_called_with('get', APP_URL, auth=AUTH,
+                                 headers=dict(headers, **{'If-None-Match': '"v1"'}))
+        self.assertEqual((0, 1, 1), (cache.hits, cache.revalidations, cache.misses))
+        data['name'] = 'Changed'
+        with patch('requests.Session.request', return_value=create_response(304)):
+            self.assertEqual('MyApp', client.get_application('a-1')['name'])
+
+    def test_changed_resource(self):
+        """
+        Changed resource should replace cached one
+        """
+        client = Client('userId', 'apiToken', 'apiSecret', http_cache=True)
+        responses = [create_app_response(), create_app_response('"v2"', 'NewName'), create_response(304)]
+        with patch('requests.Session.request', side_effect=responses) as p:
+            client.get_application('a-1')
+            self.assertEqual('NewName', client.get_application('a-1')['name'])
+            self.assertEqual('NewName', client.get_application('a-1')['name'])
+            self.assertEqual('"v2"', p.call_args[1]['headers']['If-None-Match'])
+
+    def test_ttl_overrides(self):
+        """
+        Fresh responses should be returned without requests, resources with None ttl should not be cached
+        """
+        cache = HttpCache(ttl_overrides={'applications': 60, 'account': None})
+        client = Client('userId', 'apiToken', 'apiSecret', http_cache=cache)
+        with patch('requests.Session.request', return_value=create_app_response()) as p:
+            client.get_application('a-1')
+            client.get_application('a-1')
+            self.assertEqual(1, p.call_count)
+        with patch('bandwidth.cache.time.time', return_value=10 ** 10), \
+                patch('requests.Session.request', return_value=create_response(304)) as p:
+            client.get_application('a-1')
+            self.assertEqual(1, p.call_count)
+        with patch('requests.Session.request', return_value=create_app_response()) as p:
+            client.get_account()
+            client.get_account()
+            self.assertEqual(2, p.call_count)
+            self.assertNotIn('If-None-Match', p.call_args[1]['headers'])
+
+    def test_lru_eviction(self):
+        """
+        Least recently used entries should be evicted
+        """
+        cache = HttpCache(max_entries=2)
+        client = Client('userId', 'apiToken', 'apiSecret', http_cache=cache)
+        with patch('requests.Session.request', side_effect=lambda *args, **kwargs: create_app_response()):
+            client.get_application('a-1')
+            client.get_application('a-2')
+            client.get_application('a-1')
+            client.get_application('a-3')
+        self.assertEqual(2, len(cache))
+        self.assertEqual(['a-1', 'a-3'], [key[1].split('/')[-1] for key in cache._entries])
+
+    def test_invalidation_on_change(self):
+        """
+        Updating of a resource should remove it from the cache
+        """
+        cache = HttpCache()
+        client = Client('userId', 'apiToken', 'apiSecret', http_cache=cache)
+        with patch('requests.Session.request', return_value=create_app_response()):
+            client.get_application('a-1')
+        self.assertEqual(1, len(cache))
+        with patch('requests.Session.request', return_value=create_response(200)):
+            client.update_application('a-1', name='NewName')
+        self.assertEqual(0, len(cache))
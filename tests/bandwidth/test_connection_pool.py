@@ -0,0 +1,82 @@
+import unittest
+import six
+from tests.bandwidth.helpers import create_response
+if six.PY3:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+from bandwidth.connection_pool import ConnectionPool
+from bandwidth.voice import Client
+
+
+class ConnectionPoolTests(unittest.TestCase):
+
+    def test_init(self):
+        """
+        ConnectionPool() should mount adapters with given pool sizes
+        """
+        pool = ConnectionPool(pool_size=3, max_per_host=7, idle_timeout=5)
+        adapter = pool.session.get_adapter('https://api.catapult.inetwork.com')
+        self.assertEqual(3, adapter._pool_connections)
+        self.assertEqual(7, adapter._pool_maxsize)
+        self.assertEqual(5, pool.idle_timeout)
+
+    def test_request(self):
+        """
+        request() should make request via shared session
+        """
+        pool = ConnectionPool()
+        with patch('requests.Session.request', return_value=create_response()) as p:
+            pool.request('get', 'http://localhost', auth=('a', 'b'))
+            pool.request('get', 'http://localhost', auth=('a', 'b'))
+            p.assert_called_with('get', 'http://localhost', auth=('a', 'b'))
+            self.assertEqual(2, p.call_count)
+
+    def test_request_after_idle_timeout(self):
+        """
+        request() should drop idle connections when idle timeout is exceeded
+        """
+        pool = ConnectionPool(idle_timeout=10)
+        pool._last_used -= 11
+        adapter = pool.session.get_adapter('https://api.catapult.inetwork.com')
+        with patch('requests.Session.request', return_value=create_response()):
+            with patch.object(adapter.poolmanager, 'clear') as c:
+                pool.request('get', 'http://localhost')
+                c.assert_called_with()
+                pool.request('get', 'http://localhost')
+                self.assertEqual(1, c.call_count)
+
+    def test_close(self):
+        """
+        close() should close session and forbid new requests
+        """
+        with ConnectionPool() as pool:
+            with patch.object(pool.session, 'close') as c:
+                pool.close()
+                pool.close()
+                self.assertEqual(1, c.call_count)
+        with self.assertRaises(ValueError):
+            pool.request('get', 'http://localhost')
+
+    def test_client_pool_options(self):
+        """
+        Client() should create own connection pool with given options
+        """
+        client = Client('userId', 'apiToken', 'apiSecret', pool_size=2, pool_max_per_host=20, pool_idle_timeout=5)
+        self.assertEqual(2, client.connection_pool.pool_size)
+        self.assertEqual(20, client.connection_pool.max_per_host)
+        self.assertEqual(5, client.connection_pool.idle_timeout)
+        client.close()
+
+    def test_close_client_with_shared_pool(self):
+        """
+        Client.close() should close own connection pool only
+        """
+        pool = ConnectionPool()
+        with Client('userId', 'apiToken', 'apiSecret', connection_pool=pool) as client:
+            self.assertIs(pool, client.connection_pool)
+        self.assertFalse(pool.closed)
+        with Client('userId', 'apiToken', 'apiSecret') as client:
+            pass
+        self.assertTrue(client.connection_pool.closed)
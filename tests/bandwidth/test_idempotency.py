@@ -0,0 +1,183 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import six
+import requests
+from tests.bandwidth.helpers import create_response
+if six.PY3:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+from bandwidth.account import Client as AccountClient
+from bandwidth.idempotency import IdempotencyKeys, IDEMPOTENCY_HEADER
+from bandwidth.lookup_store import SqliteLookupStore
+from bandwidth.messaging import Client as MessagingClient
+from bandwidth.retry import RetryPolicy
+from bandwidth.transport import Transport
+from bandwidth.voice import Client as VoiceClient
+
+
+def create_created_response(id):
+    response = create_response(201)
+    response.headers['Location'] = 'http://localhost/%s' % id
+    return response
+
+
+def get_keys(p):
+    return [c[1]['headers'].get(IDEMPOTENCY_HEADER) for c in p.call_args_list]
+
+
+class IdempotencyKeysTests(unittest.TestCase):
+
+    def test_generated_keys(self):
+        """
+        Creates of messages, calls and phone numbers should get unique idempotency keys
+        """
+        client = MessagingClient('userId', 'apiToken', 'apiSecret', idempotency=True)
+        with patch('requests.Session.request', side_effect=[create_created_response('m1'),
+                                                            create_created_response('m2')]) as p:
+            self.assertEqual('m1', client.send_message(from_='+1234567980', to='+1234567981', text='Hello'))
+            self.assertEqual('m2', client.send_message(from_='+1234567980', to='+1234567981', text='Hello'))
+            keys = get_keys(p)
+        self.assertEqual(2, len(set(keys)))
+        self.assertTrue(all(keys))
+        client = AccountClient('userId', 'apiToken', 'apiSecret', idempotency=True)
+        with patch('requests.Session.request', return_value=create_created_response('n1')) as p:
+            self.assertEqual('n1', client.order_phone_number(number='+1234567980'))
+            self.assertTrue(get_keys(p)[0])
+
+    def test_other_requests(self):
+        """
+        Requests which don't create messages, calls or phone numbers should not get keys
+        """
+        client = VoiceClient('userId', 'apiToken', 'apiSecret', idempotency=True)
+        with patch('requests.Session.request', return_value=create_created_response('g1')) as p:
+            client.create_call_gather('callId', max_digits=1)
+            keyed = client.with_options(idempotency_key='k1')
+            keyed.create_call_gather('callId', max_digits=1)
+            keyed.update_call('callId', state='completed')
+            keyed.update_call('callId', state='transferring', transfer_to='+1234567982')
+            self.assertEqual([None] * 4, get_keys(p))
+            self.assertEqual(4, p.call_count)
+        with patch('requests.Session.request', return_value=create_response(200, '{"id": "callId"}')) as p:
+            client.get_call('callId')
+            self.assertEqual([None], get_keys(p))
+
+    def test_repeated_create(self):
+        """
+        A repeated create with the same key should return result of the first one without a request
+        """
+        client = VoiceClient('userId', 'apiToken', 'apiSecret', idempotency=True)
+        with patch('requests.Session.request', return_value=create_created_response('c1')) as p:
+            self.assertEqual('c1', client.with_options(idempotency_key='k1').create_call(from_='+1', to='+2'))
+            self.assertEqual('c1', client.with_options(idempotency_key='k1').create_call(from_='+1', to='+2'))
+            self.assertEqual(1, p.call_count)
+        self.assertEqual((1, 1), (client.idempotency_keys.requests, client.idempotency_keys.deduplicated))
+
+    def test_generated_keys_are_not_saved(self):
+        """
+        Responses of creates with generated keys should not be saved
+        """
+        client = VoiceClient('userId', 'apiToken', 'apiSecret', idempotency=True)
+        with patch('requests.Session.request', return_value=create_created_response('c1')):
+            client.create_call(from_='+1', to='+2')
+        self.assertEqual(0, len(client.idempotency_keys.table))
+
+    def test_failed_create(self):
+        """
+        A failed create should not be saved
+        """
+        client = VoiceClient('userId', 'apiToken', 'apiSecret', idempotency=True)
+        responses = [create_response(400, '{"message": "Invalid number"}'), create_created_response('c1')]
+        with patch('requests.Session.request', side_effect=responses) as p:
+            with self.assertRaises(Exception):
+                client.with_options(idempotency_key='k1').create_call(from_='+1', to='+2')
+            self.assertEqual('c1', client.with_options(idempotency_key='k1').create_call(from_='+1', to='+2'))
+            self.assertEqual(2, p.call_count)
+
+    def test_retry(self):
+        """
+        A create with idempotency key of the caller should be retried on any transient failure with the same key
+        """
+        client = MessagingClient('userId', 'apiToken', 'apiSecret', idempotency=True, retry=True)
+        responses = [create_response(503, '{"message": "Try later"}'), requests.ReadTimeout('timeout'),
+                     create_created_response('m1')]
+        with patch('requests.Session.request', side_effect=responses) as p, \
+                patch('bandwidth.retry.time.sleep'):
+            keyed = client.with_options(idempotency_key='k1')
+            self.assertEqual('m1', keyed.send_message(from_='+1234567980', to='+1234567981', text='Hello'))
+            self.assertEqual(['k1'] * 3, get_keys(p))
+
+    def test_generated_key_retry(self):
+        """
+        A create with generated key should be retried like other POST requests unless retry_unsafe_posts is set
+        """
+        client = MessagingClient('userId', 'apiToken', 'apiSecret', idempotency=True, retry=True)
+        with patch('requests.Session.request', side_effect=requests.ReadTimeout('timeout')) as p, \
+                patch('bandwidth.retry.time.sleep'):
+            with self.assertRaises(requests.ReadTimeout):
+                client.send_message(from_='+1234567980', to='+1234567981', text='Hello')
+            self.assertEqual(1, p.call_count)
+        client = MessagingClient('userId', 'apiToken', 'apiSecret', idempotency=True,
+                                 retry=RetryPolicy(retry_unsafe_posts=True))
+        responses = [requests.ReadTimeout('timeout'), create_created_response('m1')]
+        with patch('requests.Session.request', side_effect=responses) as p, \
+                patch('bandwidth.retry.time.sleep'):
+            self.assertEqual('m1', client.send_message(from_='+1234567980', to='+1234567981', text='Hello'))
+            keys = get_keys(p)
+        self.assertEqual(2, len(keys))
+        self.assertEqual(1, len(set(keys)))
+
+    def test_concurrent_creates(self):
+        """
+        Concurrent creates with the same key should wait for the first one
+        """
+        client = MessagingClient('userId', 'apiToken', 'apiSecret', idempotency=True)
+        results = []
+
+        def send(*args, **kwargs):
+            time.sleep(0.05)
+            return create_created_response('m1')
+
+        def run():
+            results.append(client.with_options(idempotency_key='k1').send_message(from_='+1', to='+2'))
+        with patch('requests.Session.request', side_effect=send) as p:
+            threads = [threading.Thread(target=run) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(1, p.call_count)
+        self.assertEqual(['m1'] * 5, results)
+
+    def test_persistent_store(self):
+        """
+        Creates should be resolved by keys saved by another process
+        """
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'idempotency.db')
+            store = SqliteLookupStore(path)
+            client = VoiceClient('userId', 'apiToken', 'apiSecret', idempotency=IdempotencyKeys(store=store))
+            with patch('requests.Session.request', return_value=create_created_response('c1')):
+                client.with_options(idempotency_key='k1').create_call(from_='+1', to='+2')
+            store.close()
+            store = SqliteLookupStore(path)
+            client = VoiceClient('userId', 'apiToken', 'apiSecret', idempotency=IdempotencyKeys(store=store))
+            with patch('requests.Session.request') as p:
+                self.assertEqual('c1', client.with_options(idempotency_key='k1').create_call(from_='+1', to='+2'))
+                self.assertEqual(0, p.call_count)
+            store.close()
+        finally:
+            shutil.rmtree(directory)
+
+    def test_passed_transport(self):
+        """
+        Option idempotency should not be used with a passed transport
+        """
+        with self.assertRaises(ValueError):
+            VoiceClient('userId', 'apiToken', 'apiSecret', transport=Transport(), idempotency=True)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+import requests
+from tests.bandwidth.helpers import create_response
+import six
+if six.PY3:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+from bandwidth import json_codec
+from bandwidth.json_codec import get_codec, JsonCodec, StdlibJsonCodec, OrjsonCodec
+from bandwidth.connection_pool import ConnectionPool
+from bandwidth.messaging import Client
+
+MESSAGE = {'from': '+1234567890', 'to': ['+1234567891'], 'text': u'Привет', 'receiptRequested': 'all',
+           'callbackUrl': 'https://localhost/callback', 'tag': None, 'size': 1.5, 'retries': 3}
+
+
+class CountingCodec(StdlibJsonCodec):
+    name = 'counting'
+
+    def __init__(self):
+        self.calls = []
+
+    def dumps(self, data):
+        self.calls.append('dumps')
+        return super(CountingCodec, self).dumps(data)
+
+    def loads(self, content):
+        self.calls.append('loads')
+        return super(CountingCodec, self).loads(content)
+
+
+class JsonCodecTests(unittest.TestCase):
+
+    def test_get_codec(self):
+        """
+        get_codec() should return codec by name or the fastest installed codec
+        """
+        self.assertIsInstance(get_codec('json'), StdlibJsonCodec)
+        self.assertIsInstance(get_codec(), JsonCodec)
+        codec = CountingCodec()
+        self.assertIs(codec, get_codec(codec))
+        with self.assertRaises(ValueError):
+            get_codec('unknown')
+
+    def test_stdlib_codec(self):
+        """
+        StdlibJsonCodec should encode data to bytes and decode bytes
+        """
+        codec = StdlibJsonCodec()
+        content = codec.dumps(MESSAGE)
+        self.assertIsInstance(content, bytes)
+        self.assertEqual(MESSAGE, json.loads(content.decode('utf-8')))
+        self.assertEqual(MESSAGE, codec.loads(content))
+
+    @unittest.skipIf(json_codec.orjson is None, 'orjson is not installed')
+    def test_orjson_codec(self):
+        """
+        OrjsonCodec should encode and decode data like standard json module
+        """
+        codec = OrjsonCodec()
+        self.assertEqual(MESSAGE, codec.loads(codec.dumps(MESSAGE)))
+        self.assertEqual(MESSAGE, codec.loads(StdlibJsonCodec().dumps(MESSAGE)))
+        self.assertEqual({'big': 2 ** 70}, codec.loads(codec.dumps({'big': 2 ** 70})))
+        self.assertIsInstance(get_codec(), OrjsonCodec)
+
+    @unittest.skipIf(json_codec.orjson is None, 'orjson is not installed')
+    def test_orjson_codec_fallback(self):
+        """
+        OrjsonCodec should decode json which orjson rejects (like integers bigger than 64 bits) by standard json module
+        """
+        codec = OrjsonCodec()
+        content = b'{"big": 1180591620717411303425}'
+        error = json_codec.orjson.JSONDecodeError('Integer exceeds 64-bit range', content.decode('utf-8'), 8)
+        with patch('bandwidth.json_codec.orjson.loads', side_effect=error):
+            self.assertEqual({'big': 2 ** 70 + 1}, codec.loads(content))
+            with self.assertRaises(ValueError):
+                codec.loads(b'{"big": ')
+
+    def test_session_encodes_json_with_codec(self):
+        """
+        Requests of connection pool should encode json bodies with the codec
+        """
+        codec = CountingCodec()
+        pool = ConnectionPool(json_codec=codec)
+        request = pool.session.prepare_request(requests.Request(
+            'post', 'https://localhost/messages', json=MESSAGE, headers={'User-Agent': 'test'}))
+        self.assertEqual(['dumps'], codec.calls)
+        self.assertEqual('application/json', request.headers['Content-Type'])
+        self.assertEqual(MESSAGE, json.loads(request.body.decode('utf-8')))
+        pool.close()
+
+    def test_client_decodes_json_with_codec(self):
+        """
+        Client should decode responses with its codec
+        """
+        codec = CountingCodec()
+        client = Client('userId', 'apiToken', 'apiSecret', json_codec=codec)
+        self.assertIs(codec, client.connection_pool.session.json_codec)
+        with patch('requests.Session.request', return_value=create_response(200, '{"messageId": "m-1"}')):
+            self.assertEqual({'message_id': 'm-1'}, client.get_message('m-1'))
+        self.assertEqual(['loads'], codec.calls)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+from tests.bandwidth.helpers import create_streamed_response
+
+from bandwidth.json_stream import iter_json_array, StreamedItems
+
+
+class JsonStreamTests(unittest.TestCase):
+
+    def test_iter_json_array(self):
+        """
+        iter_json_array() should decode items of an array split into chunks at any position
+        """
+        data = [{'id': 'm-1', 'text': u'привет, мир', 'tags': [1, 2.5, None]}, 123, u'текст', True, [], {}]
+        content = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        for chunk_size in (1, 2, 3, 7, len(content)):
+            chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+            self.assertEqual(data, list(iter_json_array(chunks)))
+
+    def test_iter_json_array_yields_items_before_the_end(self):
+        """
+        iter_json_array() should yield an item as soon as it is decoded
+        """
+        items = iter_json_array(iter([b' [ {"id": 1}, ', b'{"id": 2']))
+        self.assertEqual({'id': 1}, next(items))
+        with self.assertRaises(ValueError):
+            next(items)
+
+    def test_iter_json_array_with_empty_array(self):
+        """
+        iter_json_array() should decode empty array
+        """
+        self.assertEqual([], list(iter_json_array([b'[', b' ]'])))
+
+    def test_iter_json_array_with_invalid_data(self):
+        """
+        iter_json_array() should raise ValueError for data which is not an array
+        """
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'{"id": 1}']))
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'[1, 2']))
+
+    def test_streamed_items(self):
+        """
+        StreamedItems should convert decoded items and count them
+        """
+        response = create_streamed_response('[{"id": 1}, {"id": 2}]')
+        items = StreamedItems(response, lambda item: item['id'], chunk_size=4)
+        self.assertFalse(items.complete)
+        self.assertEqual([1, 2], list(items))
+        self.assertTrue(items.complete)
+        self.assertEqual(2, items.count)
+        self.assertTrue(response.raw.closed)
+
+    def test_streamed_items_close(self):
+        """
+        StreamedItems.close() should release the response
+        """
+        response = create_streamed_response('[{"id": 1}, {"id": 2}]')
+        items = StreamedItems(response, chunk_size=4)
+        self.assertEqual({'id': 1}, next(items))
+        items.close()
+        self.assertTrue(response.raw.closed)
+        self.assertFalse(items.complete)
@@ -1,14 +1,19 @@
+import json
+import time
 import unittest
 import six
 import requests
+from six.moves.urllib.parse import urlsplit, parse_qsl
 from tests.bandwidth.helpers import get_voice_client as get_client
-from tests.bandwidth.helpers import create_response, AUTH, headers
+from tests.bandwidth.helpers import create_response, create_streamed_response, AUTH, headers
 if six.PY3:
     from unittest.mock import patch
 else:
     from mock import patch
 
-from bandwidth.voice.lazy_enumerable import get_lazy_enumerator
+from bandwidth.voice import BandwidthVoiceAPIException
+from bandwidth.voice.lazy_enumerable import get_lazy_enumerator, limit_page_size, _resize_page_url, _shrink_page_url, \
+    _PageSizer, Page
 
 
 class LazyEnumerableTests(unittest.TestCase):
@@ -17,7 +22,7 @@ class LazyEnumerableTests(unittest.TestCase):
         """
         get_lazy_enumerator() should return data on demand
         """
-        with patch('requests.request', return_value=create_response(200, '[1, 2, 3]')) as p:
+        with patch('requests.Session.request', return_value=create_response(200, '[1, 2, 3]')) as p:
             client = get_client()
             results = get_lazy_enumerator(client, lambda: client._make_request(
                 'get', 'https://api.catapult.inetwork.com/v1/users/userId/account/transactions?page=0&size=25'))
@@ -40,7 +45,7 @@ class LazyEnumerableTests(unittest.TestCase):
                                     '<transactions?page=1&size=25>; rel="next"'
         response2 = create_response(200, estimated_json2)
         client = get_client()
-        with patch('requests.request', return_value=response2) as p:
+        with patch('requests.Session.request', return_value=response2) as p:
             results = get_lazy_enumerator(client, lambda: ([1, 2, 3], response1, None))
             self.assertEqual([1, 2, 3, 4, 5, 6, 7], list(results))
             p.assert_called_with(
@@ -48,3 +53,357 @@ class LazyEnumerableTests(unittest.TestCase):
                 'transactions?page=1&size=25',
                 headers=headers,
                 auth=AUTH)
+
+    def test_get_lazy_enumerator_with_raw_bytes(self):
+        """
+        get_lazy_enumerator() should yield unparsed pages in raw bytes mode
+        """
+        response1 = create_response(200, '[{"someKey": 1}]')
+        response1.headers['link'] = '<transactions?page=1&size=25>; rel="next"'
+        response2 = create_response(200, '[{"someKey": 2}]')
+        client = get_client().with_options(raw='bytes')
+        with patch('requests.Session.request', side_effect=[response1, response2]):
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'),
+                                          lambda item: item['missing'])
+            self.assertEqual([b'[{"someKey": 1}]', b'[{"someKey": 2}]'], list(results))
+
+    def test_get_lazy_enumerator_with_raw(self):
+        """
+        get_lazy_enumerator() should yield items without conversion in raw mode
+        """
+        client = get_client().with_options(raw=True)
+        with patch('requests.Session.request', return_value=create_response(200, '[{"someKey": 1}]')):
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'))
+            self.assertEqual([{'someKey': 1}], list(results))
+
+    def _create_pages(self, count):
+        responses = []
+        for i in range(count):
+            response = create_response(200, '[%d, %d]' % (2 * i, 2 * i + 1))
+            if i < count - 1:
+                response.headers['link'] = '<transactions?page=%d>; rel="next"' % (i + 1)
+            responses.append(response)
+        return responses
+
+    def _wait_for_calls(self, mock, count):
+        for i in range(200):
+            if mock.call_count >= count:
+                break
+            time.sleep(0.01)
+        return mock.call_count
+
+    def test_get_lazy_enumerator_with_prefetch(self):
+        """
+        get_lazy_enumerator() should fetch next pages in background
+        """
+        client = get_client()
+        with patch('requests.Session.request', side_effect=self._create_pages(3)) as p:
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'),
+                                          prefetch_pages=1)
+            self.assertEqual(0, next(results))
+            self.assertTrue(self._wait_for_calls(p, 2) >= 2)
+            self.assertEqual([1, 2, 3, 4, 5], list(results))
+            self.assertEqual(3, p.call_count)
+
+    def test_get_lazy_enumerator_with_prefetch_and_close(self):
+        """
+        get_lazy_enumerator() should stop fetching of pages in background after close()
+        """
+        client = get_client().with_options(prefetch_pages=1)
+        with patch('requests.Session.request', side_effect=self._create_pages(10)) as p:
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'))
+            self.assertEqual(0, next(results))
+            self._wait_for_calls(p, 3)
+            results.close()
+            count = p.call_count
+            time.sleep(0.05)
+            self.assertEqual(count, p.call_count)
+            self.assertTrue(count <= 4)
+            self.assertEqual([], list(results))
+
+    def test_get_lazy_enumerator_with_prefetch_error(self):
+        """
+        get_lazy_enumerator() should raise errors of background requests
+        """
+        client = get_client()
+        responses = self._create_pages(2)
+        responses[1] = create_response(500, '{"message": "error"}')
+        with patch('requests.Session.request', side_effect=responses):
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'),
+                                          prefetch_pages=2)
+            self.assertEqual([0, 1], [next(results), next(results)])
+            with self.assertRaises(BandwidthVoiceAPIException):
+                next(results)
+
+    def test_iter_pages(self):
+        """
+        iter_pages() should return pages with their metadata
+        """
+        client = get_client()
+        with patch('requests.Session.request', side_effect=self._create_pages(2)):
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'),
+                                          lambda item: item * 10)
+            pages = list(results.iter_pages())
+            self.assertEqual([[0, 10], [20, 30]], [page.items for page in pages])
+            self.assertEqual([2, 2], [page.size for page in pages])
+            self.assertEqual(['transactions?page=1', None], [page.next_page_url for page in pages])
+            self.assertTrue(all(page.latency >= 0 for page in pages))
+
+    def test_iter_pages_with_prefetch_and_raw_bytes(self):
+        """
+        iter_pages() should return unparsed pages fetched in background
+        """
+        client = get_client().with_options(raw='bytes', prefetch_pages=1)
+        with patch('requests.Session.request', side_effect=self._create_pages(2)):
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'))
+            pages = list(results.iter_pages())
+            self.assertEqual([b'[0, 1]', b'[2, 3]'], [page.items for page in pages])
+            self.assertEqual([None, None], [page.size for page in pages])
+
+    def test_checkpoint_and_restore(self):
+        """
+        restore() should resume the enumeration from the position returned by checkpoint()
+        """
+        client = get_client()
+        with patch('requests.Session.request', side_effect=self._create_pages(3)):
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'))
+            self.assertEqual({'page_url': None, 'offset': 0, 'done': False}, results.checkpoint())
+            self.assertEqual([0, 1, 2], [next(results), next(results), next(results)])
+            cursor = results.checkpoint()
+            self.assertEqual({'page_url': 'transactions?page=1', 'offset': 1, 'done': False}, cursor)
+        responses = self._create_pages(3)[1:]
+        with patch('requests.Session.request', side_effect=responses) as p:
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'))
+            self.assertEqual([3, 4, 5], list(results.restore(cursor)))
+            self.assertEqual('transactions?page=1', p.call_args_list[0][0][1])
+            self.assertEqual({'page_url': None, 'offset': 0, 'done': True}, results.checkpoint())
+
+    def test_checkpoint_at_end_of_page(self):
+        """
+        checkpoint() should point to next page when all items of a page are consumed
+        """
+        client = get_client()
+        with patch('requests.Session.request', side_effect=self._create_pages(2)):
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'),
+                                          prefetch_pages=1)
+            self.assertEqual([0, 1], [next(results), next(results)])
+            self.assertEqual({'page_url': 'transactions?page=1', 'offset': 0, 'done': False}, results.checkpoint())
+            results.close()
+
+    def test_restore_finished_enumeration(self):
+        """
+        restore() should not make requests for a finished enumeration
+        """
+        client = get_client()
+        with patch('requests.Session.request') as p:
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'))
+            self.assertEqual([], list(results.restore({'page_url': None, 'offset': 0, 'done': True})))
+            p.assert_not_called()
+
+    def test_restore_after_start(self):
+        """
+        restore() should raise ValueError if the enumeration is started
+        """
+        client = get_client()
+        with patch('requests.Session.request', side_effect=self._create_pages(1)):
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'))
+            next(results)
+            with self.assertRaises(ValueError):
+                results.restore({'page_url': None, 'offset': 1})
+
+    def test_iter_pages_with_restored_cursor(self):
+        """
+        iter_pages() should return rest of partially consumed page
+        """
+        client = get_client()
+        with patch('requests.Session.request', side_effect=self._create_pages(3)[1:]):
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'))
+            results.restore({'page_url': 'transactions?page=1', 'offset': 1})
+            self.assertEqual([[3], [4, 5]], [page.items for page in results.iter_pages()])
+
+    def _create_paged_request(self, total, latency=0):
+        def request(method, url, **kwargs):
+            time.sleep(latency)
+            params = kwargs.get('params') or dict(parse_qsl(urlsplit(url).query))
+            page, size = int(params.get('page', 0)), int(params['size'])
+            response = create_response(200, json.dumps(list(range(page * size, min(total, (page + 1) * size)))))
+            if (page + 1) * size < total:
+                response.headers['link'] = '<https://localhost/transactions?size=%d&page=%d>; rel="next"' % (
+                    size, page + 1)
+            return response
+        return request
+
+    def test_resize_page_url(self):
+        """
+        _resize_page_url() should change size of a page only if its first item stays the same
+        """
+        self.assertEqual('https://localhost/transactions?size=50&page=1&type=charge', _resize_page_url(
+            'https://localhost/transactions?size=25&page=2&type=charge', 50))
+        self.assertEqual('https://localhost/transactions?size=25&page=1', _resize_page_url(
+            'https://localhost/transactions?size=25&page=1', 50))
+        self.assertEqual('https://localhost/transactions?size=25', _resize_page_url(
+            'https://localhost/transactions?size=25', 50))
+
+    def test_get_lazy_enumerator_with_adaptive_page_size(self):
+        """
+        get_lazy_enumerator() should grow size of pages which are consumed faster than fetched
+        """
+        client = get_client().with_options(adaptive_page_size=8)
+        with patch('requests.Session.request', side_effect=self._create_paged_request(30, 0.01)) as p:
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions',
+                                                                               params={'size': 2}))
+            self.assertEqual(list(range(30)), list(results))
+            sizes = [dict(parse_qsl(urlsplit(c[0][1]).query)).get('size') for c in p.call_args_list[1:]]
+            self.assertEqual(['2', '4', '8', '8', '8'], sizes)
+
+    def test_get_lazy_enumerator_with_adaptive_page_size_and_slow_consumer(self):
+        """
+        get_lazy_enumerator() should not grow prefetched pages which are consumed slower than fetched
+        """
+        client = get_client().with_options(adaptive_page_size=8, prefetch_pages=1)
+        with patch('requests.Session.request', side_effect=self._create_paged_request(10, 0.005)) as p:
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions',
+                                                                               params={'size': 2}))
+            items = []
+            for item in results:
+                items.append(item)
+                if item % 2 == 1:
+                    time.sleep(0.05)
+            self.assertEqual(list(range(10)), items)
+            self.assertEqual(5, p.call_count)
+
+    def test_page_sizer(self):
+        """
+        _PageSizer should grow next pages by the speed of the consumer, pages should keep their first items
+        """
+        sizer = _PageSizer(1000)
+        url = 'https://localhost/transactions?page=4&size=10'
+        self.assertEqual(url, sizer.get_next_page_url(url))
+        with patch('bandwidth.voice.lazy_enumerable.default_timer', side_effect=[0, 0.001, 1, 1.04, 2, 2.2]):
+            sizer.page_delivered(Page(list(range(10)), None, url, 0.1))
+            sizer.page_consumed()
+            self.assertEqual('https://localhost/transactions?page=1&size=40', sizer.get_next_page_url(url))
+            sizer.page_delivered(Page(list(range(10)), None, url, 0.1))
+            sizer.page_consumed()
+            self.assertEqual('https://localhost/transactions?page=2&size=20', sizer.get_next_page_url(url))
+            sizer.page_delivered(Page(list(range(10)), None, url, 0.1))
+            sizer.page_consumed()
+            self.assertEqual(url, sizer.get_next_page_url(url))
+
+    def test_list_method_with_adaptive_page_size(self):
+        """
+        list methods should request small first page in adaptive page size mode
+        """
+        client = get_client().with_options(adaptive_page_size=True)
+        with patch('requests.Session.request', return_value=create_response(200, '[]')) as p:
+            list(client.list_calls(size=1000))
+            self.assertEqual(10, p.call_args[1]['params']['size'])
+
+    def test_get_lazy_enumerator_without_adaptive_page_size(self):
+        """
+        get_lazy_enumerator() should not change size of pages by default
+        """
+        client = get_client()
+        with patch('requests.Session.request', side_effect=self._create_paged_request(10, 0.01)) as p:
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions',
+                                                                               params={'size': 2}))
+            self.assertEqual(list(range(10)), list(results))
+            self.assertEqual(5, p.call_count)
+
+    def test_shrink_page_url(self):
+        """
+        _shrink_page_url() should shrink a page to the smallest size which keeps its first item
+        """
+        self.assertEqual('https://localhost/transactions?page=5&size=5', _shrink_page_url(
+            'https://localhost/transactions?page=1&size=25', 5))
+        self.assertEqual('https://localhost/transactions?page=5&size=5', _shrink_page_url(
+            'https://localhost/transactions?page=1&size=25', 3))
+        self.assertEqual('https://localhost/transactions?page=1&size=25', _shrink_page_url(
+            'https://localhost/transactions?page=1&size=25', 30))
+
+    def test_limit_page_size(self):
+        """
+        limit_page_size() should return size of first page for a limit
+        """
+        self.assertEqual(None, limit_page_size(None, None))
+        self.assertEqual(10, limit_page_size(None, 10))
+        self.assertEqual(25, limit_page_size(None, 100))
+        self.assertEqual(50, limit_page_size(100, 50))
+        self.assertEqual(10, limit_page_size(None, None, True))
+        self.assertEqual(10, limit_page_size(1000, 50, 100))
+        self.assertEqual(5, limit_page_size(5, None, True))
+        self.assertEqual(3, limit_page_size(1000, 3, True))
+
+    def test_get_lazy_enumerator_with_limit(self):
+        """
+        get_lazy_enumerator() should shrink last page and stop fetching when the limit is reached
+        """
+        client = get_client()
+        for prefetch_pages in (0, 2):
+            with patch('requests.Session.request', side_effect=self._create_paged_request(100)) as p:
+                results = get_lazy_enumerator(client, lambda: client._make_request(
+                    'get', '/transactions', params={'size': limit_page_size(10, 23)}), limit=23,
+                    prefetch_pages=prefetch_pages)
+                self.assertEqual(list(range(23)), list(results))
+                self.assertEqual(3, p.call_count)
+                self.assertEqual('https://localhost/transactions?size=4&page=5', p.call_args[0][1])
+
+    def test_iter_pages_with_limit(self):
+        """
+        iter_pages() should not return items after the limit
+        """
+        client = get_client()
+        with patch('requests.Session.request', side_effect=self._create_paged_request(100)) as p:
+            results = get_lazy_enumerator(client, lambda: client._make_request(
+                'get', '/transactions', params={'size': 4}), limit=6)
+            self.assertEqual([[0, 1, 2, 3], [4, 5]], [page.items for page in results.iter_pages()])
+            self.assertEqual(2, p.call_count)
+
+    def test_get_lazy_enumerator_with_limit_and_raw_bytes(self):
+        """
+        get_lazy_enumerator() should raise ValueError for limit in 'bytes' raw mode
+        """
+        client = get_client().with_options(raw='bytes')
+        with self.assertRaises(ValueError):
+            get_lazy_enumerator(client, lambda: client._make_request('get', '/transactions'), limit=1)
+
+    def test_get_lazy_enumerator_with_stream_items(self):
+        """
+        get_lazy_enumerator() should decode items of pages from the response stream
+        """
+        response1 = create_streamed_response('[{"callId": "1"}, {"callId": "2"}]')
+        response1.headers['link'] = '<https://localhost/calls?page=1&size=2>; rel="next"'
+        response2 = create_streamed_response('[{"callId": "3"}]')
+        client = get_client().with_options(stream_items=True, prefetch_pages=2)
+        with patch('requests.Session.request', side_effect=[response1, response2]) as p:
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/calls', params={'size': 2}))
+            self.assertEqual({'call_id': '1'}, next(results))
+            self.assertEqual(1, p.call_count)
+            self.assertEqual({'page_url': None, 'offset': 1, 'done': False}, results.checkpoint())
+            self.assertEqual([{'call_id': '2'}, {'call_id': '3'}], list(results))
+            self.assertTrue(all(c[1]['stream'] for c in p.call_args_list))
+            self.assertEqual({'page_url': None, 'offset': 0, 'done': True}, results.checkpoint())
+
+    def test_get_lazy_enumerator_with_stream_items_and_limit(self):
+        """
+        get_lazy_enumerator() should count streamed items for the limit and release stopped stream
+        """
+        response = create_streamed_response('[{"callId": "1"}, {"callId": "2"}]')
+        response.headers['link'] = '<https://localhost/calls?page=1&size=2>; rel="next"'
+        client = get_client()
+        with patch('requests.Session.request', side_effect=[response]):
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/calls', params={'size': 2}),
+                                          limit=1, stream_items=True)
+            self.assertEqual([{'call_id': '1'}], list(results))
+            self.assertTrue(response.raw.closed)
+
+    def test_iter_pages_with_stream_items(self):
+        """
+        iter_pages() should return decoded items of streamed pages
+        """
+        client = get_client().with_options(stream_items=True)
+        with patch('requests.Session.request', side_effect=[create_streamed_response('[{"callId": "1"}]')]):
+            results = get_lazy_enumerator(client, lambda: client._make_request('get', '/calls'))
+            pages = list(results.iter_pages())
+            self.assertEqual([[{'call_id': '1'}]], [page.items for page in pages])
+            self.assertEqual(1, pages[0].size)
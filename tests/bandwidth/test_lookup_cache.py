@@ -0,0 +1,105 @@
+import unittest
+import six
+from tests.bandwidth.helpers import create_response
+if six.PY3:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+from bandwidth.account import Client
+from bandwidth.lookup_cache import LookupCache
+
+NUMBER_INFO = '{"name": "RALEIGH, NC", "number": "+1234567890"}'
+
+
+class LookupCacheTests(unittest.TestCase):
+
+    def test_get_number_info(self):
+        """
+        get_number_info() should return cached information without requests
+        """
+        cache = LookupCache()
+        client = Client('userId', 'apiToken', 'apiSecret', lookup_cache=cache)
+        with patch('requests.Session.request', return_value=create_response(200, NUMBER_INFO)) as p:
+            data = client.get_number_info('+1234567890')
+            data['name'] = 'Changed'
+            self.assertEqual('RALEIGH, NC', client.get_number_info('+1234567890')['name'])
+            self.assertEqual(1, p.call_count)
+        stats = cache.stats()
+        self.assertEqual((1, 1, 1, 0.5), (stats['hits'], stats['misses'], stats['size'], stats['hit_ratio']))
+
+    def test_ttl(self):
+        """
+        Expired results should be loaded again, lookups with None ttl should not be cached
+        """
+        cache = LookupCache(ttl=60, ttl_overrides={'domains': None})
+        client = Client('userId', 'apiToken', 'apiSecret', lookup_cache=cache)
+        with patch('requests.Session.request', return_value=create_response(200, NUMBER_INFO)) as p:
+            client.get_number_info('+1234567890')
+            with patch('bandwidth.lookup_cache.time.time', return_value=10 ** 10):
+                client.get_number_info('+1234567890')
+            self.assertEqual(2, p.call_count)
+        with patch('requests.Session.request', return_value=create_response(200, '{"id": "rd-1"}')) as p:
+            client.get_domain('rd-1')
+            client.get_domain('rd-1')
+            self.assertEqual(2, p.call_count)
+        self.assertEqual(1, len(cache))
+
+    def test_modes(self):
+        """
+        Results of raw and converted lookups should be cached separately
+        """
+        client = Client('userId', 'apiToken', 'apiSecret', lookup_cache=True)
+        with patch('requests.Session.request', return_value=create_response(200, '{"numberState": "enabled"}')):
+            self.assertEqual({'number_state': 'enabled'}, client.get_phone_number('n-1'))
+            self.assertEqual({'numberState': 'enabled'}, client.with_options(raw=True).get_phone_number('n-1'))
+            self.assertEqual({'number_state': 'enabled'}, client.get_phone_number('n-1'))
+        self.assertEqual(1, client.lookup_cache.stats()['hits'])
+
+    def test_max_entries(self):
+        """
+        Least recently used results should be evicted
+        """
+        cache = LookupCache(max_entries=2)
+        client = Client('userId', 'apiToken', 'apiSecret', lookup_cache=cache)
+        with patch('requests.Session.request', side_effect=lambda *args, **kwargs: create_response(200, '{}')) as p:
+            client.get_application('a-1')
+            client.get_application('a-2')
+            client.get_application('a-1')
+            client.get_application('a-3')
+            client.get_application('a-1')
+            self.assertEqual(3, p.call_count)
+        self.assertEqual(1, cache.stats()['evictions'])
+
+    def test_invalidation(self):
+        """
+        update_*() and delete_*() should remove cached results of the resource
+        """
+        cache = LookupCache()
+        client = Client('userId', 'apiToken', 'apiSecret', lookup_cache=cache)
+        with patch('requests.Session.request', side_effect=lambda *args, **kwargs: create_response(200, '{}')) as p:
+            client.get_application('a-1')
+            client.get_application('a-2')
+            client.get_phone_number('n-1')
+            client.get_domain('rd-1')
+            client.update_application('a-1', name='App')
+            self.assertEqual(3, len(cache))
+            client.delete_application('a-2')
+            client.update_phone_number('n-1', name='Number')
+            client.delete_domain('rd-1')
+            self.assertEqual(0, len(cache))
+            client.get_application('a-1')
+            self.assertEqual(9, p.call_count)
+        self.assertEqual(4, cache.stats()['invalidations'])
+
+    def test_failed_lookup(self):
+        """
+        Failed lookups should not be cached
+        """
+        cache = LookupCache()
+        client = Client('userId', 'apiToken', 'apiSecret', lookup_cache=cache)
+        with patch('requests.Session.request', return_value=create_response(404)):
+            with self.assertRaises(Exception):
+                client.get_application('a-1')
+        self.assertEqual({'hits': 0, 'store_hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0, 'size': 0,
+                          'hit_ratio': 0.0}, cache.stats())
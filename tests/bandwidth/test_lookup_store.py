@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import six
+from tests.bandwidth.helpers import create_response
+if six.PY3:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+from bandwidth.account import Client
+from bandwidth.convert_camel import SnakeCaseDictView
+from bandwidth.lookup_cache import LookupCache
+from bandwidth.lookup_store import SqliteLookupStore
+
+NUMBER_INFO = '{"name": "RALEIGH, NC", "number": "+1234567890", "createdTime": "2017-02-10T09:11:50Z"}'
+
+
+class SqliteLookupStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'lookups.db')
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        shutil.rmtree(self.dir)
+
+    def create_client(self, **options):
+        store = SqliteLookupStore(self.path)
+        self.stores.append(store)
+        return Client('userId', 'apiToken', 'apiSecret', lookup_cache=LookupCache(store=store, **options))
+
+    def test_restart(self):
+        """
+        Results should be taken from the store by a new cache (like after restart of a process)
+        """
+        with patch('requests.Session.request', return_value=create_response(200, NUMBER_INFO)) as p:
+            self.create_client().get_number_info('+1234567890')
+            client = self.create_client()
+            data = client.get_number_info('+1234567890')
+            self.assertEqual({'name': 'RALEIGH, NC', 'number': '+1234567890', 'created_time': '2017-02-10T09:11:50Z'},
+                             data)
+            client.get_number_info('+1234567890')
+            self.assertEqual(1, p.call_count)
+        stats = client.lookup_cache.stats()
+        self.assertEqual((2, 1, 0), (stats['hits'], stats['store_hits'], stats['misses']))
+
+    def test_variants(self):
+        """
+        Raw bytes and lazy views should be restored from the store
+        """
+        with patch('requests.Session.request', return_value=create_response(200, NUMBER_INFO)) as p:
+            client = self.create_client()
+            client.with_options(raw='bytes').get_number_info('+1234567890')
+            client.with_options(lazy_snake_case=True).get_number_info('+1234567890')
+            client = self.create_client()
+            self.assertEqual(NUMBER_INFO.encode('utf-8'),
+                             client.with_options(raw='bytes').get_number_info('+1234567890'))
+            view = client.with_options(lazy_snake_case=True).get_number_info('+1234567890')
+            self.assertIsInstance(view, SnakeCaseDictView)
+            self.assertEqual('2017-02-10T09:11:50Z', view['created_time'])
+            self.assertEqual(2, p.call_count)
+
+    def test_invalidation(self):
+        """
+        Changed resources should be removed from the store
+        """
+        with patch('requests.Session.request', side_effect=lambda *args, **kwargs: create_response(200, '{}')) as p:
+            client = self.create_client()
+            client.get_application('a-1')
+            client.get_application('a-2')
+            client.update_application('a-1', name='App')
+            self.assertEqual(1, len(client.lookup_cache.store))
+            client = self.create_client()
+            client.get_application('a-1')
+            client.get_application('a-2')
+            self.assertEqual(4, p.call_count)
+
+    def test_expiration_and_compaction(self):
+        """
+        Expired results should not be returned and should be removed by compaction
+        """
+        with patch('requests.Session.request', side_effect=lambda *args, **kwargs: create_response(200, '{}')) as p:
+            client = self.create_client(ttl=60)
+            for app_id in ('a-1', 'a-2', 'a-3'):
+                client.get_application(app_id)
+            store = client.lookup_cache.store
+            with patch('bandwidth.lookup_store.time.time', return_value=10 ** 10), \
+                    patch('bandwidth.lookup_cache.time.time', return_value=10 ** 10):
+                self.assertIsNone(store.get(('applications', 'userId', 'a-1', (False, False))))
+                self.assertEqual(3, store.compact())
+            self.assertEqual(0, len(store))
+            self.assertEqual(3, p.call_count)
+
+    def test_max_entries(self):
+        """
+        Results which expire first should be removed when the store is full
+        """
+        store = SqliteLookupStore(self.path, max_entries=2)
+        self.stores.append(store)
+        for i in range(4):
+            store.put(('applications', 'userId', 'a-%d' % i, (False, False)), {'id': 'a-%d' % i}, 10 ** 10 + i)
+        self.assertEqual(2, store.compact(vacuum=False))
+        self.assertIsNone(store.get(('applications', 'userId', 'a-1', (False, False))))
+        self.assertEqual(({'id': 'a-3'}, 10 ** 10 + 3), store.get(('applications', 'userId', 'a-3', (False, False))))
+
+    def test_threads(self):
+        """
+        Threads should share one connection which is closed by close()
+        """
+        store = SqliteLookupStore(self.path)
+        self.stores.append(store)
+        connection = store._connection
+
+        def run(i):
+            store.put(('applications', 'userId', 'a-%d' % i, (False, False)), {'id': 'a-%d' % i}, 10 ** 10)
+            store.get(('applications', 'userId', 'a-%d' % i, (False, False)))
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIs(connection, store._connection)
+        self.assertEqual(20, len(store))
+        store.close()
+        self.assertIsNone(store._connection)
+        self.assertEqual(({'id': 'a-0'}, 10 ** 10), store.get(('applications', 'userId', 'a-0', (False, False))))
@@ -0,0 +1,238 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import requests
+
+from bandwidth.messaging import BandwidthMessageAPIException
+from bandwidth.outbox import Outbox, OutboxLog, is_transient_error
+from bandwidth.retry import RetryPolicy
+
+
+class FakeClient(object):
+
+    def __init__(self, failures=None, error=None):
+        self.sent = []
+        self.failures = dict(failures or {})
+        self.error = error or BandwidthMessageAPIException(503, 'Service unavailable')
+        self._lock = threading.Lock()
+
+    def _send(self, kind, to, kwargs):
+        with self._lock:
+            if self.failures.get(to):
+                self.failures[to] -= 1
+                raise self.error
+            self.sent.append((kind, to, kwargs))
+            return '%s-%s' % (kind, to)
+
+    def send_message(self, from_, to, **kwargs):
+        return self._send('m', to, kwargs)
+
+    def create_call(self, from_, to, **kwargs):
+        return self._send('c', to, kwargs)
+
+
+class FakeKeyedClient(object):
+
+    def __init__(self, client, key):
+        self.client = client
+        self.key = key
+
+    def send_message(self, from_, to, **kwargs):
+        return self.client.send_message(from_, to, key=self.key, **kwargs)
+
+
+class OutboxTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'outbox.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_send(self):
+        """
+        Queued messages and calls should be sent and acknowledged
+        """
+        client = FakeClient()
+        delivered = []
+        with Outbox(self.path, messaging=client, voice=client, fsync_interval=0,
+                    on_delivered=lambda seq, id: delivered.append((seq, id))) as outbox:
+            self.assertEqual(1, outbox.send_message(from_='+1', to='+2', text='Hello'))
+            self.assertEqual(2, outbox.create_call(from_='+1', to='+3', callback_url='http://host'))
+            self.assertTrue(outbox.wait_idle(5))
+            self.assertEqual(0, outbox.pending())
+            self.assertEqual(2, outbox.delivered)
+        self.assertEqual([(1, 'm-+2'), (2, 'c-+3')], sorted(delivered))
+        self.assertIn(('m', '+2', {'text': 'Hello'}), client.sent)
+        self.assertIn(('c', '+3', {'callback_url': 'http://host'}), client.sent)
+
+    def test_enqueue_validation(self):
+        """
+        enqueue() should accept known operations of configured clients only
+        """
+        with Outbox(self.path, messaging=FakeClient()) as outbox:
+            with self.assertRaises(ValueError):
+                outbox.enqueue('messaging', 'delete_message', id='m-id')
+            with self.assertRaises(ValueError):
+                outbox.create_call(from_='+1', to='+2')
+
+    def test_replay(self):
+        """
+        Entries which are not acknowledged should be sent when the outbox is opened again
+        """
+        outbox = Outbox(self.path, messaging=FakeClient(), workers=0)
+        outbox.send_message(from_='+1', to='+2', text='1')
+        outbox.send_message(from_='+1', to='+3', text='2')
+        outbox.close()
+        log = OutboxLog(self.path)
+        self.assertEqual([1, 2], sorted(log.pending))
+        log.close()
+        client = FakeClient()
+        with Outbox(self.path, messaging=client, workers=1) as outbox:
+            self.assertTrue(outbox.wait_idle(5))
+            self.assertEqual(3, outbox.send_message(from_='+1', to='+4', text='3'))
+            self.assertTrue(outbox.wait_idle(5))
+        self.assertEqual(['+2', '+3', '+4'], [to for _, to, _ in client.sent])
+        with Outbox(self.path, messaging=client) as outbox:
+            self.assertEqual(0, outbox.pending())
+        self.assertEqual(3, len(client.sent))
+
+    def test_retry(self):
+        """
+        Transient failures should be retried, other failures should drop the entry
+        """
+        client = FakeClient({'+2': 2, '+3': 1})
+        failed = []
+        policy = RetryPolicy(max_attempts=3, backoff_base=0.01, backoff_max=0.01)
+        with Outbox(self.path, messaging=client, retry_policy=policy,
+                    on_failed=lambda seq, err: failed.append(seq)) as outbox:
+            outbox.send_message(from_='+1', to='+2')
+            self.assertTrue(outbox.wait_idle(5))
+            time.sleep(0.1)
+            self.assertTrue(outbox.wait_idle(5))
+            self.assertEqual(1, outbox.delivered)
+            self.assertEqual(2, outbox.retries)
+            client.error = BandwidthMessageAPIException(400, 'Invalid number')
+            outbox.send_message(from_='+1', to='+3')
+            self.assertTrue(outbox.wait_idle(5))
+            self.assertEqual(1, outbox.failed)
+            self.assertEqual(0, outbox.pending())
+        self.assertEqual([2], failed)
+
+    def test_rate(self):
+        """
+        Entries should be sent with the given rate
+        """
+        client = FakeClient()
+        with Outbox(self.path, messaging=client, rate=50) as outbox:
+            outbox.bucket._tokens = 0
+            start = time.time()
+            for i in range(5):
+                outbox.send_message(from_='+1', to=str(i))
+            self.assertTrue(outbox.wait_idle(5))
+            self.assertGreaterEqual(time.time() - start, 0.08)
+
+    def test_idempotency_key(self):
+        """
+        An entry should be sent with its own idempotency key by a client with the idempotency middleware
+        """
+        client = FakeClient()
+        client.idempotency_keys = object()
+        client.with_options = lambda idempotency_key: FakeKeyedClient(client, idempotency_key)
+        with Outbox(self.path, messaging=client) as outbox:
+            outbox.send_message(from_='+1', to='+2')
+            outbox.send_message(from_='+1', to='+3')
+            self.assertTrue(outbox.wait_idle(5))
+        keys = [kwargs['key'] for _, _, kwargs in client.sent]
+        self.assertEqual(2, len(set(keys)))
+        self.assertTrue(all(keys))
+
+    def test_is_transient_error(self):
+        """
+        is_transient_error() should detect connection errors and retriable statuses
+        """
+        self.assertTrue(is_transient_error(requests.ConnectionError()))
+        self.assertTrue(is_transient_error(BandwidthMessageAPIException(429, 'Too many requests')))
+        self.assertFalse(is_transient_error(BandwidthMessageAPIException(404, 'Not found')))
+        self.assertFalse(is_transient_error(ValueError()))
+
+
+class OutboxLogTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'outbox.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_torn_record(self):
+        """
+        A damaged last line should be skipped and should not damage next records
+        """
+        log = OutboxLog(self.path)
+        log.append({'op': 'enqueue', 'seq': 1})
+        log.append({'op': 'enqueue', 'seq': 2})
+        log.close()
+        with open(self.path, 'r') as f:
+            data = f.read()
+        with open(self.path, 'w') as f:
+            f.write(data[:-5])
+        log = OutboxLog(self.path)
+        self.assertEqual([1], list(log.pending))
+        log.append({'op': 'enqueue', 'seq': 3})
+        log.close()
+        log = OutboxLog(self.path)
+        self.assertEqual([1, 3], sorted(log.pending))
+        log.close()
+
+    def test_compact(self):
+        """
+        compact() should keep pending entries only
+        """
+        log = OutboxLog(self.path)
+        for seq in range(1, 11):
+            log.append({'op': 'enqueue', 'seq': seq}, durable=False)
+        for seq in range(1, 10):
+            log.append({'op': 'ack', 'seq': seq}, durable=False)
+        self.assertEqual(9, log.completed)
+        log.compact()
+        log.append({'op': 'enqueue', 'seq': 11})
+        log.close()
+        with open(self.path, 'r') as f:
+            self.assertEqual(2, len(f.readlines()))
+        log = OutboxLog(self.path)
+        self.assertEqual([10, 11], sorted(log.pending))
+        self.assertEqual(11, log.last_seq)
+        log.close()
+
+    def test_group_commit(self):
+        """
+        Records of concurrent writers should be written with shared fsync calls
+        """
+        log = OutboxLog(self.path, fsync_interval=0.02)
+        calls = []
+        fsync = os.fsync
+
+        def count_fsync(fd):
+            calls.append(fd)
+            fsync(fd)
+        os.fsync = count_fsync
+        try:
+            threads = [threading.Thread(target=log.append, args=({'op': 'enqueue', 'seq': i},)) for i in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            os.fsync = fsync
+        log.close()
+        self.assertLess(len(calls), 10)
+        log = OutboxLog(self.path)
+        self.assertEqual(20, len(log.pending))
+        log.close()
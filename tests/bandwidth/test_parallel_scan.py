@@ -0,0 +1,118 @@
+import threading
+import time
+import unittest
+from datetime import datetime
+
+from bandwidth.parallel_scan import split_time_range, scan_time_range, ParallelScan
+
+
+class ParallelScanTests(unittest.TestCase):
+
+    def test_split_time_range(self):
+        """
+        split_time_range() should split the range into non overlapping shards
+        """
+        self.assertEqual([
+            (datetime(2017, 1, 1, 0, 0, 0), datetime(2017, 1, 1, 5, 59, 59)),
+            (datetime(2017, 1, 1, 6, 0, 0), datetime(2017, 1, 1, 11, 59, 59)),
+            (datetime(2017, 1, 1, 12, 0, 0), datetime(2017, 1, 1, 17, 59, 59)),
+            (datetime(2017, 1, 1, 18, 0, 0), datetime(2017, 1, 1, 23, 59, 59))
+        ], split_time_range('2017-01-01 00:00:00', '2017-01-01 23:59:59', 4))
+
+    def test_split_time_range_shorter_than_shards(self):
+        """
+        split_time_range() should not return shards shorter than one second
+        """
+        self.assertEqual([
+            (datetime(2017, 1, 1, 0, 0, 0), datetime(2017, 1, 1, 0, 0, 0)),
+            (datetime(2017, 1, 1, 0, 0, 1), datetime(2017, 1, 1, 0, 0, 1))
+        ], split_time_range(datetime(2017, 1, 1, 0, 0, 0), datetime(2017, 1, 1, 0, 0, 1), 8))
+
+    def test_split_time_range_with_invalid_range(self):
+        """
+        split_time_range() should raise ValueError if the end of the range is earlier than its start
+        """
+        with self.assertRaises(ValueError):
+            split_time_range('2017-01-02 00:00:00', '2017-01-01 00:00:00', 4)
+
+    def test_ordered_scan(self):
+        """
+        ParallelScan should return items of shards in order of shards
+        """
+        def list_shard(shard):
+            # later shards are fetched faster
+            time.sleep(0.01 * (4 - shard))
+            return [shard * 10 + i for i in range(5)]
+        scan = ParallelScan(list_shard, range(4), workers=4, batch_size=2)
+        self.assertEqual([0, 1, 2, 3, 4, 10, 11, 12, 13, 14, 20, 21, 22, 23, 24, 30, 31, 32, 33, 34], list(scan))
+
+    def test_unordered_scan(self):
+        """
+        ParallelScan should return all items of shards as soon as they are fetched if ordered is False
+        """
+        released = threading.Event()
+
+        def list_shard(shard):
+            # other shards are fetched after the first item of the last shard is returned
+            if shard != 3:
+                released.wait(5)
+            return [shard * 10 + i for i in range(5)]
+        items = []
+        for item in ParallelScan(list_shard, range(4), workers=4, ordered=False, batch_size=2):
+            items.append(item)
+            released.set()
+        self.assertEqual([0, 1, 2, 3, 4, 10, 11, 12, 13, 14, 20, 21, 22, 23, 24, 30, 31, 32, 33, 34], sorted(items))
+        self.assertEqual([30, 31], items[:2])
+        for shard in range(4):
+            self.assertEqual([shard * 10 + i for i in range(5)], [item for item in items if item // 10 == shard])
+
+    def test_scan_with_error(self):
+        """
+        ParallelScan should raise error of a shard
+        """
+        def list_shard(shard):
+            if shard == 1:
+                raise ValueError('error')
+            return [shard]
+        scan = ParallelScan(list_shard, range(3), workers=2)
+        self.assertEqual(0, next(scan))
+        with self.assertRaises(ValueError):
+            next(scan)
+
+    def test_close(self):
+        """
+        ParallelScan.close() should stop the workers
+        """
+        fetched = []
+
+        def list_shard(shard):
+            for i in range(1000):
+                fetched.append(i)
+                yield i
+        threads = threading.active_count()
+        scan = ParallelScan(list_shard, range(2), workers=2, batch_size=1)
+        self.assertEqual(0, next(scan))
+        scan.close()
+        for _ in range(100):
+            if threading.active_count() == threads:
+                break
+            time.sleep(0.01)
+        self.assertEqual(threads, threading.active_count())
+        self.assertLess(len(fetched), 100)
+        with self.assertRaises(StopIteration):
+            next(scan)
+
+    def test_scan_time_range(self):
+        """
+        scan_time_range() should pass formatted bounds of shards to list_shard
+        """
+        shards = []
+
+        def list_shard(start, end):
+            shards.append((start, end))
+            return [start]
+        items = list(scan_time_range(list_shard, '2017-01-01 00:00:00', '2017-01-01 23:59:59', '%Y-%m-%dT%H:%M:%SZ',
+                                     shards=2, reverse=True))
+        self.assertEqual(['2017-01-01T12:00:00Z', '2017-01-01T00:00:00Z'], items)
+        self.assertEqual([('2017-01-01T00:00:00Z', '2017-01-01T11:59:59Z'),
+                          ('2017-01-01T12:00:00Z', '2017-01-01T23:59:59Z')], sorted(shards))
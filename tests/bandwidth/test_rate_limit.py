@@ -0,0 +1,106 @@
+import threading
+import unittest
+import six
+from tests.bandwidth.helpers import create_response
+if six.PY3:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+from bandwidth.messaging import Client as MessagingClient
+from bandwidth.rate_limit import RateLimiter, RateLimitExceeded, TokenBucket
+from bandwidth.transport import TransportRequest
+
+MESSAGES_URL = 'https://api.catapult.inetwork.com/v1/users/userId/messages'
+
+
+class TokenBucketTests(unittest.TestCase):
+
+    def test_reserve(self):
+        """
+        reserve() should take tokens and return waits for reserved tokens
+        """
+        with patch('bandwidth.rate_limit.time.time', return_value=100.0) as now:
+            bucket = TokenBucket(2, burst=2)
+            self.assertEqual([0.0, 0.0, 0.5, 1.0], [bucket.reserve() for _ in range(4)])
+            self.assertEqual(-1.5, bucket.reserve(max_wait=1))
+            now.return_value = 101.5
+            self.assertEqual(0.0, bucket.reserve(max_wait=0))
+            bucket.refund()
+            self.assertEqual(0.0, bucket.reserve(max_wait=0))
+            self.assertEqual(-0.5, bucket.reserve(max_wait=0))
+
+    def test_threads(self):
+        """
+        Tokens should not be reserved twice by concurrent threads
+        """
+        bucket = TokenBucket(1000, burst=1000)
+        waits = []
+
+        def reserve():
+            for _ in range(250):
+                waits.append(bucket.reserve(max_wait=0))
+        with patch('bandwidth.rate_limit.time.time', return_value=100.0):
+            threads = [threading.Thread(target=reserve) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(1000, waits.count(0.0))
+        self.assertEqual(1000, len([w for w in waits if w < 0]))
+
+
+class RateLimiterTests(unittest.TestCase):
+
+    def test_client_rate(self):
+        """
+        Client should wait for tokens of the limiter
+        """
+        with patch('bandwidth.rate_limit.time.time', return_value=100.0), \
+                patch('bandwidth.rate_limit.time.sleep') as sleep, \
+                patch('requests.Session.request', return_value=create_response(200, '{"id": "m"}')) as p:
+            client = MessagingClient('userId', 'apiToken', 'apiSecret', rate_limit=2)
+            for _ in range(3):
+                client.get_message('m')
+            self.assertEqual(3, p.call_count)
+            sleep.assert_called_once_with(0.5)
+            self.assertEqual((1, 0.5), (client.rate_limiter.delayed, client.rate_limiter.waited))
+
+    def test_fail_fast(self):
+        """
+        Requests should fail without waiting when rate_limit_wait is 0
+        """
+        limiter = RateLimiter(rate=1)
+        with patch('bandwidth.rate_limit.time.time', return_value=100.0), \
+                patch('bandwidth.rate_limit.time.sleep') as sleep, \
+                patch('requests.Session.request', return_value=create_response(200, '{"id": "m"}')) as p:
+            client = MessagingClient('userId', 'apiToken', 'apiSecret', rate_limit=limiter)
+            client.get_message('m')
+            with self.assertRaises(RateLimitExceeded) as context:
+                client.with_options(rate_limit_wait=0).get_message('m')
+            self.assertEqual(('client', 1.0), (context.exception.limit, context.exception.wait))
+            self.assertIn('allowed in 1.000 seconds', str(context.exception))
+            client.with_options(rate_limit_wait=5).get_message('m')
+            self.assertEqual(2, p.call_count)
+            sleep.assert_called_once_with(1.0)
+        self.assertEqual(1, limiter.rejected)
+
+    def test_family_and_endpoint_rates(self):
+        """
+        Requests should take tokens of their api family and endpoint class
+        """
+        limiter = RateLimiter(family_rates={'messaging': 10}, endpoint_rates={'POST messages': (1, 2)}, max_wait=0)
+        with patch('bandwidth.rate_limit.time.time', return_value=100.0):
+            limiter.acquire(TransportRequest('post', MESSAGES_URL, family='messaging'))
+            limiter.acquire(TransportRequest('post', MESSAGES_URL, family='messaging'))
+            with self.assertRaises(RateLimitExceeded) as context:
+                limiter.acquire(TransportRequest('post', MESSAGES_URL, family='messaging'))
+            self.assertEqual('POST messages', context.exception.limit)
+            # the rejected request returns the token of the family bucket
+            for _ in range(8):
+                limiter.acquire(TransportRequest('get', MESSAGES_URL, family='messaging'))
+            with self.assertRaises(RateLimitExceeded) as context:
+                limiter.acquire(TransportRequest('get', MESSAGES_URL, family='messaging'))
+            self.assertEqual('messaging', context.exception.limit)
+            limiter.acquire(TransportRequest('get', 'https://api.catapult.inetwork.com/v1/users/userId/calls',
+                                             family='voice'))
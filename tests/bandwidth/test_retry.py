@@ -0,0 +1,114 @@
+import unittest
+import six
+import requests
+from tests.bandwidth.helpers import create_response
+if six.PY3:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+from bandwidth.messaging import Client as MessagingClient, BandwidthMessageAPIException
+from bandwidth.transport import RecordedTransport, TransportRequest
+from bandwidth.voice import Client as VoiceClient
+from bandwidth.retry import RetryPolicy, parse_retry_after
+
+
+def create_error_response(status_code, retry_after=None):
+    response = create_response(status_code, '{"message": "Try later", "code": "overloaded"}')
+    if retry_after is not None:
+        response.headers['Retry-After'] = retry_after
+    return response
+
+
+class RetryPolicyTests(unittest.TestCase):
+
+    def test_parse_retry_after(self):
+        """
+        parse_retry_after() should parse seconds and http dates
+        """
+        self.assertEqual(120.0, parse_retry_after('120'))
+        self.assertEqual(10.0, parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', now=1445412470))
+        self.assertEqual(0.0, parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', now=1445412490))
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_retry_get(self):
+        """
+        GET requests should be retried on 5xx responses and connection errors
+        """
+        client = VoiceClient('userId', 'apiToken', 'apiSecret', retry=True)
+        responses = [create_error_response(503), requests.ConnectionError('reset'),
+                     create_response(200, '{"id": "callId"}')]
+        with patch('requests.Session.request', side_effect=responses) as p, \
+                patch('bandwidth.retry.time.sleep') as sleep, \
+                patch('bandwidth.retry.random.uniform', side_effect=lambda a, b: b):
+            self.assertEqual({'id': 'callId'}, client.get_call('callId'))
+            self.assertEqual(3, p.call_count)
+            self.assertEqual([0.5, 1.0], [c[0][0] for c in sleep.call_args_list])
+        policy = client.retry_policy
+        self.assertEqual((2, 1, 0), (policy.retries, policy.retried_requests, policy.exhausted))
+        self.assertEqual({'503': 1, 'ConnectionError': 1}, policy.retries_by_reason)
+
+    def test_retry_after(self):
+        """
+        Retry-After header should be respected
+        """
+        client = VoiceClient('userId', 'apiToken', 'apiSecret', retry=True)
+        responses = [create_error_response(429, '3'), create_response(200, '{"id": "callId"}')]
+        with patch('requests.Session.request', side_effect=responses), \
+                patch('bandwidth.retry.time.sleep') as sleep:
+            client.get_call('callId')
+            sleep.assert_called_once_with(3.0)
+
+    def test_post_is_not_retried_after_processing(self):
+        """
+        POST requests should be retried only if they were rejected without processing
+        """
+        client = MessagingClient('userId', 'apiToken', 'apiSecret', retry=True)
+        with patch('requests.Session.request', return_value=create_error_response(503)) as p, \
+                patch('bandwidth.retry.time.sleep'):
+            with self.assertRaises(BandwidthMessageAPIException):
+                client.send_message(from_='+1234567980', to='+1234567981', text='Hello')
+            self.assertEqual(1, p.call_count)
+        response = create_response(201)
+        response.headers['Location'] = 'http://localhost/messageId'
+        with patch('requests.Session.request', side_effect=[create_error_response(429), response]) as p, \
+                patch('bandwidth.retry.time.sleep'):
+            self.assertEqual('messageId', client.send_message(from_='+1234567980', to='+1234567981', text='Hello'))
+        with patch('requests.Session.request', side_effect=requests.ReadTimeout('timeout')) as p, \
+                patch('bandwidth.retry.time.sleep'):
+            with self.assertRaises(requests.ReadTimeout):
+                client.send_message(from_='+1234567980', to='+1234567981', text='Hello')
+            self.assertEqual(1, p.call_count)
+
+    def test_max_attempts(self):
+        """
+        The last response should be returned when attempts are exhausted
+        """
+        policy = RetryPolicy(max_attempts=3)
+        transport = RecordedTransport([create_error_response(500) for _ in range(3)], [policy])
+        with patch('bandwidth.retry.time.sleep'):
+            self.assertEqual(500, transport.request(TransportRequest('get', 'http://localhost')).status_code)
+        self.assertEqual((2, 1), (policy.retries, policy.exhausted))
+        self.assertEqual([], transport.responses)
+
+    def test_max_elapsed(self):
+        """
+        Requests should not be retried after max_elapsed seconds
+        """
+        policy = RetryPolicy(max_elapsed=10)
+        transport = RecordedTransport([create_error_response(503, '60'), create_response()], [policy])
+        with patch('bandwidth.retry.time.sleep') as sleep:
+            self.assertEqual(503, transport.request(TransportRequest('get', 'http://localhost')).status_code)
+            self.assertFalse(sleep.called)
+        self.assertEqual((0, 1), (policy.retries, policy.exhausted))
+
+    def test_full_jitter(self):
+        """
+        get_delay() should return random delay up to exponentially growing limit
+        """
+        policy = RetryPolicy(backoff_base=1, backoff_max=5)
+        with patch('bandwidth.retry.random.uniform', side_effect=lambda a, b: (a, b)):
+            self.assertEqual([(0, 1), (0, 2), (0, 4), (0, 5)], [policy.get_delay(i) for i in range(4)])
+        for i in range(100):
+            self.assertTrue(0 <= policy.get_delay(3) <= 5)
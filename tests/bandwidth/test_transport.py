@@ -0,0 +1,175 @@
+import threading
+import time
+import unittest
+import six
+import requests
+from tests.bandwidth.helpers import create_response
+if six.PY3:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+from bandwidth.connection_pool import ConnectionPool
+from bandwidth.transport import Transport, RecordedTransport, TransportRequest, RequestMetrics, RequestCoalescer, \
+    get_coalescing_key
+from bandwidth.voice import Client as VoiceClient
+from bandwidth.messaging import Client as MessagingClient
+
+
+class TransportTests(unittest.TestCase):
+
+    def test_request(self):
+        """
+        request() should send request via connection pool
+        """
+        transport = Transport()
+        with patch('requests.Session.request', return_value=create_response()) as p:
+            transport.request(TransportRequest('get', 'http://localhost', kwargs={'params': {'a': 1}}))
+            p.assert_called_with('get', 'http://localhost', params={'a': 1})
+
+    def test_request_with_middlewares(self):
+        """
+        request() should run middlewares in order before sending
+        """
+        calls = []
+
+        def middleware(name):
+            def handle(request, send):
+                calls.append(name)
+                request.kwargs['headers'] = {'x-name': name}
+                return send(request)
+            return handle
+
+        transport = Transport(middlewares=[middleware('first')])
+        transport.add_middleware(middleware('second'))
+        with patch('requests.Session.request', return_value=create_response()) as p:
+            transport.request(TransportRequest('get', 'http://localhost'))
+            p.assert_called_with('get', 'http://localhost', headers={'x-name': 'second'})
+        self.assertEqual(['first', 'second'], calls)
+
+    def test_close(self):
+        """
+        close() should close own connection pool only
+        """
+        pool = ConnectionPool()
+        Transport(pool).close()
+        self.assertFalse(pool.closed)
+        with Transport() as transport:
+            pass
+        self.assertTrue(transport.connection_pool.closed)
+
+    def test_shared_by_clients(self):
+        """
+        clients of different api families should send requests via shared transport
+        """
+        transport = RecordedTransport([create_response(200, '{"id": "callId"}'),
+                                       create_response(200, '{"id": "messageId"}')])
+        voice_api = VoiceClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        messaging_api = MessagingClient('userId', 'apiToken', 'apiSecret', transport=transport)
+        self.assertEqual('callId', voice_api.get_call('callId')['id'])
+        self.assertEqual('messageId', messaging_api.get_message('messageId')['id'])
+        self.assertEqual(['voice', 'messaging'], [r.family for r in transport.requests])
+        self.assertEqual('https://api.catapult.inetwork.com/v1/users/userId/messages/messageId',
+                         transport.requests[1].url)
+
+    def test_recorded_transport_without_responses(self):
+        """
+        RecordedTransport should fail when there is no recorded response
+        """
+        with self.assertRaises(AssertionError):
+            RecordedTransport().request(TransportRequest('get', 'http://localhost'))
+
+    def test_request_metrics(self):
+        """
+        RequestMetrics should count requests and errors per api family
+        """
+        metrics = RequestMetrics()
+        transport = RecordedTransport([create_response(), create_response(500)], [metrics])
+        transport.request(TransportRequest('get', 'http://localhost', family='voice'))
+        transport.request(TransportRequest('get', 'http://localhost', family='voice'))
+        self.assertEqual(2, metrics.requests['voice'])
+        self.assertEqual(1, metrics.errors['voice'])
+        self.assertTrue(metrics.elapsed['voice'] >= 0)
+
+    def test_request_coalescer(self):
+        """
+        RequestCoalescer should let concurrent identical GET requests share one request
+        """
+        release = threading.Event()
+
+        def send_request(*args, **kwargs):
+            release.wait(5)
+            return create_response(200, '{"id": "callId", "state": "active"}')
+        client = VoiceClient('userId', 'apiToken', 'apiSecret', coalesce_requests=True)
+        results = []
+        with patch('requests.Session.request', side_effect=send_request) as p:
+            threads = [threading.Thread(target=lambda: results.append(client.get_call('callId'))) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            deadline = time.time() + 5
+            while client.request_coalescer.coalesced < 4 and time.time() < deadline:
+                time.sleep(0.001)
+            release.set()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(1, p.call_count)
+            client.get_call('callId')
+            self.assertEqual(2, p.call_count)
+        self.assertEqual([{'id': 'callId', 'state': 'active'}] * 5, results)
+        # each caller gets own converted data
+        self.assertEqual(5, len(set(id(data) for data in results)))
+        self.assertEqual((2, 4), (client.request_coalescer.requests, client.request_coalescer.coalesced))
+
+    def test_request_coalescer_error(self):
+        """
+        RequestCoalescer should pass error of the shared request to all callers
+        """
+        coalescer = RequestCoalescer()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def send(request):
+            started.set()
+            release.wait(5)
+            raise requests.ConnectionError('failed')
+
+        def make_request():
+            try:
+                coalescer(TransportRequest('get', 'http://localhost'), send)
+            except requests.ConnectionError as err:
+                errors.append(err)
+        leader = threading.Thread(target=make_request)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=make_request)
+        follower.start()
+        deadline = time.time() + 5
+        while coalescer.coalesced < 1 and time.time() < deadline:
+            time.sleep(0.001)
+        release.set()
+        leader.join()
+        follower.join()
+        self.assertEqual(2, len(errors))
+        self.assertEqual({}, coalescer._flights)
+
+    def test_get_coalescing_key(self):
+        """
+        get_coalescing_key() should return equal keys for identical GET requests only
+        """
+        def create_request(method='get', **kwargs):
+            kwargs.setdefault('params', {'page': 1, 'size': 25})
+            return TransportRequest(method, 'http://localhost', kwargs=dict(kwargs, auth=('token', 'secret')))
+        key = get_coalescing_key(create_request())
+        self.assertIsNotNone(key)
+        self.assertEqual(key, get_coalescing_key(create_request(params={'size': 25, 'page': 1})))
+        self.assertNotEqual(key, get_coalescing_key(create_request(params={'page': 2, 'size': 25})))
+        self.assertIsNone(get_coalescing_key(create_request('post', json={'a': 1})))
+        self.assertIsNone(get_coalescing_key(create_request(stream=True)))
+
+    def test_coalesce_requests_with_passed_transport(self):
+        """
+        Option coalesce_requests should not change passed transport
+        """
+        with self.assertRaises(ValueError):
+            VoiceClient('userId', 'apiToken', 'apiSecret', transport=RecordedTransport(), coalesce_requests=True)
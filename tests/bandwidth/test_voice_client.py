@@ -9,6 +9,7 @@ if six.PY3:
 else:
     from mock import patch
 
+from bandwidth.convert_camel import SnakeCaseDictView
 from bandwidth.voice import Client, BandwidthVoiceAPIException
 
 
@@ -45,7 +46,7 @@ class ClientTests(unittest.TestCase):
         """
         _request() should make authorized request to absolute url
         """
-        with patch('requests.request', return_value=create_response()) as p:
+        with patch('requests.Session.request', return_value=create_response()) as p:
             client = get_client()
             response = client._request('get', 'http://localhost')
             p.assert_called_with('get', 'http://localhost', headers=headers, auth=('apiToken', 'apiSecret'))
@@ -54,7 +55,7 @@ class ClientTests(unittest.TestCase):
         """
         _request() should make authorized request to relative url
         """
-        with patch('requests.request', return_value=create_response()) as p:
+        with patch('requests.Session.request', return_value=create_response()) as p:
             client = get_client()
             response = client._request('get', '/path')
             p.assert_called_with('get', 'https://api.catapult.inetwork.com/v1/path',
@@ -64,7 +65,7 @@ class ClientTests(unittest.TestCase):
         """
         _request() should add the user agent to header
         """
-        with patch('requests.request', return_value=create_response()) as p:
+        with patch('requests.Session.request', return_value=create_response()) as p:
             client = get_client()
             req_headers = {
                 'hello': 'world'
@@ -122,7 +123,7 @@ class ClientTests(unittest.TestCase):
         _make_request() should make request, check response and extract json data
         """
         estimated_response = create_response(200, '{"data": "data"}')
-        with patch('requests.request', return_value=estimated_response) as p:
+        with patch('requests.Session.request', return_value=estimated_response) as p:
             client = get_client()
             data, response, _ = client._make_request('get', '/path')
             p.assert_called_with('get', 'https://api.catapult.inetwork.com/v1/path',
@@ -136,7 +137,7 @@ class ClientTests(unittest.TestCase):
         """
         estimated_response = create_response(201, '', 'text/html')
         estimated_response.headers['location'] = 'http://localhost/path/id'
-        with patch('requests.request', return_value=estimated_response) as p:
+        with patch('requests.Session.request', return_value=estimated_response) as p:
             client = get_client()
             _, response, id = client._make_request('get', '/path')
             p.assert_called_with('get', 'https://api.catapult.inetwork.com/v1/path',
@@ -157,3 +158,41 @@ class ClientTests(unittest.TestCase):
         self.assertIsNotNone(getattr(client, 'play_audio_file_to_conference'))
         self.assertIsNotNone(getattr(client, 'speak_sentence_to_conference_member'))
         self.assertIsNotNone(getattr(client, 'play_audio_file_to_conference_member'))
+
+    def test_make_request_with_lazy_snake_case(self):
+        """
+        _make_request() should return snake_case view of json data if lazy_snake_case is set
+        """
+        estimated_response = create_response(200, '{"callId": "id", "details": [{"someKey": 1}]}')
+        with patch('requests.Session.request', return_value=estimated_response):
+            client = Client('userId', 'apiToken', 'apiSecret', lazy_snake_case=True)
+            data, _, _ = client._make_request('get', '/path')
+            self.assertIsInstance(data, SnakeCaseDictView)
+            self.assertEqual({'call_id': 'id', 'details': [{'some_key': 1}]}, data)
+
+    def test_make_request_with_raw(self):
+        """
+        _make_request() should return json data without conversion or bytes in raw mode
+        """
+        content = '{"callId": "id"}'
+        with patch('requests.Session.request', return_value=create_response(200, content)) as p:
+            client = Client('userId', 'apiToken', 'apiSecret', raw=True)
+            self.assertEqual({'callId': 'id'}, client._make_request('get', '/path')[0])
+            self.assertEqual(content.encode('utf-8'), client._make_request('get', '/path', raw='bytes')[0])
+            self.assertEqual({'call_id': 'id'}, client._make_request('get', '/path', raw=False)[0])
+            p.assert_called_with('get', 'https://api.catapult.inetwork.com/v1/path',
+                                 headers=headers, auth=('apiToken', 'apiSecret'))
+
+    def test_with_options(self):
+        """
+        with_options() should return copy of client with changed options and shared transport
+        """
+        client = get_client()
+        raw_client = client.with_options(raw='bytes')
+        self.assertEqual('bytes', raw_client.raw)
+        self.assertFalse(client.raw)
+        self.assertIs(client.transport, raw_client.transport)
+        raw_client.close()
+        self.assertFalse(client.connection_pool.closed)
+        with self.assertRaises(ValueError):
+            client.with_options(api_token='token')
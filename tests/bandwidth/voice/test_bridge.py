@@ -28,7 +28,7 @@ class BridgesTests(unittest.TestCase):
             "completedTime": "2013-04-22T13:59:30.122Z"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_bridges())
             p.assert_called_with(
@@ -46,7 +46,7 @@ class BridgesTests(unittest.TestCase):
         """
         estimated_response = create_response(201)
         estimated_response.headers['Location'] = 'http://localhost/bridgeId'
-        with patch('requests.request', return_value=estimated_response) as p:
+        with patch('requests.Session.request', return_value=estimated_response) as p:
             client = get_client()
             data = {'callIds': ['callId'], 'bridgeAudio': False}
             id = client.create_bridge(call_ids=['callId'], bridge_audio=False)
@@ -73,7 +73,7 @@ class BridgesTests(unittest.TestCase):
             "completedTime": "2013-04-22T13:59:30.122Z"
         }
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_bridge('bridgeId')
             p.assert_called_with(
@@ -87,7 +87,7 @@ class BridgesTests(unittest.TestCase):
         """
         update_bridge() should update a bridge
         """
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             data = {'bridgeAudio': False, 'callIds': None}
             client.update_bridge('bridgeId', bridge_audio=False)
@@ -117,7 +117,7 @@ class BridgesTests(unittest.TestCase):
             "bridge": "https://api.catapult.inetwork.com/v1/users/{userId}/bridges/{bridgeId}"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             calls = list(client.list_bridge_calls('bridgeId'))
             p.assert_called_with(
@@ -139,7 +139,7 @@ class BridgesTests(unittest.TestCase):
             'voice': None,
             'loopEnabled': None
         }
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             data = {'file_url': 'url'}
             client.play_audio_to_bridge('bridgeId', **data)
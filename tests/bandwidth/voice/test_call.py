@@ -30,7 +30,7 @@ class CallTests(unittest.TestCase):
             "id": "callId"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_calls())
             p.assert_called_with(
@@ -41,6 +41,27 @@ class CallTests(unittest.TestCase):
                 params=estimated_resquest)
             self.assertEqual('callId', data[0]['id'])
 
+    def test_list_calls_with_limit(self):
+        """
+        list_calls() should request only needed number of calls
+        """
+        estimated_json = """
+        [{
+            "id": "callId1"
+        }, {
+            "id": "callId2"
+        }]
+        """
+        response = create_response(200, estimated_json)
+        response.headers['link'] = '<https://api.catapult.inetwork.com/v1/users/userId/calls?page=1&size=2>; ' \
+            'rel="next"'
+        with patch('requests.Session.request', return_value=response) as p:
+            client = get_client()
+            data = list(client.list_calls(limit=2))
+            self.assertEqual(1, p.call_count)
+            self.assertEqual(2, p.call_args[1]['params']['size'])
+            self.assertEqual(['callId1', 'callId2'], [call['id'] for call in data])
+
     def test_create_call(self):
         """
         create_call() should create a call and return id
@@ -64,7 +85,7 @@ class CallTests(unittest.TestCase):
         }
         estimated_response = create_response(201)
         estimated_response.headers['Location'] = 'http://localhost/callId'
-        with patch('requests.request', return_value=estimated_response) as p:
+        with patch('requests.Session.request', return_value=estimated_response) as p:
             client = get_client()
             from_ = '+1234567890'
             to = '+1234567891'
@@ -86,7 +107,7 @@ class CallTests(unittest.TestCase):
             "id": "callId"
         }
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_call('callId')
             p.assert_called_with(
@@ -109,7 +130,7 @@ class CallTests(unittest.TestCase):
             'whisperAudio': None,
             'callbackUrl': None
         }
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             client.update_call('callId', state='completed')
             p.assert_called_with(
@@ -131,7 +152,7 @@ class CallTests(unittest.TestCase):
             'voice': None,
             'loopEnabled': None
         }
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             client.play_audio_to_call('callId', file_url='url')
             p.assert_called_with(
@@ -145,7 +166,7 @@ class CallTests(unittest.TestCase):
         """
         send_dtmf_to_call() should send dtmf data to a call
         """
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             client.send_dtmf_to_call('callId', 12)
             p.assert_called_with(
@@ -165,7 +186,7 @@ class CallTests(unittest.TestCase):
             "id": "recordingId"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_call_recordings('callId'))
             p.assert_called_with(
@@ -184,7 +205,7 @@ class CallTests(unittest.TestCase):
             "id": "transcriptionId"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_call_transcriptions('callId'))
             p.assert_called_with(
@@ -203,7 +224,7 @@ class CallTests(unittest.TestCase):
             "id": "eventId"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_call_events('callId'))
             p.assert_called_with(
@@ -222,7 +243,7 @@ class CallTests(unittest.TestCase):
             "id": "eventId"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_call_event('callId', 'eventId')
             p.assert_called_with(
@@ -244,7 +265,7 @@ class CallTests(unittest.TestCase):
         }
         response = create_response(201)
         response.headers['location'] = 'http://.../gatherId'
-        with patch('requests.request', return_value=response) as p:
+        with patch('requests.Session.request', return_value=response) as p:
             client = get_client()
             id = client.create_call_gather('callId', max_digits=1)
             p.assert_called_with(
@@ -264,7 +285,7 @@ class CallTests(unittest.TestCase):
             "id": "gatherId"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_call_gather('callId', 'gatherId')
             p.assert_called_with(
@@ -278,7 +299,7 @@ class CallTests(unittest.TestCase):
         """
         update_call_gather() should update a gather
         """
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             data = {'state': 'completed'}
             client.update_call_gather('callId', 'gatherId', state='completed')
@@ -336,49 +357,50 @@ class CallTests(unittest.TestCase):
 
     def test_toggle_call_recording_on(self):
         """
-        toggle_call_recording() should call get_call with the id
-        """
-        """
-        create_call() should create a call and return id
+        toggle_call_recording() should get the call and enable its recording
         """
-        estimated_response_json = {
-            'recording_enabled': False,
-        }
         client = get_client()
-        with patch.object(client, 'get_call', return_value=estimated_response_json) as get_mock:
+        with patch('requests.Session.request', return_value=create_response(200, '{"recordingEnabled": false}')) \
+                as get_mock:
             with patch.object(client, 'enable_call_recording') as p:
                 client.toggle_call_recording('callId')
-                get_mock.assert_called_with('callId')
+                get_mock.assert_called_with(
+                    'get', 'https://api.catapult.inetwork.com/v1/users/userId/calls/callId', auth=AUTH,
+                    headers=headers)
                 p.assert_called_with('callId')
 
     def test_toggle_call_recording_off(self):
         """
-        toggle_call_recording() should call get_call with the id
-        """
+        toggle_call_recording() should get the call and disable its recording
         """
-        create_call() should create a call and return id
-        """
-        estimated_response_json = {
-            'recording_enabled': True,
-        }
         client = get_client()
-        with patch.object(client, 'get_call', return_value=estimated_response_json) as get_mock:
+        with patch('requests.Session.request', return_value=create_response(200, '{"recordingEnabled": true}')):
             with patch.object(client, 'disable_call_recording') as p:
                 client.toggle_call_recording('callId')
-                get_mock.assert_called_with('callId')
                 p.assert_called_with('callId')
 
     def test_toggle_call_recording_neutral(self):
         """
-        toggle_call_recording() should call get_call with the id
+        toggle_call_recording() should return the call when its recording state is unknown
         """
-        estimated_response_json = {
-            'recording_enabled': 'wildcard',
-        }
-        client = get_client()
-        with patch.object(client, 'get_call', return_value=estimated_response_json) as get_mock:
-            client.toggle_call_recording('callId')
-            get_mock.assert_called_with('callId')
+        content = '{"recordingEnabled": "wildcard"}'
+        with patch('requests.Session.request', return_value=create_response(200, content)):
+            self.assertEqual({'recording_enabled': 'wildcard'}, get_client().toggle_call_recording('callId'))
+            client = Client('userId', 'apiToken', 'apiSecret', raw=True)
+            self.assertEqual({'recordingEnabled': 'wildcard'}, client.toggle_call_recording('callId'))
+            client = Client('userId', 'apiToken', 'apiSecret', raw='bytes')
+            self.assertEqual(content.encode('utf-8'), client.toggle_call_recording('callId'))
+
+    def test_toggle_call_recording_with_raw(self):
+        """
+        toggle_call_recording() should read the call state in any raw mode
+        """
+        for raw in (True, 'bytes'):
+            client = Client('userId', 'apiToken', 'apiSecret', raw=raw)
+            with patch('requests.Session.request', return_value=create_response(200, '{"recordingEnabled": true}')):
+                with patch.object(client, 'disable_call_recording') as p:
+                    client.toggle_call_recording('callId')
+                    p.assert_called_with('callId')
 
     def test_transfer_call(self):
         """
@@ -29,7 +29,7 @@ class ConferenceTests(unittest.TestCase):
 
         estimated_response = create_response(201)
         estimated_response.headers['Location'] = 'http://localhost/conferenceId'
-        with patch('requests.request', return_value=estimated_response) as p:
+        with patch('requests.Session.request', return_value=estimated_response) as p:
             client = get_client()
             id = client.create_conference(
                 from_='+1234567980',
@@ -54,7 +54,7 @@ class ConferenceTests(unittest.TestCase):
             "id": "conferenceId"
         }
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_conference('conferenceId')
             p.assert_called_with(
@@ -78,7 +78,7 @@ class ConferenceTests(unittest.TestCase):
             'fallbackUrl': None,
             'tag': None
         }
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             client.update_conference('conferenceId', state='completed')
             p.assert_called_with(
@@ -101,7 +101,7 @@ class ConferenceTests(unittest.TestCase):
             'loopEnabled': None
         }
 
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             data = {'file_url': 'url'}
             client.play_audio_to_conference('conferenceId', **data)
@@ -125,7 +125,7 @@ class ConferenceTests(unittest.TestCase):
         }
         response = create_response(201)
         response.headers['location'] = 'http://.../memberId'
-        with patch('requests.request', return_value=response) as p:
+        with patch('requests.Session.request', return_value=response) as p:
             client = get_client()
             data = {'call_id': 'callId'}
             id = client.create_conference_member('conferenceId', **data)
@@ -146,7 +146,7 @@ class ConferenceTests(unittest.TestCase):
             "id": "memberId"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_conference_members('conferenceId'))
             p.assert_called_with(
@@ -165,7 +165,7 @@ class ConferenceTests(unittest.TestCase):
             "id": "memberId"
         }
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_conference_member('conferenceId', 'memberId')
             p.assert_called_with(
@@ -186,7 +186,7 @@ class ConferenceTests(unittest.TestCase):
             'mute': None,
             'hold': None
         }
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             data = {'state': 'completed'}
             client.update_conference_member('conferenceId', 'memberId', **data)
@@ -209,7 +209,7 @@ class ConferenceTests(unittest.TestCase):
             'voice': None,
             'loopEnabled': None
         }
-        with patch('requests.request', return_value=create_response(200)) as p:
+        with patch('requests.Session.request', return_value=create_response(200)) as p:
             client = get_client()
             data = {'file_url': 'url'}
             client.play_audio_to_conference_member('conferenceId', 'memberId', file_url='url')
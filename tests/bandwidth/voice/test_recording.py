@@ -27,7 +27,7 @@ class RecordingTests(unittest.TestCase):
             "state": "complete"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_recordings())
             p.assert_called_with(
@@ -53,7 +53,7 @@ class RecordingTests(unittest.TestCase):
             "state": "complete"
         }
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_recording('recordingId')
             p.assert_called_with(
@@ -62,3 +62,15 @@ class RecordingTests(unittest.TestCase):
                 headers=headers,
                 auth=AUTH)
             self.assertEqual('{callId1}-1.wav', data['media_name'])
+
+    def test_get_recording_with_raw(self):
+        """
+        get_recording() should return raw data as received
+        """
+        content = '{"id": "recordingId", "media": "https://.../v1/users/.../media/callId-1.wav"}'
+        with patch('requests.Session.request', return_value=create_response(200, content)):
+            client = Client('userId', 'apiToken', 'apiSecret', raw=True)
+            self.assertEqual({'id': 'recordingId', 'media': 'https://.../v1/users/.../media/callId-1.wav'},
+                             client.get_recording('recordingId'))
+            client = Client('userId', 'apiToken', 'apiSecret', raw='bytes')
+            self.assertEqual(content.encode('utf-8'), client.get_recording('recordingId'))
@@ -28,7 +28,7 @@ class TranscriptionTests(unittest.TestCase):
             "textUrl": "{url-to-full-text}"
         }]
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = list(client.list_transcriptions('recordingId'))
             p.assert_called_with(
@@ -45,7 +45,7 @@ class TranscriptionTests(unittest.TestCase):
         """
         estimated_response = create_response(201)
         estimated_response.headers['Location'] = 'http://localhost/transcriptionId'
-        with patch('requests.request', return_value=estimated_response) as p:
+        with patch('requests.Session.request', return_value=estimated_response) as p:
             client = get_client()
             id = client.create_transcription('recordingId')
             p.assert_called_with(
@@ -71,7 +71,7 @@ class TranscriptionTests(unittest.TestCase):
             "textUrl": "{url-to-full-text}"
         }
         """
-        with patch('requests.request', return_value=create_response(200, estimated_json)) as p:
+        with patch('requests.Session.request', return_value=create_response(200, estimated_json)) as p:
             client = get_client()
             data = client.get_transcription('recId', 'transcriptionId')
             p.assert_called_with(
@@ -4,6 +4,7 @@ import six
 
 from bandwidth import client
 from bandwidth import _client_classes
+from bandwidth import Transport
 
 if six.PY3:
     from unittest.mock import patch
@@ -45,3 +46,15 @@ class ClientTests(unittest.TestCase):
             old = p.call_count
             client('voice', 'userId', 'token', 'secret')
             self.assertEqual(old, p.call_count)
+
+    def test_call_with_shared_transport(self):
+        """
+        Call of client() should pass shared transport to created clients
+        """
+        transport = Transport()
+        voice_api = client('voice', 'userId', 'token', 'secret', transport=transport)
+        account_api = client('account', 'userId', 'token', 'secret', transport=transport)
+        self.assertIs(transport, voice_api.transport)
+        self.assertIs(transport, account_api.transport)
+        voice_api.close()
+        self.assertFalse(transport.connection_pool.closed)
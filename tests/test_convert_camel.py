@@ -2,7 +2,8 @@ from __future__ import absolute_import
 import unittest
 import six
 from tests.camel_test_values import before_array_dict, after_array_dict
-from bandwidth.convert_camel import convert_object_to_snake_case
+from bandwidth import convert_camel
+from bandwidth.convert_camel import convert_object_to_snake_case, convert_string_to_snake_case, snake_case_view
 
 
 class ConvertCamelTests(unittest.TestCase):
@@ -34,3 +35,60 @@ class ConvertCamelTests(unittest.TestCase):
         """
         my_value = convert_object_to_snake_case({"helloWorld": "goodByeWorld"})
         self.assertEqual(my_value, {"hello_world": "goodByeWorld"})
+
+    def test_string_cache(self):
+        """
+        convert_string_to_snake_case() should cache converted keys and keep cache size bounded
+        """
+        convert_camel._key_cache.clear()
+        self.assertEqual('call_id', convert_string_to_snake_case('callId'))
+        self.assertEqual('call_id', convert_camel._key_cache['callId'])
+        self.assertEqual('call_id', convert_string_to_snake_case('callId'))
+        for i in range(convert_camel.KEY_CACHE_SIZE + 10):
+            convert_string_to_snake_case('key%d' % i)
+        self.assertTrue(len(convert_camel._key_cache) <= convert_camel.KEY_CACHE_SIZE)
+
+    def test_conversion_does_not_share_objects(self):
+        """
+        convert_object_to_snake_case() should build new dicts and lists
+        """
+        source = {'someList': [{'innerKey': 1}]}
+        result = convert_object_to_snake_case(source)
+        self.assertEqual({'some_list': [{'inner_key': 1}]}, result)
+        self.assertIsNot(source['someList'], result['some_list'])
+
+    def test_snake_case_view(self):
+        """
+        snake_case_view() should return read-only view equal to converted object
+        """
+        view = snake_case_view(before_array_dict)
+        self.assertEqual(after_array_dict, view)
+        self.assertEqual(view, after_array_dict)
+        self.assertEqual(after_array_dict[0]['nested_deeply'], view[0]['nested_deeply'])
+        self.assertEqual(after_array_dict[1:], view[1:])
+        self.assertEqual(after_array_dict, view.to_list())
+        self.assertEqual(True, snake_case_view(True))
+
+    def test_snake_case_view_is_lazy(self):
+        """
+        snake_case_view() should convert keys of accessed dictionaries only
+        """
+        convert_camel._key_cache.clear()
+        source = {'someDict': {'innerKey': 1}, 'otherDict': {'innerKey2': 2}}
+        view = snake_case_view(source)
+        self.assertEqual(1, view['some_dict']['inner_key'])
+        self.assertIn('innerKey', convert_camel._key_cache)
+        self.assertNotIn('innerKey2', convert_camel._key_cache)
+        self.assertEqual(2, len(view))
+        self.assertNotIn('someDict', view)
+        self.assertEqual({'other_dict': {'inner_key2': 2}, 'some_dict': {'inner_key': 1}}, view.to_dict())
+
+    def test_snake_case_view_is_read_only(self):
+        """
+        snake_case_view() should not allow to change data
+        """
+        view = snake_case_view({'someKey': [1]})
+        with self.assertRaises(TypeError):
+            view['some_key'] = 2
+        with self.assertRaises(TypeError):
+            view['some_key'][0] = 2